@@ -2,19 +2,65 @@
 from __future__ import annotations
 
 import logging
+import os
 from datetime import timedelta
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import Platform
+from homeassistant.const import MAJOR_VERSION, MINOR_VERSION, Platform
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.typing import ConfigType
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
-from .const import DOMAIN
+from .const import (
+    CONF_DIGEST_MINUTES,
+    CONF_MIRROR,
+    CONF_NOTICE_LISTS,
+    CONF_NOTIFY_SERVICE,
+    DEFAULT_DIGEST_MINUTES,
+    DEFAULT_MIRROR,
+    DEFAULT_NOTIFY_SERVICE,
+    DOMAIN,
+    HISTORY_DB_FILENAME,
+)
 from .coordinator import CanalRiverTrustCoordinator
+from .digest import NotificationDigest, async_remove_digest
+from .mirror import async_setup_mirror
+from .services import async_setup_services
+from .template import async_remove_template_functions, async_setup_template_functions
+from .websocket_api import async_setup_websocket_api
 
 _LOGGER = logging.getLogger(__name__)
 
-PLATFORMS: list[Platform] = [Platform.SENSOR]
+PLATFORMS: list[Platform] = [Platform.BINARY_SENSOR, Platform.CALENDAR, Platform.SENSOR]
+
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the Canal & River Trust services."""
+    async_setup_services(hass)
+    async_setup_websocket_api(hass)
+    return True
+
+
+async def async_migrate_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Migrate a config entry to the current minor version."""
+    if entry.version > 1:
+        # Set up by a newer release
+        return False
+
+    if entry.minor_version < 2:
+        # Entries set up before notice lists became optional keep them
+        options = {CONF_NOTICE_LISTS: True, **entry.options}
+        if (MAJOR_VERSION, MINOR_VERSION) >= (2024, 3):
+            hass.config_entries.async_update_entry(entry, options=options, minor_version=2)
+        else:
+            entry.minor_version = 2
+            hass.config_entries.async_update_entry(entry, options=options)
+        _LOGGER.debug("Migrated config entry %s to version 1.2", entry.entry_id)
+
+    return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
@@ -27,13 +73,54 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     hass.data[DOMAIN][entry.entry_id] = coordinator
     
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    async_setup_template_functions(hass)
+
+    if entry.options.get(CONF_MIRROR, DEFAULT_MIRROR):
+        async_setup_mirror(hass)
+
+    if notify_service := entry.options.get(CONF_NOTIFY_SERVICE, DEFAULT_NOTIFY_SERVICE):
+        coordinator.digest = NotificationDigest(
+            hass,
+            coordinator,
+            notify_service,
+            timedelta(
+                minutes=entry.options.get(CONF_DIGEST_MINUTES, DEFAULT_DIGEST_MINUTES)
+            ),
+        )
+        await coordinator.digest.async_load()
+        coordinator.digest.async_start()
+        entry.async_on_unload(coordinator.digest.async_stop)
+
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
     
     return True
 
 
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload a config entry when its options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
         hass.data[DOMAIN].pop(entry.entry_id)
+        if not hass.data[DOMAIN]:
+            async_remove_template_functions(hass)
     
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the local notice history and digest state when a config entry is deleted."""
+    path = hass.config.path(
+        ".storage", HISTORY_DB_FILENAME.format(domain=DOMAIN, entry_id=entry.entry_id)
+    )
+
+    def _remove() -> None:
+        if os.path.exists(path):
+            os.remove(path)
+
+    await hass.async_add_executor_job(_remove)
+
+    await async_remove_digest(hass, entry.entry_id)
@@ -2,132 +2,408 @@
 from __future__ import annotations
 
 import asyncio
+import json
 import logging
+import time
 from datetime import datetime, timedelta
-from typing import Any
+from functools import partial
+from typing import Any, Callable, TypeVar
 
 import aiohttp
 
-from .const import STOPPAGES_ENDPOINT
+from .client import ACCEPT_ENCODING, ResponseTooLarge, decompress
+from .const import (
+    DECODE_EXECUTOR_THRESHOLD,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_GEOMETRY_MODE,
+    DEFAULT_MAX_RESPONSE_SIZE,
+    DEFAULT_READ_TIMEOUT,
+    DEFAULT_SIMPLIFY_TOLERANCE,
+    DEFAULT_TOTAL_TIMEOUT,
+    GEOMETRY_POINT,
+    NOTICE_FIELDS,
+    PROBE_FIELDS,
+    STOPPAGES_ENDPOINT,
+)
+from .geometry import pack_geometry
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson ships with Home Assistant
+    orjson = None
 
 _LOGGER = logging.getLogger(__name__)
 
+_T = TypeVar("_T")
+
+# Bytes read from the response stream at a time
+READ_CHUNK_SIZE = 64 * 1024
+
+REQUEST_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+    "Accept": "application/json, text/plain, */*",
+    "Accept-Language": "en-US,en;q=0.9",
+    "Accept-Encoding": ACCEPT_ENCODING,
+    "Connection": "keep-alive",
+    "Sec-Fetch-Dest": "empty",
+    "Sec-Fetch-Mode": "cors",
+    "Sec-Fetch-Site": "same-origin"
+}
+
+
+class CanalRiverTrustApiError(Exception):
+    """Raised when notices could not be fetched from the API."""
+
+
+def _json_loads(body: bytes) -> Any:
+    """Decode a JSON body with the fastest available parser."""
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+def _truncate(text: str) -> str:
+    """Shorten response text for logging."""
+    return text[:500] + "..." if len(text) > 500 else text
+
+
+def parse_notices(body: bytes, simplify_tolerance: float = DEFAULT_SIMPLIFY_TOLERANCE) -> list[dict[str, Any]]:
+    """Decode a GeoJSON response body into a list of notices.
+
+    Line geometries are simplified to the tolerance (metres) and packed.
+    """
+    try:
+        data = _json_loads(body)
+    except (ValueError, TypeError) as json_err:
+        _LOGGER.error("Failed to parse JSON response: %s", json_err)
+        _LOGGER.debug("Response content: %s", _truncate(body.decode("utf-8", "replace")))
+        raise CanalRiverTrustApiError(f"Invalid JSON response: {json_err}") from json_err
+
+    if not isinstance(data, dict) or "features" not in data:
+        _LOGGER.warning("Unexpected API response format: %s", type(data))
+        raise CanalRiverTrustApiError(f"Unexpected response format: {type(data)}")
+
+    _LOGGER.debug("API response received with %d features", len(data["features"]))
+
+    # Extract properties from GeoJSON features
+    notices = []
+    for feature in data["features"]:
+        if "properties" in feature:
+            notice = feature["properties"]
+            # Add geometry if present
+            if "geometry" in feature and feature["geometry"]:
+                notice["geometry"] = pack_geometry(feature["geometry"], simplify_tolerance)
+            # Keep the feature id so notices can be tracked between refreshes
+            if "id" in feature and "id" not in notice:
+                notice["id"] = feature["id"]
+            notices.append(notice)
+
+    return notices
+
+
+def categorize_notices(notices: list[dict[str, Any]]) -> dict[str, Any]:
+    """Split notices into closures and stoppages."""
+    closures = []
+    stoppages = []
+
+    for notice in notices:
+        type_id = notice.get("typeId", 0)
+        if type_id == 2:  # Closure type
+            closures.append(notice)
+        else:  # All other types treated as stoppages
+            stoppages.append(notice)
+
+    return {
+        "notices": notices,
+        "closures": closures,
+        "stoppages": stoppages,
+        "last_updated": datetime.now().isoformat()
+    }
+
+
+def _parse_and_categorize(body: bytes, simplify_tolerance: float) -> dict[str, Any]:
+    """Decode a response body and categorize the notices."""
+    return categorize_notices(parse_notices(body, simplify_tolerance))
+
 
 class CanalRiverTrustAPI:
     """API client for Canal & River Trust data."""
 
-    def __init__(self, session: aiohttp.ClientSession) -> None:
-        """Initialize the API client."""
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        geometry: str = DEFAULT_GEOMETRY_MODE,
+        simplify_tolerance: float = DEFAULT_SIMPLIFY_TOLERANCE,
+        endpoint: str = STOPPAGES_ENDPOINT,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float = DEFAULT_READ_TIMEOUT,
+        total_timeout: float = DEFAULT_TOTAL_TIMEOUT,
+        max_response_size: int = DEFAULT_MAX_RESPONSE_SIZE * 1024 * 1024,
+    ) -> None:
+        """Initialize the API client.
+
+        Timeouts are in seconds; the read timeout covers the wait for the
+        first byte and any stall while reading. The response size cap
+        (bytes) applies to both the wire and decoded body.
+        """
         self._session = session
+        self._endpoint = endpoint
+        self._timeout = aiohttp.ClientTimeout(
+            total=total_timeout, connect=connect_timeout, sock_read=read_timeout
+        )
+        self._max_response_size = max_response_size
+        self._geometry = geometry
+        self._simplify_tolerance = simplify_tolerance
+        # Last ETag and body per (fields, geometry), for conditional requests
+        self._validators: dict[tuple[str, str], tuple[dict[str, str], str, bytes]] = {}
+        # Query parameters of the last successful request
+        self.last_params: dict[str, str] | None = None
+        # Event loop time spent decompressing the body that is decoded next
+        self._decompress_blocking = 0.0
+        self.metrics: dict[str, Any] = {
+            "parser": "orjson" if orjson is not None else "json",
+            "not_modified": 0,
+            "payload_bytes": 0,
+            "decode_ms": 0.0,
+            "offloaded": False,
+            "loop_blocking_ms": 0.0,
+            "loop_blocking_ms_total": 0.0,
+            "decodes": 0,
+        }
+        # Wire and decoded sizes of the last response body
+        self.transfer: dict[str, Any] = {
+            "accept_encoding": ACCEPT_ENCODING,
+            "content_encoding": None,
+            "wire_bytes": None,
+            "decoded_bytes": None,
+            "compression_ratio": None,
+            "wire_bytes_total": 0,
+            "decoded_bytes_total": 0,
+        }
 
     async def get_notices(self, start_date: str | None = None, end_date: str | None = None) -> list[dict[str, Any]]:
         """Get notices (stoppages/closures) from the API."""
+        try:
+            return await self._async_fetch_notices(start_date, end_date)
+        except CanalRiverTrustApiError:
+            return []
+
+    async def _async_fetch_notices(self, start_date: str | None = None, end_date: str | None = None) -> list[dict[str, Any]]:
+        """Fetch notices from the API, raising if the request failed."""
+        body = await self._async_fetch_body(start_date, end_date)
+        notices = await self._async_decode(
+            body, partial(parse_notices, simplify_tolerance=self._simplify_tolerance)
+        )
+        _LOGGER.info("Successfully fetched %d notices", len(notices))
+        return notices
+
+    async def probe(self) -> int:
+        """Check that the API is reachable with a minimal request.
+
+        Requests a one-day window with a single field and returns the number
+        of notices in it. Raises CanalRiverTrustApiError on failure.
+        """
+        today = datetime.now()
+        body = await self._async_fetch_body(
+            today.strftime("%Y-%m-%d"),
+            (today + timedelta(days=1)).strftime("%Y-%m-%d"),
+            fields=PROBE_FIELDS,
+            geometry=GEOMETRY_POINT,
+        )
+        notices = await self._async_decode(body, parse_notices)
+        _LOGGER.debug("API probe succeeded with %d notices", len(notices))
+        return len(notices)
+
+    async def _async_fetch_body(
+        self,
+        start_date: str | None = None,
+        end_date: str | None = None,
+        fields: str = NOTICE_FIELDS,
+        geometry: str | None = None,
+    ) -> bytes:
+        """Fetch the raw notices response body."""
         # Default to exactly one year window (364 days = 2026-07-06, which works)
         if not start_date:
             start_date = datetime.now().strftime("%Y-%m-%d")
         if not end_date:
             end_date = (datetime.now() + timedelta(days=364)).strftime("%Y-%m-%d")
-        
+
         # Build parameters in the same order as working Postman request
         params = {
             "consult": "false",
-            "geometry": "point",
+            "geometry": geometry or self._geometry,
             "start": start_date,
             "end": end_date,
-            "fields": "title,region,waterways,path,typeId,reasonId,programmeId,start,end,state"
+            "fields": fields
         }
-        
+
+        self._decompress_blocking = 0.0
         try:
-            headers = {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-                "Accept": "application/json, text/plain, */*",
-                "Accept-Language": "en-US,en;q=0.9",
-                "Accept-Encoding": "gzip, deflate, br",
-                "Connection": "keep-alive",
-                "Sec-Fetch-Dest": "empty",
-                "Sec-Fetch-Mode": "cors",
-                "Sec-Fetch-Site": "same-origin"
-            }
-            
-            _LOGGER.debug("Fetching notices from %s with params: %s", STOPPAGES_ENDPOINT, params)
-            
+            headers = dict(REQUEST_HEADERS)
+
+            # Ask the server (or a mirror) to skip the body if nothing changed
+            validator_key = (fields, params["geometry"])
+            validator = self._validators.get(validator_key)
+            if validator is not None and validator[0] == params:
+                headers["If-None-Match"] = validator[1]
+
+            _LOGGER.debug("Fetching notices from %s with params: %s", self._endpoint, params)
+
             async with self._session.get(
-                STOPPAGES_ENDPOINT,
+                self._endpoint,
                 params=params,
                 headers=headers,
-                timeout=aiohttp.ClientTimeout(total=30)
+                timeout=self._timeout
             ) as response:
+                if response.status == 304 and validator is not None:
+                    _LOGGER.debug("Notices not modified, reusing the previous response")
+                    self.metrics["not_modified"] += 1
+                    self.last_params = params
+                    return validator[2]
+
                 if response.status == 200:
                     # Check content type to ensure we got JSON, not HTML
                     content_type = response.headers.get('content-type', '').lower()
                     if 'application/json' not in content_type and 'json' not in content_type:
-                        error_text = await response.text()
+                        error_text = await self._async_read_text(response)
                         if 'service unavailable' in error_text.lower() or 'html' in error_text.lower():
                             _LOGGER.error("API returned HTML error page instead of JSON data - service may be temporarily unavailable")
-                            _LOGGER.debug("HTML response content: %s", error_text[:500] + "..." if len(error_text) > 500 else error_text)
+                            _LOGGER.debug("HTML response content: %s", _truncate(error_text))
                         else:
                             _LOGGER.error("API returned unexpected content type: %s", content_type)
-                            _LOGGER.debug("Response content: %s", error_text[:500] + "..." if len(error_text) > 500 else error_text)
-                        return []
-
-                    try:
-                        data = await response.json()
-                        _LOGGER.debug("API response received with %d features", len(data.get("features", [])))
-
-                        if isinstance(data, dict) and "features" in data:
-                            # Extract properties from GeoJSON features
-                            notices = []
-                            for feature in data["features"]:
-                                if "properties" in feature:
-                                    notice = feature["properties"].copy()
-                                    # Add geometry if present
-                                    if "geometry" in feature and feature["geometry"]:
-                                        notice["geometry"] = feature["geometry"]
-                                    notices.append(notice)
-
-                            _LOGGER.info("Successfully fetched %d notices", len(notices))
-                            return notices
-                        else:
-                            _LOGGER.warning("Unexpected API response format: %s", type(data))
-                            return []
-                    except (ValueError, TypeError) as json_err:
-                        error_text = await response.text()
-                        _LOGGER.error("Failed to parse JSON response: %s", json_err)
-                        _LOGGER.debug("Response content: %s", error_text[:500] + "..." if len(error_text) > 500 else error_text)
-                        return []
-                else:
-                    _LOGGER.error("Failed to fetch notices: HTTP %s", response.status)
-                    error_text = await response.text()
-                    if 'service unavailable' in error_text.lower():
-                        _LOGGER.error("Canal & River Trust API is temporarily unavailable - this is a temporary issue on their end")
+                            _LOGGER.debug("Response content: %s", _truncate(error_text))
+                        raise CanalRiverTrustApiError(f"Unexpected content type: {content_type}")
+
+                    body = await self._async_read_body(response)
+                    if etag := response.headers.get("ETag"):
+                        self._validators[validator_key] = (params, etag, body)
                     else:
-                        _LOGGER.error("Error response: %s", error_text[:500] + "..." if len(error_text) > 500 else error_text)
-                    return []
-        except asyncio.TimeoutError:
+                        self._validators.pop(validator_key, None)
+                    self.last_params = params
+                    return body
+
+                _LOGGER.error("Failed to fetch notices: HTTP %s", response.status)
+                error_text = await self._async_read_text(response)
+                if 'service unavailable' in error_text.lower():
+                    _LOGGER.error("Canal & River Trust API is temporarily unavailable - this is a temporary issue on their end")
+                else:
+                    _LOGGER.error("Error response: %s", _truncate(error_text))
+                raise CanalRiverTrustApiError(f"HTTP {response.status}")
+        except CanalRiverTrustApiError:
+            raise
+        except asyncio.TimeoutError as err:
             _LOGGER.error("Timeout while fetching notices")
-            return []
+            raise CanalRiverTrustApiError("Timeout while fetching notices") from err
         except Exception as err:
             _LOGGER.error("Error fetching notices: %s", err)
-            return []
+            raise CanalRiverTrustApiError(f"Error fetching notices: {err}") from err
+
+    async def _async_read_body(self, response: aiohttp.ClientResponse) -> bytes:
+        """Read and decode a response body, enforcing the size cap.
+
+        The body is read in chunks so that reading stops once the cap is
+        passed. Unless the session already decompresses responses, the
+        body is decoded here and its wire and decoded sizes are recorded.
+        """
+        limit = self._max_response_size
+        if response.content_length is not None and response.content_length > limit:
+            raise CanalRiverTrustApiError(
+                f"Response of {response.content_length} bytes exceeds the {limit} byte limit"
+            )
+
+        wire = bytearray()
+        async for chunk in response.content.iter_chunked(READ_CHUNK_SIZE):
+            wire.extend(chunk)
+            if len(wire) > limit:
+                raise CanalRiverTrustApiError(f"Response exceeds the {limit} byte limit")
+
+        encoding = response.headers.get("Content-Encoding", "")
+        if getattr(self._session, "auto_decompress", True):
+            # Decoded by aiohttp, so the wire size is unknown
+            self.transfer.update(content_encoding=encoding or None, decoded_bytes=len(wire))
+            return bytes(wire)
+
+        started = time.perf_counter()
+        try:
+            if len(wire) > DECODE_EXECUTOR_THRESHOLD:
+                future = asyncio.get_running_loop().run_in_executor(
+                    None, decompress, bytes(wire), encoding, limit
+                )
+                self._decompress_blocking = time.perf_counter() - started
+                body = await future
+            else:
+                body = decompress(bytes(wire), encoding, limit)
+                self._decompress_blocking = time.perf_counter() - started
+        except ResponseTooLarge as err:
+            raise CanalRiverTrustApiError(str(err)) from err
+        except ValueError as err:
+            raise CanalRiverTrustApiError(f"Unable to decode response: {err}") from err
+
+        self.transfer.update(
+            content_encoding=encoding or None,
+            wire_bytes=len(wire),
+            decoded_bytes=len(body),
+            compression_ratio=round(len(body) / len(wire), 2) if wire else None,
+            wire_bytes_total=self.transfer["wire_bytes_total"] + len(wire),
+            decoded_bytes_total=self.transfer["decoded_bytes_total"] + len(body),
+        )
+        return body
+
+    async def _async_read_text(self, response: aiohttp.ClientResponse) -> str:
+        """Read a response body as text for logging."""
+        try:
+            body = await self._async_read_body(response)
+        except CanalRiverTrustApiError as err:
+            return f"<{err}>"
+        return body.decode("utf-8", "replace")
+
+    async def _async_decode(self, body: bytes, parser: Callable[[bytes], _T]) -> _T:
+        """Decode a response body, in the executor when it is large.
+
+        Records how long decoding took and how long it blocked the event loop,
+        including any decompression of the body on the event loop.
+        """
+        offload = len(body) > DECODE_EXECUTOR_THRESHOLD
+        started = time.perf_counter()
+
+        if offload:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(None, parser, body)
+            loop_blocking = time.perf_counter() - started
+            result = await future
+        else:
+            result = parser(body)
+            loop_blocking = time.perf_counter() - started
+        loop_blocking += self._decompress_blocking
+        self._decompress_blocking = 0.0
+
+        decode_time = time.perf_counter() - started
+        self.metrics.update(
+            payload_bytes=len(body),
+            decode_ms=round(decode_time * 1000, 2),
+            offloaded=offload,
+            loop_blocking_ms=round(loop_blocking * 1000, 2),
+            loop_blocking_ms_total=round(
+                self.metrics["loop_blocking_ms_total"] + loop_blocking * 1000, 2
+            ),
+            decodes=self.metrics["decodes"] + 1,
+        )
+        _LOGGER.debug(
+            "Decoded %d bytes in %.1f ms (%s, %.1f ms on the event loop)",
+            len(body), decode_time * 1000,
+            "executor" if offload else "event loop", loop_blocking * 1000
+        )
+        return result
 
     async def get_all_data(self) -> dict[str, Any]:
-        """Get all notice data with categorization."""
-        notices = await self.get_notices()
-        
-        # Categorize notices by type
-        closures = []
-        stoppages = []
-        
-        for notice in notices:
-            type_id = notice.get("typeId", 0)
-            if type_id == 2:  # Closure type
-                closures.append(notice)
-            else:  # All other types treated as stoppages
-                stoppages.append(notice)
-        
-        return {
-            "notices": notices,
-            "closures": closures,
-            "stoppages": stoppages,
-            "last_updated": datetime.now().isoformat()
-        }
+        """Get all notice data with categorization.
+
+        Unlike get_notices, failures raise CanalRiverTrustApiError so an
+        outage is not mistaken for an empty set of notices.
+        """
+        body = await self._async_fetch_body()
+        data = await self._async_decode(
+            body, partial(_parse_and_categorize, simplify_tolerance=self._simplify_tolerance)
+        )
+        _LOGGER.info("Successfully fetched %d notices", len(data["notices"]))
+        return data
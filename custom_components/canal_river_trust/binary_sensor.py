@@ -0,0 +1,112 @@
+"""Binary sensor platform for Canal & River Trust integration."""
+from __future__ import annotations
+
+import logging
+from datetime import timedelta
+from typing import Any
+
+from homeassistant.components.binary_sensor import (
+    BinarySensorDeviceClass,
+    BinarySensorEntity,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.util import dt as dt_util
+
+from .const import ATTR_LAST_UPDATED, DOMAIN, UPCOMING_DAYS
+from .coordinator import DEMAND_TRANSITIONS, CanalRiverTrustCoordinator
+from .entity import CanalRiverTrustEntity
+from .routes import within_window
+from .watchlist import watchlist_item_id
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up Canal & River Trust binary sensors based on a config entry."""
+    coordinator: CanalRiverTrustCoordinator = hass.data[DOMAIN][entry.entry_id]
+
+    async_add_entities(
+        CanalRiverTrustWatchlistSensor(coordinator, entry, item)
+        for item in coordinator.watchlist.items
+    )
+
+
+class CanalRiverTrustWatchlistSensor(CanalRiverTrustEntity, BinarySensorEntity):
+    """On when an active or upcoming notice affects a watchlist item."""
+
+    _attr_device_class = BinarySensorDeviceClass.PROBLEM
+    _demands = (DEMAND_TRANSITIONS,)
+
+    def __init__(
+        self,
+        coordinator: CanalRiverTrustCoordinator,
+        entry: ConfigEntry,
+        item: str,
+    ) -> None:
+        """Initialize the watchlist sensor."""
+        super().__init__(coordinator, entry, f"watch_{watchlist_item_id(item)}")
+        self._item = item
+        self._attr_name = f"Canal & River Trust Watch {item.strip('/')}"
+        self._attr_icon = "mdi:eye"
+        self._matches: list[dict[str, Any]] = []
+        self._active = 0
+
+    def _notices(self) -> list[dict[str, Any]]:
+        """Return the notices affecting the item now or within the upcoming window."""
+        now = dt_util.now()
+        return within_window(
+            self.coordinator.watchlist.notices(self._item),
+            self.coordinator.notice_times,
+            now,
+            now + timedelta(days=UPCOMING_DAYS),
+        )
+
+    def _update_matches(self) -> None:
+        """Match the item's notices once for the state and attributes."""
+        if self.coordinator.data is None:
+            self._matches = []
+            self._active = 0
+            return
+
+        now = dt_util.now()
+        self._matches = self._notices()
+        self._active = sum(
+            1 for notice in self._matches
+            if self.coordinator.notice_times[notice["key"]][0] <= now
+        )
+
+    async def async_added_to_hass(self) -> None:
+        """Match the notices for the state written when the entity is added."""
+        await super().async_added_to_hass()
+        self._update_matches()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Match the notices of the update, then write the state."""
+        self._update_matches()
+        super()._handle_coordinator_update()
+
+    @property
+    def is_on(self) -> bool:
+        """Return True if a notice affects the item."""
+        return bool(self._matches)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the state attributes."""
+        if self.coordinator.data is None:
+            return {}
+
+        return {
+            ATTR_LAST_UPDATED: self.coordinator.data.get("last_updated"),
+            "item": self._item,
+            "active": self._active,
+            "upcoming": len(self._matches) - self._active,
+            "notices": self._matches,
+        }
@@ -0,0 +1,119 @@
+"""Calendar platform for Canal & River Trust integration."""
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta
+from typing import Any
+
+from homeassistant.components.calendar import CalendarEntity, CalendarEvent
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, REASON_MAPPINGS, TYPE_MAPPINGS
+from .coordinator import DEMAND_TRANSITIONS, CanalRiverTrustCoordinator
+from .entity import CanalRiverTrustEntity
+from .utils import notice_key, notice_waterways
+
+_LOGGER = logging.getLogger(__name__)
+
+# Category, name, icon and whether the calendar is enabled by default
+CALENDARS = [
+    ("notices", "Canal & River Trust Notices", "mdi:calendar-alert", True),
+    ("closures", "Canal & River Trust Closures Calendar", "mdi:lock", False),
+    ("stoppages", "Canal & River Trust Stoppages Calendar", "mdi:stop", False),
+    ("emergency", "Canal & River Trust Emergency Calendar", "mdi:alert-circle", False),
+]
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up Canal & River Trust calendars based on a config entry."""
+    coordinator: CanalRiverTrustCoordinator = hass.data[DOMAIN][entry.entry_id]
+
+    async_add_entities(
+        CanalRiverTrustCalendar(coordinator, entry, category, name, icon, enabled)
+        for category, name, icon, enabled in CALENDARS
+    )
+
+
+class CanalRiverTrustCalendar(CanalRiverTrustEntity, CalendarEntity):
+    """Calendar of Canal & River Trust notices."""
+
+    _demands = (DEMAND_TRANSITIONS,)
+
+    def __init__(
+        self,
+        coordinator: CanalRiverTrustCoordinator,
+        entry: ConfigEntry,
+        category: str,
+        name: str,
+        icon: str,
+        enabled_default: bool,
+    ) -> None:
+        """Initialize the calendar."""
+        super().__init__(coordinator, entry, f"calendar_{category}")
+        self._category = category
+        self._attr_name = name
+        self._attr_icon = icon
+        self._attr_entity_registry_enabled_default = enabled_default
+
+    def _to_event(self, notice: dict[str, Any]) -> CalendarEvent | None:
+        """Convert a notice to a calendar event."""
+        span = self.coordinator.notice_times.get(notice_key(notice))
+        if span is None:
+            return None
+
+        waterways = ", ".join(notice_waterways(notice))
+        description = "\n".join(
+            [
+                f"Type: {TYPE_MAPPINGS.get(notice.get('typeId', 0), 'Unknown')}",
+                f"Reason: {REASON_MAPPINGS.get(notice.get('reasonId', 0), 'Unknown')}",
+                f"Region: {notice.get('region', 'Unknown')}",
+                f"State: {notice.get('state', 'Unknown')}",
+            ]
+        )
+        return CalendarEvent(
+            start=span[0],
+            end=span[1],
+            summary=notice.get("title", "Unknown"),
+            description=description,
+            location=waterways or None,
+            uid=notice_key(notice),
+        )
+
+    @property
+    def event(self) -> CalendarEvent | None:
+        """Return the current or next upcoming event."""
+        if self.coordinator.data is None:
+            return None
+
+        index = self.coordinator.calendar_index(self._category)
+        now = dt_util.now()
+        current = index.overlapping(now, now + timedelta(seconds=1))
+        if current:
+            return self._to_event(current[0])
+
+        upcoming = index.next_starting(now)
+        return self._to_event(upcoming[2]) if upcoming else None
+
+    async def async_get_events(
+        self,
+        hass: HomeAssistant,
+        start_date: datetime,
+        end_date: datetime,
+    ) -> list[CalendarEvent]:
+        """Return the notices overlapping a date range."""
+        if self.coordinator.data is None:
+            return []
+
+        index = self.coordinator.calendar_index(self._category)
+        events = []
+        for notice in index.overlapping(start_date, end_date):
+            if (event := self._to_event(notice)) is not None:
+                events.append(event)
+        return events
@@ -0,0 +1,188 @@
+"""HTTP session for Canal & River Trust integration.
+
+The API client gets its own session on Home Assistant's shared connector.
+Notices are polled hours apart, so a connection kept alive for the client
+alone would only ever be reused within a refresh; sharing the connector
+leaves pooling, DNS caching and TLS setup to Home Assistant. The session
+adds trace hooks that count reused and created connections with their DNS
+and connect (including TLS) times. Responses are not decompressed by
+aiohttp, so the wire size of each body can be compared with its decoded
+size, and decompression stops at the response-size cap.
+"""
+from __future__ import annotations
+
+import time
+import zlib
+from types import SimpleNamespace
+from typing import Any
+
+import aiohttp
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_create_clientsession
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional, as in aiohttp
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+# Encodings offered to the server, brotli only when it can be decoded
+ACCEPT_ENCODING = "gzip, deflate, br" if brotli is not None else "gzip, deflate"
+
+
+class ResponseTooLarge(Exception):
+    """Raised when a response body exceeds the size cap."""
+
+
+def decompress(body: bytes, encoding: str, limit: int) -> bytes:
+    """Decode a response body by its Content-Encoding.
+
+    Raises ResponseTooLarge as soon as the decoded body would exceed the
+    limit, so a small compressed body cannot expand without bound, and
+    ValueError for unsupported or corrupt encodings. Blocks, so large
+    bodies should be decoded in the executor.
+    """
+    encoding = encoding.strip().lower()
+    if encoding in ("", "identity"):
+        return body
+
+    if encoding == "br":
+        if brotli is None:
+            raise ValueError("Brotli response received but brotli is not installed")
+        try:
+            decoded = brotli.decompress(body)
+        except Exception as err:  # brotli raises its own error type
+            raise ValueError(f"Invalid brotli response: {err}") from err
+        if len(decoded) > limit:
+            raise ResponseTooLarge(f"Decoded response larger than {limit} bytes")
+        return decoded
+
+    if encoding not in ("gzip", "x-gzip", "deflate"):
+        raise ValueError(f"Unsupported content encoding: {encoding}")
+
+    # Detect gzip and zlib headers, falling back to raw deflate streams
+    for wbits in (zlib.MAX_WBITS | 32, -zlib.MAX_WBITS):
+        decompressor = zlib.decompressobj(wbits)
+        try:
+            decoded = decompressor.decompress(body, limit + 1)
+        except zlib.error as err:
+            if encoding == "deflate" and wbits > 0:
+                continue
+            raise ValueError(f"Invalid {encoding} response: {err}") from err
+        if len(decoded) > limit or decompressor.unconsumed_tail:
+            raise ResponseTooLarge(f"Decoded response larger than {limit} bytes")
+        if not decompressor.eof:
+            raise ValueError(f"Truncated {encoding} response")
+        return decoded
+
+    raise ValueError(f"Invalid {encoding} response")
+
+
+class ConnectionStats:
+    """Count connection reuse and time DNS lookups and new connections."""
+
+    def __init__(self) -> None:
+        """Initialize the counters."""
+        self.stats: dict[str, Any] = {
+            "requests": 0,
+            "connections_created": 0,
+            "connections_reused": 0,
+            "dns_cache_hits": 0,
+            "dns_lookups": 0,
+            "dns_ms": 0.0,
+            "dns_ms_total": 0.0,
+            "connect_ms": 0.0,
+            "connect_ms_total": 0.0,
+        }
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        """Return a trace config that updates the counters."""
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(self._on_request_start)
+        trace_config.on_connection_reuseconn.append(self._on_connection_reused)
+        trace_config.on_connection_create_start.append(self._on_connection_create_start)
+        trace_config.on_connection_create_end.append(self._on_connection_create_end)
+        trace_config.on_dns_cache_hit.append(self._on_dns_cache_hit)
+        trace_config.on_dns_resolvehost_start.append(self._on_dns_start)
+        trace_config.on_dns_resolvehost_end.append(self._on_dns_end)
+        return trace_config
+
+    async def _on_request_start(
+        self, session: aiohttp.ClientSession, context: SimpleNamespace, params: Any
+    ) -> None:
+        """Count a request."""
+        self.stats["requests"] += 1
+
+    async def _on_connection_reused(
+        self, session: aiohttp.ClientSession, context: SimpleNamespace, params: Any
+    ) -> None:
+        """Count a request on a kept-alive connection."""
+        self.stats["connections_reused"] += 1
+
+    async def _on_connection_create_start(
+        self, session: aiohttp.ClientSession, context: SimpleNamespace, params: Any
+    ) -> None:
+        """Mark the start of a new connection."""
+        context.connect_started = time.perf_counter()
+
+    async def _on_connection_create_end(
+        self, session: aiohttp.ClientSession, context: SimpleNamespace, params: Any
+    ) -> None:
+        """Count a new connection and record its connect time."""
+        self.stats["connections_created"] += 1
+        self._record(context, "connect_started", "connect_ms")
+
+    async def _on_dns_cache_hit(
+        self, session: aiohttp.ClientSession, context: SimpleNamespace, params: Any
+    ) -> None:
+        """Count a cached DNS answer."""
+        self.stats["dns_cache_hits"] += 1
+
+    async def _on_dns_start(
+        self, session: aiohttp.ClientSession, context: SimpleNamespace, params: Any
+    ) -> None:
+        """Mark the start of a DNS lookup."""
+        context.dns_started = time.perf_counter()
+
+    async def _on_dns_end(
+        self, session: aiohttp.ClientSession, context: SimpleNamespace, params: Any
+    ) -> None:
+        """Count a DNS lookup and record its time."""
+        self.stats["dns_lookups"] += 1
+        self._record(context, "dns_started", "dns_ms")
+
+    def _record(self, context: SimpleNamespace, started: str, metric: str) -> None:
+        """Record the time since a start mark as the last and total of a metric."""
+        if (start := getattr(context, started, None)) is None:
+            return
+        elapsed = (time.perf_counter() - start) * 1000
+        self.stats[metric] = round(elapsed, 2)
+        self.stats[f"{metric}_total"] = round(self.stats[f"{metric}_total"] + elapsed, 2)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the counters with the share of requests on reused connections."""
+        connections = self.stats["connections_created"] + self.stats["connections_reused"]
+        return {
+            **self.stats,
+            "reuse_ratio": (
+                round(self.stats["connections_reused"] / connections, 3)
+                if connections
+                else None
+            ),
+        }
+
+
+def async_create_session(hass: HomeAssistant, stats: ConnectionStats) -> aiohttp.ClientSession:
+    """Create a traced session on Home Assistant's shared connector.
+
+    The session is detached when the config entry being set up is
+    unloaded, and must not be closed, which would close the connector.
+    """
+    return async_create_clientsession(
+        hass,
+        auto_decompress=False,
+        trace_configs=[stats.trace_config()],
+    )
@@ -12,16 +12,52 @@ from homeassistant.core import HomeAssistant
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.helpers import config_validation as cv
 
+from .api import CanalRiverTrustApiError
 from .const import (
+    ATTRIBUTE_FORMATS,
+    CONF_ATTRIBUTE_FORMAT,
+    CONF_CONNECT_TIMEOUT,
+    CONF_DIGEST_MINUTES,
+    CONF_ENDPOINT,
+    CONF_GEOMETRY_MODE,
     CONF_INCLUDE_EMERGENCY,
     CONF_INCLUDE_PLANNED,
     CONF_LOCATION_FILTER,
+    CONF_MAX_RESPONSE_SIZE,
+    CONF_MIRROR,
+    CONF_NOTICE_LISTS,
+    CONF_NOTIFY_SERVICE,
+    CONF_READ_TIMEOUT,
+    CONF_ROUTE_DAYS,
+    CONF_ROUTES,
+    CONF_SIMPLIFY_TOLERANCE,
+    CONF_TOTAL_TIMEOUT,
+    CONF_UPCOMING_HORIZONS,
     CONF_UPDATE_INTERVAL,
+    CONF_WATCHLIST,
+    DEFAULT_ATTRIBUTE_FORMAT,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_DIGEST_MINUTES,
+    DEFAULT_GEOMETRY_MODE,
     DEFAULT_INCLUDE_EMERGENCY,
     DEFAULT_INCLUDE_PLANNED,
+    DEFAULT_MAX_RESPONSE_SIZE,
+    DEFAULT_MIRROR,
+    DEFAULT_NOTICE_LISTS,
+    DEFAULT_NOTIFY_SERVICE,
+    DEFAULT_READ_TIMEOUT,
+    DEFAULT_ROUTE_DAYS,
+    DEFAULT_ROUTES,
+    DEFAULT_SIMPLIFY_TOLERANCE,
+    DEFAULT_TOTAL_TIMEOUT,
+    DEFAULT_UPCOMING_HORIZONS,
     DEFAULT_UPDATE_INTERVAL,
+    DEFAULT_WATCHLIST,
     DOMAIN,
+    GEOMETRY_MODES,
+    MAX_UPCOMING_DAYS,
 )
+from .utils import parse_horizons
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -42,6 +78,8 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for Canal & River Trust."""
 
     VERSION = 1
+    # 1.2 keeps the notice lists of entries set up before they became optional
+    MINOR_VERSION = 2
 
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
@@ -60,6 +98,8 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     data={},
                     options=user_input,
                 )
+            except CanalRiverTrustApiError:
+                errors["base"] = "cannot_connect"
             except Exception:  # pylint: disable=broad-except
                 _LOGGER.exception("Unexpected exception")
                 errors["base"] = "unknown"
@@ -71,15 +111,19 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         )
 
     async def _test_connection(self) -> None:
-        """Test connection to the Canal & River Trust API."""
+        """Test connection to the Canal & River Trust API.
+
+        Uses a one-day, single-field probe rather than the full notice set,
+        which the coordinator downloads on its first refresh.
+        """
         from .api import CanalRiverTrustAPI
         from homeassistant.helpers.aiohttp_client import async_get_clientsession
         
         session = async_get_clientsession(self.hass)
         api = CanalRiverTrustAPI(session)
         
-        # Try to fetch a small amount of data to test the connection
-        await api.get_notices()
+        # Raises CanalRiverTrustApiError if the API is unreachable
+        await api.probe()
 
     @staticmethod
     @config_entries.callback
@@ -101,8 +145,23 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
         """Manage the options."""
+        errors: dict[str, str] = {}
+
         if user_input is not None:
-            return self.async_create_entry(title="", data=user_input)
+            if not parse_horizons(
+                user_input.get(CONF_UPCOMING_HORIZONS), MAX_UPCOMING_DAYS
+            ):
+                errors[CONF_UPCOMING_HORIZONS] = "invalid_horizons"
+            if user_input.get(CONF_ENDPOINT):
+                try:
+                    cv.url(user_input[CONF_ENDPOINT])
+                except vol.Invalid:
+                    errors[CONF_ENDPOINT] = "invalid_endpoint"
+            notify_service = user_input.get(CONF_NOTIFY_SERVICE, "").removeprefix("notify.")
+            if notify_service and not self.hass.services.has_service("notify", notify_service):
+                errors[CONF_NOTIFY_SERVICE] = "unknown_notify_service"
+            if not errors:
+                return self.async_create_entry(title="", data=user_input)
 
         return self.async_show_form(
             step_id="init",
@@ -130,6 +189,97 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                             CONF_INCLUDE_EMERGENCY, DEFAULT_INCLUDE_EMERGENCY
                         ),
                     ): bool,
+                    vol.Optional(
+                        CONF_GEOMETRY_MODE,
+                        default=self.config_entry.options.get(
+                            CONF_GEOMETRY_MODE, DEFAULT_GEOMETRY_MODE
+                        ),
+                    ): vol.In(GEOMETRY_MODES),
+                    vol.Optional(
+                        CONF_SIMPLIFY_TOLERANCE,
+                        default=self.config_entry.options.get(
+                            CONF_SIMPLIFY_TOLERANCE, DEFAULT_SIMPLIFY_TOLERANCE
+                        ),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0, max=1000)),
+                    vol.Optional(
+                        CONF_ROUTES,
+                        default=self.config_entry.options.get(CONF_ROUTES, DEFAULT_ROUTES),
+                    ): str,
+                    vol.Optional(
+                        CONF_ROUTE_DAYS,
+                        default=self.config_entry.options.get(
+                            CONF_ROUTE_DAYS, DEFAULT_ROUTE_DAYS
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=90)),
+                    vol.Optional(
+                        CONF_WATCHLIST,
+                        default=self.config_entry.options.get(
+                            CONF_WATCHLIST, DEFAULT_WATCHLIST
+                        ),
+                    ): str,
+                    vol.Optional(
+                        CONF_NOTIFY_SERVICE,
+                        default=self.config_entry.options.get(
+                            CONF_NOTIFY_SERVICE, DEFAULT_NOTIFY_SERVICE
+                        ),
+                    ): str,
+                    vol.Optional(
+                        CONF_DIGEST_MINUTES,
+                        default=self.config_entry.options.get(
+                            CONF_DIGEST_MINUTES, DEFAULT_DIGEST_MINUTES
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=1440)),
+                    vol.Optional(
+                        CONF_NOTICE_LISTS,
+                        default=self.config_entry.options.get(
+                            CONF_NOTICE_LISTS, DEFAULT_NOTICE_LISTS
+                        ),
+                    ): bool,
+                    vol.Optional(
+                        CONF_ATTRIBUTE_FORMAT,
+                        default=self.config_entry.options.get(
+                            CONF_ATTRIBUTE_FORMAT, DEFAULT_ATTRIBUTE_FORMAT
+                        ),
+                    ): vol.In(ATTRIBUTE_FORMATS),
+                    vol.Optional(
+                        CONF_UPCOMING_HORIZONS,
+                        default=self.config_entry.options.get(
+                            CONF_UPCOMING_HORIZONS, DEFAULT_UPCOMING_HORIZONS
+                        ),
+                    ): str,
+                    vol.Optional(
+                        CONF_ENDPOINT,
+                        default=self.config_entry.options.get(CONF_ENDPOINT, ""),
+                    ): str,
+                    vol.Optional(
+                        CONF_MIRROR,
+                        default=self.config_entry.options.get(CONF_MIRROR, DEFAULT_MIRROR),
+                    ): bool,
+                    vol.Optional(
+                        CONF_CONNECT_TIMEOUT,
+                        default=self.config_entry.options.get(
+                            CONF_CONNECT_TIMEOUT, DEFAULT_CONNECT_TIMEOUT
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=120)),
+                    vol.Optional(
+                        CONF_READ_TIMEOUT,
+                        default=self.config_entry.options.get(
+                            CONF_READ_TIMEOUT, DEFAULT_READ_TIMEOUT
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=300)),
+                    vol.Optional(
+                        CONF_TOTAL_TIMEOUT,
+                        default=self.config_entry.options.get(
+                            CONF_TOTAL_TIMEOUT, DEFAULT_TOTAL_TIMEOUT
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=5, max=600)),
+                    vol.Optional(
+                        CONF_MAX_RESPONSE_SIZE,
+                        default=self.config_entry.options.get(
+                            CONF_MAX_RESPONSE_SIZE, DEFAULT_MAX_RESPONSE_SIZE
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=512)),
                 }
             ),
+            errors=errors,
         )
@@ -1,4 +1,5 @@
 """Constants for the Canal & River Trust integration."""
+from datetime import timedelta
 
 DOMAIN = "canal_river_trust"
 
@@ -7,23 +8,126 @@ CONF_UPDATE_INTERVAL = "update_interval"
 CONF_LOCATION_FILTER = "location_filter"
 CONF_INCLUDE_PLANNED = "include_planned"
 CONF_INCLUDE_EMERGENCY = "include_emergency"
+CONF_GEOMETRY_MODE = "geometry_mode"
+CONF_SIMPLIFY_TOLERANCE = "simplify_tolerance"
+CONF_ROUTES = "routes"
+CONF_ATTRIBUTE_FORMAT = "attribute_format"
+CONF_NOTICE_LISTS = "notice_lists"
+CONF_ROUTE_DAYS = "route_days"
+CONF_ENDPOINT = "endpoint"
+CONF_UPCOMING_HORIZONS = "upcoming_horizons"
+CONF_WATCHLIST = "watchlist"
+CONF_NOTIFY_SERVICE = "notify_service"
+CONF_DIGEST_MINUTES = "digest_minutes"
+CONF_MIRROR = "mirror"
+CONF_CONNECT_TIMEOUT = "connect_timeout"
+CONF_READ_TIMEOUT = "read_timeout"
+CONF_TOTAL_TIMEOUT = "total_timeout"
+CONF_MAX_RESPONSE_SIZE = "max_response_size"
+
+# Geometry modes requested from the API
+GEOMETRY_POINT = "point"
+GEOMETRY_LINE = "line"
+GEOMETRY_MODES = [GEOMETRY_POINT, GEOMETRY_LINE]
+
+# Encodings of notice lists in sensor attributes
+ATTRIBUTE_FORMAT_ROWS = "rows"
+ATTRIBUTE_FORMAT_COLUMNAR = "columnar"
+ATTRIBUTE_FORMATS = [ATTRIBUTE_FORMAT_ROWS, ATTRIBUTE_FORMAT_COLUMNAR]
+
+# Formats of the export_notices service
+EXPORT_FORMAT_GEOJSON = "geojson"
+EXPORT_FORMAT_CSV = "csv"
+EXPORT_FORMAT_NDJSON = "ndjson"
+EXPORT_FORMATS = [EXPORT_FORMAT_GEOJSON, EXPORT_FORMAT_CSV, EXPORT_FORMAT_NDJSON]
+
+# On-demand refreshes within this long of the last fetch reuse its data
+REFRESH_COOLDOWN = timedelta(minutes=5)
 
 # Defaults
 DEFAULT_UPDATE_INTERVAL = 240  # minutes (4 hours)
 DEFAULT_INCLUDE_PLANNED = True
 DEFAULT_INCLUDE_EMERGENCY = True
+DEFAULT_GEOMETRY_MODE = GEOMETRY_POINT
+DEFAULT_SIMPLIFY_TOLERANCE = 25.0  # metres
+DEFAULT_ROUTES = ""
+DEFAULT_ROUTE_DAYS = 14
+DEFAULT_ATTRIBUTE_FORMAT = ATTRIBUTE_FORMAT_ROWS
+DEFAULT_NOTICE_LISTS = False
+DEFAULT_MIRROR = False
+DEFAULT_UPCOMING_HORIZONS = "7"
+DEFAULT_WATCHLIST = ""
+DEFAULT_NOTIFY_SERVICE = ""
+DEFAULT_DIGEST_MINUTES = 15
+DEFAULT_CONNECT_TIMEOUT = 10  # seconds, including DNS and TLS
+DEFAULT_READ_TIMEOUT = 20  # seconds to the first byte and between reads
+DEFAULT_TOTAL_TIMEOUT = 30  # seconds
+DEFAULT_MAX_RESPONSE_SIZE = 32  # megabytes, decoded
+
+# Horizon of the original upcoming issues sensor, which keeps its unique ID
+UPCOMING_DAYS = 7
+MAX_UPCOMING_DAYS = 365
+
+# Map cluster grid cell sizes in degrees, per zoom level
+CLUSTER_LEVELS = {
+    "region": 0.5,
+    "area": 0.1,
+    "local": 0.02,
+}
 
 # API URLs
 API_BASE_URL = "https://canalrivertrust.org.uk/api"
 STOPPAGES_ENDPOINT = f"{API_BASE_URL}/stoppage/notices"
 
+# Path of the notice mirror served to other installations
+MIRROR_URL = f"/api/{DOMAIN}/notices"
+
+# Response bodies larger than this (bytes) are decoded in the executor
+DECODE_EXECUTOR_THRESHOLD = 256 * 1024
+
+# Fields requested for each notice
+NOTICE_FIELDS = "title,region,waterways,path,typeId,reasonId,programmeId,start,end,state"
+
+# Fields requested when probing the API from the config flow
+PROBE_FIELDS = "title"
+
 # API Parameters for stoppages (covers both closures and stoppages)
 API_PARAMS = {
     "consult": "false",
     "geometry": "point",
-    "fields": "title,region,waterways,path,typeId,reasonId,programmeId,start,end,state"
+    "fields": NOTICE_FIELDS
 }
 
+# Services
+SERVICE_QUERY_HISTORY = "query_history"
+SERVICE_PROFILE_REFRESH = "profile_refresh"
+SERVICE_CHECK_ROUTE = "check_route"
+SERVICE_REFRESH_DATA = "refresh_data"
+SERVICE_EXPORT_NOTICES = "export_notices"
+SERVICE_QUERY_STATISTICS = "query_statistics"
+
+# Service fields
+ATTR_ENTRY_ID = "entry_id"
+
+# Refresh profile reports, written to the config directory
+PROFILE_FILENAME = "{domain}_profile_{timestamp}.txt"
+
+# Directory of notice exports in the config directory, and the default file name
+EXPORT_DIRECTORY = "{domain}_exports"
+EXPORT_FILENAME = "{domain}_notices_{timestamp}"
+
+# Local notice history database, stored under the .storage directory
+HISTORY_DB_FILENAME = "{domain}_{entry_id}_history.db"
+
+# Events fired on the Home Assistant event bus
+EVENT_NOTICE_ADDED = f"{DOMAIN}_notice_added"
+EVENT_NOTICE_UPDATED = f"{DOMAIN}_notice_updated"
+EVENT_NOTICE_REMOVED = f"{DOMAIN}_notice_removed"
+EVENT_NOTICES_CHANGED = f"{DOMAIN}_notices_changed"
+
+# Above this many changes in one refresh a single batched event is fired
+EVENT_BATCH_THRESHOLD = 10
+
 # Sensor attributes
 ATTR_NOTICES = "notices"
 ATTR_LAST_UPDATED = "last_updated"
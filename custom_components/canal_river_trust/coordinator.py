@@ -1,27 +1,112 @@
 """Data update coordinator for Canal & River Trust integration."""
 from __future__ import annotations
 
+import asyncio
 import logging
-from datetime import timedelta
-from typing import Any
+import sqlite3
+from bisect import bisect_right
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any, Callable
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_point_in_utc_time
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
 
 from .api import CanalRiverTrustAPI
+from .client import ConnectionStats, async_create_session
 from .const import (
+    CLUSTER_LEVELS,
+    CONF_CONNECT_TIMEOUT,
+    CONF_ENDPOINT,
+    CONF_GEOMETRY_MODE,
     CONF_INCLUDE_EMERGENCY,
     CONF_INCLUDE_PLANNED,
     CONF_LOCATION_FILTER,
+    CONF_MAX_RESPONSE_SIZE,
+    CONF_READ_TIMEOUT,
+    CONF_ROUTE_DAYS,
+    CONF_ROUTES,
+    CONF_SIMPLIFY_TOLERANCE,
+    CONF_TOTAL_TIMEOUT,
+    CONF_UPCOMING_HORIZONS,
     CONF_UPDATE_INTERVAL,
+    CONF_WATCHLIST,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_GEOMETRY_MODE,
+    DEFAULT_MAX_RESPONSE_SIZE,
+    DEFAULT_READ_TIMEOUT,
+    DEFAULT_ROUTE_DAYS,
+    DEFAULT_ROUTES,
+    DEFAULT_SIMPLIFY_TOLERANCE,
+    DEFAULT_TOTAL_TIMEOUT,
+    DEFAULT_UPCOMING_HORIZONS,
     DEFAULT_UPDATE_INTERVAL,
+    DEFAULT_WATCHLIST,
     DOMAIN,
+    EVENT_BATCH_THRESHOLD,
+    EVENT_NOTICE_ADDED,
+    EVENT_NOTICE_REMOVED,
+    EVENT_NOTICE_UPDATED,
+    EVENT_NOTICES_CHANGED,
+    HISTORY_DB_FILENAME,
+    MAX_UPCOMING_DAYS,
+    REASON_MAPPINGS,
+    REFRESH_COOLDOWN,
+    STOPPAGES_ENDPOINT,
+    UPCOMING_DAYS,
 )
+from .cube import NoticeCube
+from .geometry import centroid, extract_coordinates, grid_clusters
+from .history import NoticeHistory
+from .index import (
+    IntervalTree,
+    NearestIndex,
+    PathTrie,
+    StartTimeIndex,
+    build_count_index,
+    build_interval_tree,
+    build_nearest_index,
+    build_path_trie,
+)
+from .mirror import build_feature_collection
+from .profiler import RefreshProfiler
+from .routes import RouteChecker, parse_routes
+from .utils import (
+    compact_notice,
+    diff_notices,
+    notice_key,
+    notice_path,
+    parse_horizons,
+    parse_notice_time,
+)
+from .watchlist import Watchlist, parse_watchlist
+
+if TYPE_CHECKING:
+    from .digest import NotificationDigest
 
 _LOGGER = logging.getLogger(__name__)
 
+# Demands entities register for structures that are otherwise skipped
+DEMAND_CUBE = "cube"
+DEMAND_TRANSITIONS = "transitions"
+
+NoticeChangeListener = Callable[
+    [list[dict[str, Any]], list[dict[str, Any]], list[dict[str, Any]]], None
+]
+
+
+def get_coordinator(
+    hass: HomeAssistant, entry_id: str | None = None
+) -> CanalRiverTrustCoordinator | None:
+    """Return the coordinator for an entry, or the first loaded one."""
+    coordinators: dict[str, CanalRiverTrustCoordinator] = hass.data.get(DOMAIN, {})
+    if entry_id:
+        return coordinators.get(entry_id)
+    return next(iter(coordinators.values()), None)
+
 
 class CanalRiverTrustCoordinator(DataUpdateCoordinator[dict[str, Any]]):
     """Class to manage fetching Canal & River Trust data."""
@@ -29,8 +114,86 @@ class CanalRiverTrustCoordinator(DataUpdateCoordinator[dict[str, Any]]):
     def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
         """Initialize the coordinator."""
         self.entry = entry
-        self.api = CanalRiverTrustAPI(async_get_clientsession(hass))
+
+        # Traced session on the shared connector, detached when the entry is unloaded
+        self.connection_stats = ConnectionStats()
+        session = async_create_session(hass, self.connection_stats)
+
+        self.api = CanalRiverTrustAPI(
+            session,
+            geometry=entry.options.get(CONF_GEOMETRY_MODE, DEFAULT_GEOMETRY_MODE),
+            simplify_tolerance=entry.options.get(
+                CONF_SIMPLIFY_TOLERANCE, DEFAULT_SIMPLIFY_TOLERANCE
+            ),
+            endpoint=entry.options.get(CONF_ENDPOINT) or STOPPAGES_ENDPOINT,
+            connect_timeout=entry.options.get(CONF_CONNECT_TIMEOUT, DEFAULT_CONNECT_TIMEOUT),
+            read_timeout=entry.options.get(CONF_READ_TIMEOUT, DEFAULT_READ_TIMEOUT),
+            total_timeout=entry.options.get(CONF_TOTAL_TIMEOUT, DEFAULT_TOTAL_TIMEOUT),
+            max_response_size=entry.options.get(
+                CONF_MAX_RESPONSE_SIZE, DEFAULT_MAX_RESPONSE_SIZE
+            ) * 1024 * 1024,
+        )
+        self.history = NoticeHistory(
+            hass.config.path(
+                ".storage",
+                HISTORY_DB_FILENAME.format(domain=DOMAIN, entry_id=entry.entry_id),
+            )
+        )
         
+        # Compact notices from the previous refresh, keyed by notice_key
+        self._notice_snapshot: dict[str, dict[str, Any]] | None = None
+        # Incremented whenever the filtered notices change
+        self.notice_revision = 0
+        self._change_listeners: list[NoticeChangeListener] = []
+
+        # Indexes rebuilt on every refresh; the path trie holds every notice
+        self.path_trie: PathTrie[dict[str, Any]] = PathTrie()
+        self.notice_times: dict[str, tuple[datetime, datetime]] = {}
+
+        # Notices of the last refresh and the structures derived from them,
+        # built on first use so that disabled entities cost nothing
+        self._all_notices: list[dict[str, Any]] = []
+        self._indexed_data: dict[str, Any] = {}
+        self._derived: dict[Any, Any] = {}
+        # Enabled entities per demand, see async_add_demand
+        self._demand: Counter[str] = Counter()
+
+        self.upcoming_horizons: list[int] = parse_horizons(
+            entry.options.get(CONF_UPCOMING_HORIZONS, DEFAULT_UPCOMING_HORIZONS),
+            MAX_UPCOMING_DAYS,
+        ) or [UPCOMING_DAYS]
+
+        # Serialised notice set and ETag served by the mirror, built on demand
+        self._mirror_payload: tuple[bytes, str] | None = None
+
+        self.routes = RouteChecker(
+            parse_routes(entry.options.get(CONF_ROUTES, DEFAULT_ROUTES))
+        )
+        self.route_days: int = entry.options.get(CONF_ROUTE_DAYS, DEFAULT_ROUTE_DAYS)
+        self.watchlist = Watchlist(
+            parse_watchlist(entry.options.get(CONF_WATCHLIST, DEFAULT_WATCHLIST))
+        )
+
+        # Written and suppressed state writes per sensor type
+        self.state_write_stats: dict[str, dict[str, int]] = {}
+
+        # Single-flight state for on-demand refreshes
+        self._refresh_in_flight: asyncio.Future[None] | None = None
+        self._last_fetch: datetime | None = None
+
+        # Set up by async_setup_entry when a notify service is configured
+        self.digest: NotificationDigest | None = None
+
+        # Set while refreshes are being profiled
+        self.profiler: RefreshProfiler | None = None
+        self.last_profile: dict[str, Any] | None = None
+
+        # Sorted times at which a notice starts, ends or enters an upcoming,
+        # route or watchlist horizon; listeners are updated at each one without re-polling
+        self._transition_times: list[datetime] = []
+        self._unsub_transition: CALLBACK_TYPE | None = None
+        entry.async_on_unload(self._cancel_transition)
+
         update_interval = timedelta(
             minutes=entry.options.get(CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL)
         )
@@ -43,13 +206,93 @@ class CanalRiverTrustCoordinator(DataUpdateCoordinator[dict[str, Any]]):
         )
 
     async def _async_update_data(self) -> dict[str, Any]:
-        """Fetch data from API."""
+        """Fetch data from API, letting concurrent refresh requests join in."""
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.start()
+
+        self._refresh_in_flight = self.hass.loop.create_future()
+        succeeded = False
+        try:
+            data = await self._async_fetch_data()
+            self._last_fetch = dt_util.utcnow()
+            succeeded = True
+            return data
+        finally:
+            self._refresh_in_flight.set_result(None)
+            self._refresh_in_flight = None
+            if profiler is not None:
+                self._finish_profile(profiler, succeeded)
+
+    def _finish_profile(self, profiler: RefreshProfiler, succeeded: bool) -> None:
+        """Stop profiling a refresh, writing the report once all are done.
+
+        Failed refreshes are discarded, so the profile covers the requested
+        number of successful ones.
+        """
+        if not succeeded:
+            profiler.discard()
+            return
+
+        if profiler.stop():
+            self.profiler = None
+            self.hass.async_create_task(self._async_write_profile(profiler))
+
+    async def async_refresh_coalesced(self, force: bool = False) -> dict[str, Any]:
+        """Refresh on demand, coalescing with other refreshes.
+
+        A call during an in-flight refresh waits for it instead of starting
+        another. Unless forced, a call within REFRESH_COOLDOWN of the last
+        successful fetch returns the cached data.
+        """
+        if self._refresh_in_flight is not None:
+            await asyncio.shield(self._refresh_in_flight)
+            return self._refresh_result(fetched=True, joined=True)
+
+        if (
+            not force
+            and self.last_update_success
+            and self._last_fetch is not None
+            and dt_util.utcnow() - self._last_fetch < REFRESH_COOLDOWN
+        ):
+            return self._refresh_result(fetched=False, joined=False)
+
+        await self.async_refresh()
+        return self._refresh_result(fetched=True, joined=False)
+
+    def _refresh_result(self, fetched: bool, joined: bool) -> dict[str, Any]:
+        """Describe the outcome of an on-demand refresh."""
+        data = self.data or {}
+        return {
+            "fetched": fetched,
+            "joined": joined,
+            "success": self.last_update_success,
+            "last_updated": data.get("last_updated"),
+            "notices": len(data.get("notices", [])),
+        }
+
+    async def _async_fetch_data(self) -> dict[str, Any]:
+        """Fetch, filter and index the notices."""
         try:
             _LOGGER.debug("Starting data update")
             data = await self.api.get_all_data()
+            self.path_trie = build_path_trie(data.get("notices", []))
             
             # Apply filters based on configuration
             filtered_data = self._apply_filters(data)
+
+            self._all_notices = data.get("notices", [])
+            self._build_indexes(filtered_data)
+            if self._demand[DEMAND_CUBE]:
+                self._derived[DEMAND_CUBE] = await self.hass.async_add_executor_job(
+                    NoticeCube.build, self._all_notices, self.notice_times
+                )
+            self._mirror_payload = None
+            self.routes.update(self.path_trie)
+            self.watchlist.update(self.path_trie, data.get("notices", []))
+            self._schedule_transitions()
+            self._track_notice_changes(filtered_data)
+            await self._async_record_history(data.get("notices", []))
             
             # Log the results
             closures_count = len(filtered_data.get("closures", []))
@@ -69,26 +312,336 @@ class CanalRiverTrustCoordinator(DataUpdateCoordinator[dict[str, Any]]):
             _LOGGER.error("Error during data update: %s", err)
             raise UpdateFailed(f"Error communicating with Canal & River Trust API: {err}") from err
 
+    def _build_indexes(self, data: dict[str, Any]) -> None:
+        """Parse notice times and reset the derived structures."""
+        notice_times = {}
+        for notice in data.get("notices", []):
+            start = parse_notice_time(notice.get("start"), dt_util.DEFAULT_TIME_ZONE)
+            if start is None:
+                continue
+            end = parse_notice_time(notice.get("end"), dt_util.DEFAULT_TIME_ZONE)
+            # Treat notices without a usable end as lasting one day
+            if end is None or end <= start:
+                end = start + timedelta(days=1)
+            notice_times[notice_key(notice)] = (start, end)
+        self.notice_times = notice_times
+        self._indexed_data = data
+        self._derived = {}
+
+    def _derive(self, key: Any, build: Callable[[], Any]) -> Any:
+        """Return a derived structure, building it on first use after a refresh."""
+        if key not in self._derived:
+            self._derived[key] = build()
+        return self._derived[key]
+
+    def _category_notices(self, category: str) -> list[dict[str, Any]]:
+        """Return the filtered notices of a calendar or map category."""
+        data = self._indexed_data
+        if category == "notices":
+            return data.get("closures", []) + data.get("stoppages", [])
+        if category == "emergency":
+            return [
+                notice for notice in data.get("notices", []) if notice.get("reasonId") == 4
+            ]
+        return data.get(category, [])
+
+    def calendar_index(self, category: str) -> IntervalTree[dict[str, Any]]:
+        """Return the interval tree of a calendar category."""
+        return self._derive(
+            ("calendar", category),
+            lambda: build_interval_tree(self._category_notices(category), self.notice_times),
+        )
+
+    def map_points(self, category: str) -> list[tuple[float, float, str]]:
+        """Return the (latitude, longitude, reason) points of a category."""
+        return self._derive(
+            ("points", category),
+            lambda: self._build_map_points(self._category_notices(category)),
+        )
+
+    def map_centre(self, category: str) -> tuple[float, float] | None:
+        """Return the centre of a category's notices as (latitude, longitude)."""
+        return self._derive(
+            ("centre", category),
+            lambda: centroid([(lat, lon) for lat, lon, _ in self.map_points(category)]),
+        )
+
+    def map_clusters(self, category: str) -> dict[str, list[dict[str, Any]]]:
+        """Return the map clusters of a category per zoom level."""
+        return self._derive(
+            ("clusters", category),
+            lambda: {
+                level: grid_clusters(self.map_points(category), cell_size)
+                for level, cell_size in CLUSTER_LEVELS.items()
+            },
+        )
+
+    @property
+    def start_index(self) -> StartTimeIndex[dict[str, Any]]:
+        """Return the filtered notices by start time, shared by upcoming sensors."""
+
+        def build() -> StartTimeIndex[dict[str, Any]]:
+            starts = []
+            for notice in self._indexed_data.get("notices", []):
+                if (span := self.notice_times.get(notice_key(notice))) is not None:
+                    starts.append((span[0], notice))
+            return StartTimeIndex(starts)
+
+        return self._derive("start", build)
+
+    @property
+    def notice_counts(self) -> dict[tuple[str | None, str | None, str | None], int]:
+        """Return the notice counts backing the crt_count template function."""
+        return self._derive(
+            "counts", lambda: build_count_index(self._category_notices("notices"))
+        )
+
+    @property
+    def nearest_index(self) -> NearestIndex[dict[str, Any]]:
+        """Return the location index backing the crt_nearest template function."""
+        return self._derive(
+            "nearest", lambda: build_nearest_index(self._category_notices("notices"))
+        )
+
+    @property
+    def cube(self) -> NoticeCube:
+        """Return the rollup of all notices.
+
+        The cube is built in the executor during a refresh while an entity
+        demands it, and otherwise on first use.
+        """
+        return self._derive(
+            DEMAND_CUBE, lambda: NoticeCube.build(self._all_notices, self.notice_times)
+        )
+
+    async def async_get_cube(self) -> NoticeCube:
+        """Return the rollup of all notices, building it in the executor."""
+        if DEMAND_CUBE not in self._derived:
+            self._derived[DEMAND_CUBE] = await self.hass.async_add_executor_job(
+                NoticeCube.build, self._all_notices, self.notice_times
+            )
+        return self._derived[DEMAND_CUBE]
+
+    @callback
+    def async_add_demand(self, demand: str) -> CALLBACK_TYPE:
+        """Register an enabled entity's need for a demand-driven structure.
+
+        Entities that are disabled in the entity registry are never added,
+        so the cube is only prebuilt, and transitions only scheduled, while
+        an enabled entity uses them.
+        """
+        self._demand[demand] += 1
+        if demand == DEMAND_TRANSITIONS and self._demand[demand] == 1:
+            self._schedule_transitions()
+
+        @callback
+        def remove_demand() -> None:
+            self._demand[demand] -= 1
+            if demand == DEMAND_TRANSITIONS and not self._demand[demand]:
+                self._transition_times = []
+                self._cancel_transition()
+
+        return remove_demand
+
+    @property
+    def demand_diagnostics(self) -> dict[str, Any]:
+        """Return the registered demands and the structures built since the last refresh."""
+        return {
+            "demands": {demand: count for demand, count in self._demand.items() if count},
+            "derived": sorted(
+                "_".join(key) if isinstance(key, tuple) else key for key in self._derived
+            ),
+        }
+
+    @staticmethod
+    def _build_map_points(notices: list[dict[str, Any]]) -> list[tuple[float, float, str]]:
+        """Return the located notices as (latitude, longitude, reason) points."""
+        points = []
+        for notice in notices:
+            coords = extract_coordinates(notice.get("geometry"))
+            if coords and len(coords) >= 2:
+                # Convert from [longitude, latitude] to (latitude, longitude)
+                points.append(
+                    (coords[1], coords[0], REASON_MAPPINGS.get(notice.get("reasonId", 0), "Unknown"))
+                )
+        return points
+
+    def _schedule_transitions(self) -> None:
+        """Rebuild the transition times and schedule the next one."""
+        if not self._demand[DEMAND_TRANSITIONS]:
+            # No enabled entity changes state as time passes
+            self._transition_times = []
+            self._cancel_transition()
+            return
+
+        horizons = {timedelta(days=days) for days in self.upcoming_horizons}
+        if self.routes.routes:
+            horizons.add(timedelta(days=self.route_days))
+        if self.watchlist.items:
+            horizons.add(timedelta(days=UPCOMING_DAYS))
+
+        times = set()
+        for start, end in self.notice_times.values():
+            times.update((start, end))
+            times.update(start - horizon for horizon in horizons)
+        self._transition_times = sorted(times)
+        self._schedule_next_transition()
+
+    @callback
+    def _schedule_next_transition(self) -> None:
+        """Schedule a listener update at the next transition time."""
+        self._cancel_transition()
+
+        position = bisect_right(self._transition_times, dt_util.utcnow())
+        if position == len(self._transition_times):
+            return
+
+        self._unsub_transition = async_track_point_in_utc_time(
+            self.hass, self._handle_transition, self._transition_times[position]
+        )
+
+    @callback
+    def _handle_transition(self, now: datetime) -> None:
+        """Update listeners when a notice starts, ends or becomes upcoming."""
+        self._unsub_transition = None
+        _LOGGER.debug("Notice transition at %s, updating entities", now)
+        self.async_update_listeners()
+        self._schedule_next_transition()
+
+    @callback
+    def _cancel_transition(self) -> None:
+        """Cancel the scheduled transition update."""
+        if self._unsub_transition is not None:
+            self._unsub_transition()
+            self._unsub_transition = None
+
+    async def _async_write_profile(self, profiler: RefreshProfiler) -> None:
+        """Write a finished profile report in the executor."""
+        try:
+            self.last_profile = await self.hass.async_add_executor_job(profiler.write_report)
+        except OSError as err:
+            _LOGGER.error("Unable to write refresh profile to %s: %s", profiler.path, err)
+
+    def mirror_payload(self) -> tuple[bytes, str]:
+        """Return the unfiltered notices as GeoJSON with their ETag."""
+        if self._mirror_payload is None:
+            self._mirror_payload = build_feature_collection(
+                (self.data or {}).get("notices", [])
+            )
+        return self._mirror_payload
+
+    @property
+    def notice_snapshot(self) -> dict[str, dict[str, Any]]:
+        """Return the compact notices from the last refresh, keyed by notice_key."""
+        return self._notice_snapshot or {}
+
+    @callback
+    def async_add_change_listener(self, listener: NoticeChangeListener) -> CALLBACK_TYPE:
+        """Listen for added, updated and removed notices after each refresh."""
+        self._change_listeners.append(listener)
+
+        @callback
+        def remove_listener() -> None:
+            self._change_listeners.remove(listener)
+
+        return remove_listener
+
+    async def _async_record_history(self, notices: list[dict[str, Any]]) -> None:
+        """Record the unfiltered notices in the local history store."""
+        try:
+            counts = await self.hass.async_add_executor_job(
+                self.history.record, notices, dt_util.utcnow()
+            )
+        except sqlite3.Error as err:
+            _LOGGER.warning("Unable to record notice history: %s", err)
+            return
+
+        _LOGGER.debug("Notice history updated: %s", counts)
+
+    def _track_notice_changes(self, data: dict[str, Any]) -> None:
+        """Diff the filtered notices against the previous refresh and fire events."""
+        current = {}
+        for notice in data.get("closures", []) + data.get("stoppages", []):
+            current[notice_key(notice)] = compact_notice(notice)
+
+        previous = self._notice_snapshot
+        self._notice_snapshot = current
+
+        # The first refresh only establishes a baseline
+        if previous is None:
+            return
+
+        added, updated, removed = diff_notices(previous, current)
+        total_changes = len(added) + len(updated) + len(removed)
+        if not total_changes:
+            return
+
+        self.notice_revision += 1
+        for listener in list(self._change_listeners):
+            listener(added, updated, removed)
+
+        _LOGGER.debug(
+            "Notice changes: %d added, %d updated, %d removed",
+            len(added), len(updated), len(removed)
+        )
+
+        entry_id = self.entry.entry_id
+        if total_changes > EVENT_BATCH_THRESHOLD:
+            self.hass.bus.async_fire(
+                EVENT_NOTICES_CHANGED,
+                {
+                    "entry_id": entry_id,
+                    "added": added,
+                    "updated": updated,
+                    "removed": removed,
+                },
+            )
+            return
+
+        for event_type, notices in (
+            (EVENT_NOTICE_ADDED, added),
+            (EVENT_NOTICE_UPDATED, updated),
+            (EVENT_NOTICE_REMOVED, removed),
+        ):
+            for notice in notices:
+                self.hass.bus.async_fire(event_type, {"entry_id": entry_id, **notice})
+
     def _apply_filters(self, data: dict[str, Any]) -> dict[str, Any]:
         """Apply user-configured filters to the data."""
+        return self.filter_notices(
+            data,
+            self.entry.options.get(CONF_LOCATION_FILTER),
+            self.entry.options.get(CONF_INCLUDE_PLANNED, True),
+            self.entry.options.get(CONF_INCLUDE_EMERGENCY, True),
+        )
+
+    def filter_notices(
+        self,
+        data: dict[str, Any],
+        location_filter: str | None,
+        include_planned: bool,
+        include_emergency: bool,
+    ) -> dict[str, Any]:
+        """Filter categorized notices by location and type.
+
+        The location filter is matched through the path trie of the current
+        refresh, so data must come from it.
+        """
         filtered_data = data.copy()
         
         # Filter by location if specified
-        location_filter = self.entry.options.get(CONF_LOCATION_FILTER)
         if location_filter:
+            matched = self.path_trie.search(location_filter)
             filtered_data["closures"] = [
                 closure for closure in data["closures"]
-                if self._matches_location_filter(closure, location_filter)
+                if self._matches_location(closure, location_filter, matched)
             ]
             filtered_data["stoppages"] = [
                 stoppage for stoppage in data["stoppages"]
-                if self._matches_location_filter(stoppage, location_filter)
+                if self._matches_location(stoppage, location_filter, matched)
             ]
         
         # Filter by type preferences
-        include_planned = self.entry.options.get(CONF_INCLUDE_PLANNED, True)
-        include_emergency = self.entry.options.get(CONF_INCLUDE_EMERGENCY, True)
-        
         if not include_planned:
             filtered_data["stoppages"] = [
                 stoppage for stoppage in filtered_data["stoppages"]
@@ -103,6 +656,21 @@ class CanalRiverTrustCoordinator(DataUpdateCoordinator[dict[str, Any]]):
         
         return filtered_data
 
+    def _matches_location(
+        self, item: dict[str, Any], location_filter: str, matched: dict[str, Any]
+    ) -> bool:
+        """Check if an item matches the location filter.
+
+        Items with a path are matched through the path trie. Items without
+        one fall back to substring matching on their title, region and
+        waterways.
+        """
+        if notice_key(item) in matched:
+            return True
+        if notice_path(item):
+            return False
+        return self._matches_location_filter(item, location_filter)
+
     def _matches_location_filter(self, item: dict[str, Any], location_filter: str) -> bool:
         """Check if an item matches the location filter."""
         location_fields = ["title", "region", "waterways"]
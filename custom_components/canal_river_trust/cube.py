@@ -0,0 +1,144 @@
+"""Aggregation cube over notices for Canal & River Trust integration.
+
+Once per refresh, notice counts and closure days are rolled up for every
+combination of region, waterway, reason, type and programme, with each
+dimension either fixed or left open (all 32 group-bys). Any total or
+breakdown is then a dictionary lookup.
+
+A notice on several waterways counts once towards each of them, but only
+once in totals that leave the waterway open.
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import datetime
+from itertools import product
+from typing import Any, Iterable
+
+from .const import REASON_MAPPINGS, TYPE_MAPPINGS
+from .routes import BLOCKING_TYPE_IDS
+from .utils import notice_key, notice_waterways
+
+DIMENSIONS = ("region", "waterway", "reason", "type", "programme")
+
+_WATERWAY = DIMENSIONS.index("waterway")
+
+# Every subset of dimensions, as a tuple of booleans per dimension
+_MASKS = list(product((True, False), repeat=len(DIMENSIONS)))
+
+CubeKey = tuple[str | None, ...]
+
+
+def _fold(value: Any) -> str:
+    """Return the lookup form of a dimension value."""
+    return str(value).strip().casefold()
+
+
+class NoticeCube:
+    """Rolled-up notice counts and closure days."""
+
+    def __init__(self) -> None:
+        """Initialize an empty cube."""
+        # [count, closure days] per key, None meaning all values
+        self._cells: dict[CubeKey, list[float]] = {}
+        # Values of a dimension below a key that leaves it open
+        self._children: dict[tuple[CubeKey, int], list[str]] = {}
+        # Display names of folded values per dimension
+        self._names: list[dict[str, str]] = [{} for _ in DIMENSIONS]
+
+    def __len__(self) -> int:
+        """Return the number of cells."""
+        return len(self._cells)
+
+    @classmethod
+    def build(
+        cls,
+        notices: Iterable[dict[str, Any]],
+        times: dict[str, tuple[datetime, datetime]],
+    ) -> NoticeCube:
+        """Roll up notices with their parsed start and end times.
+
+        Closure days are the durations of stoppages and closures, which
+        block navigation.
+        """
+        cube = cls()
+        cells: dict[CubeKey, list[float]] = defaultdict(lambda: [0, 0.0])
+
+        for notice in notices:
+            days = 0.0
+            span = times.get(notice_key(notice))
+            if span is not None and notice.get("typeId") in BLOCKING_TYPE_IDS:
+                days = (span[1] - span[0]).total_seconds() / 86400
+
+            values = [
+                str(notice.get("region") or "Unknown"),
+                None,
+                REASON_MAPPINGS.get(notice.get("reasonId", 0), "Unknown"),
+                TYPE_MAPPINGS.get(notice.get("typeId", 0), "Unknown"),
+                str(notice.get("programmeId") if notice.get("programmeId") is not None else "None"),
+            ]
+            folded = [_fold(value) if value is not None else None for value in values]
+            for dimension, value in enumerate(values):
+                if value is not None:
+                    cube._names[dimension].setdefault(folded[dimension], value)
+
+            waterways = notice_waterways(notice) or ["Unknown"]
+            folded_waterways = {_fold(waterway): waterway for waterway in waterways}
+            for folded_waterway, waterway in folded_waterways.items():
+                cube._names[_WATERWAY].setdefault(folded_waterway, waterway)
+
+            for mask in _MASKS:
+                base = [value if keep else None for value, keep in zip(folded, mask)]
+                targets = folded_waterways if mask[_WATERWAY] else [None]
+                for folded_waterway in targets:
+                    base[_WATERWAY] = folded_waterway
+                    cell = cells[tuple(base)]
+                    cell[0] += 1
+                    cell[1] += days
+
+        cube._cells = dict(cells)
+
+        children: dict[tuple[CubeKey, int], list[str]] = defaultdict(list)
+        for key in cube._cells:
+            for dimension, value in enumerate(key):
+                if value is not None:
+                    parent = key[:dimension] + (None,) + key[dimension + 1:]
+                    children[(parent, dimension)].append(value)
+        cube._children = dict(children)
+        return cube
+
+    @staticmethod
+    def _key(filters: dict[str, Any]) -> CubeKey:
+        """Return the cell key for dimension filters."""
+        unknown = set(filters) - set(DIMENSIONS)
+        if unknown:
+            raise ValueError(f"Unknown dimensions: {', '.join(sorted(unknown))}")
+        return tuple(
+            _fold(filters[dimension]) if filters.get(dimension) not in (None, "") else None
+            for dimension in DIMENSIONS
+        )
+
+    @staticmethod
+    def _measures(cell: list[float] | None) -> dict[str, Any]:
+        """Return the measures of a cell."""
+        if cell is None:
+            return {"count": 0, "closure_days": 0.0}
+        return {"count": int(cell[0]), "closure_days": round(cell[1], 1)}
+
+    def total(self, **filters: Any) -> dict[str, Any]:
+        """Return the count and closure days of notices matching the filters."""
+        return self._measures(self._cells.get(self._key(filters)))
+
+    def breakdown(self, by: str, **filters: Any) -> dict[str, dict[str, Any]]:
+        """Return the measures per value of a dimension, largest count first."""
+        if by not in DIMENSIONS:
+            raise ValueError(f"Unknown dimension: {by}")
+        dimension = DIMENSIONS.index(by)
+        key = self._key({**filters, by: None})
+
+        rows = []
+        for value in self._children.get((key, dimension), []):
+            cell = self._cells[key[:dimension] + (value,) + key[dimension + 1:]]
+            rows.append((self._names[dimension].get(value, value), self._measures(cell)))
+        rows.sort(key=lambda row: row[1]["count"], reverse=True)
+        return dict(rows)
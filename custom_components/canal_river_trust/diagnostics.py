@@ -0,0 +1,44 @@
+"""Diagnostics support for Canal & River Trust integration."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .coordinator import CanalRiverTrustCoordinator
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator: CanalRiverTrustCoordinator = hass.data[DOMAIN][entry.entry_id]
+    data = coordinator.data or {}
+
+    return {
+        "options": dict(entry.options),
+        "last_update_success": coordinator.last_update_success,
+        "last_updated": data.get("last_updated"),
+        "counts": {
+            "notices": len(data.get("notices", [])),
+            "closures": len(data.get("closures", [])),
+            "stoppages": len(data.get("stoppages", [])),
+        },
+        "decode": dict(coordinator.api.metrics),
+        "http": {
+            "transfer": dict(coordinator.api.transfer),
+            "connections": coordinator.connection_stats.as_dict(),
+        },
+        "demand": coordinator.demand_diagnostics,
+        "profile": {
+            "running": coordinator.profiler is not None,
+            "last": coordinator.last_profile,
+        },
+        "digest": coordinator.digest.diagnostics if coordinator.digest else None,
+        "state_writes": {
+            sensor_type: dict(stats)
+            for sensor_type, stats in coordinator.state_write_stats.items()
+        },
+    }
@@ -0,0 +1,270 @@
+"""Notification digests for Canal & River Trust integration.
+
+New emergency and closure notices are collected from the coordinator's
+notice changes and sent as one digest per window through a notify
+service. Notices are identified by notice_key and remembered in a Store,
+so a notice that drops out of the API and comes back, or survives a
+restart, is not announced twice. While digests go out back to back the
+interval between them doubles, up to MAX_DIGEST_WINDOW, and it resets
+once a digest follows a quiet spell.
+
+Notices only count as notified once the notify service call succeeds. A
+failed digest goes back to the queue and is retried like the next digest,
+so repeated failures back off in the same way.
+"""
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_point_in_utc_time
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, REASON_MAPPINGS, TYPE_MAPPINGS
+from .coordinator import CanalRiverTrustCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+STORAGE_KEY = "{domain}_{entry_id}_digest"
+
+# Upper bound of the window under sustained bursts of new notices
+MAX_DIGEST_WINDOW = timedelta(hours=6)
+
+# Notified keys are forgotten after this long
+NOTIFIED_RETENTION = timedelta(days=90)
+
+# Notices listed in a digest message before summarising the rest
+DIGEST_MAX_LINES = 10
+
+DIGEST_REASONS = {REASON_MAPPINGS[4]}
+DIGEST_TYPES = {TYPE_MAPPINGS[2]}
+
+
+def _qualifies(notice: dict[str, Any]) -> bool:
+    """Return True if a compact notice is an emergency or a closure."""
+    return notice.get("reason") in DIGEST_REASONS or notice.get("type") in DIGEST_TYPES
+
+
+def format_digest(notices: list[dict[str, Any]]) -> tuple[str, str]:
+    """Return the title and message of a digest."""
+    emergencies = sum(1 for notice in notices if notice.get("reason") in DIGEST_REASONS)
+    closures = len(notices) - emergencies
+    parts = []
+    if emergencies:
+        parts.append(f"{emergencies} emergency notice{'s' if emergencies != 1 else ''}")
+    if closures:
+        parts.append(f"{closures} closure{'s' if closures != 1 else ''}")
+    title = f"Canal & River Trust: {' and '.join(parts)}"
+
+    lines = []
+    for notice in notices[:DIGEST_MAX_LINES]:
+        start = str(notice.get("start_date") or "")[:10]
+        lines.append(
+            f"• {notice.get('title', 'Unknown')} ({notice.get('region', 'Unknown')})"
+            f" - {notice.get('reason', 'Unknown')} {notice.get('type', 'Unknown').lower()}"
+            + (f" from {start}" if start else "")
+        )
+    if len(notices) > DIGEST_MAX_LINES:
+        lines.append(f"…and {len(notices) - DIGEST_MAX_LINES} more")
+    return title, "\n".join(lines)
+
+
+def _store(hass: HomeAssistant, entry_id: str) -> Store[dict[str, Any]]:
+    """Return the digest store of an entry."""
+    return Store(hass, STORAGE_VERSION, STORAGE_KEY.format(domain=DOMAIN, entry_id=entry_id))
+
+
+async def async_remove_digest(hass: HomeAssistant, entry_id: str) -> None:
+    """Remove the digest state of a deleted entry."""
+    await _store(hass, entry_id).async_remove()
+
+
+class NotificationDigest:
+    """Send rate-limited digests of new emergencies and closures."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        coordinator: CanalRiverTrustCoordinator,
+        notify_service: str,
+        window: timedelta,
+    ) -> None:
+        """Initialize the digest."""
+        self.hass = hass
+        self.coordinator = coordinator
+        self._service = notify_service.removeprefix("notify.")
+        self._window = window
+        self._interval = window
+        self._store = _store(hass, coordinator.entry.entry_id)
+        self._notified: dict[str, str] = {}
+        self._pending: dict[str, dict[str, Any]] = {}
+        # Notices of the digest being sent
+        self._sending: dict[str, dict[str, Any]] = {}
+        self._last_sent: datetime | None = None
+        # Last digest sent or tried, which spaces the next one
+        self._last_attempt: datetime | None = None
+        self._unsub_flush: CALLBACK_TYPE | None = None
+        self._unsub_changes: CALLBACK_TYPE | None = None
+        self.stats = {"digests": 0, "notices": 0, "duplicates": 0, "failures": 0}
+
+    async def async_load(self) -> None:
+        """Load the notified keys and pending notices."""
+        data = await self._store.async_load() or {}
+        self._notified = data.get("notified", {})
+        self._pending = data.get("pending", {})
+        if last_sent := data.get("last_sent"):
+            self._last_sent = dt_util.parse_datetime(last_sent)
+            self._last_attempt = self._last_sent
+
+    @callback
+    def async_start(self) -> None:
+        """Start listening for notice changes."""
+        self._unsub_changes = self.coordinator.async_add_change_listener(self._handle_changes)
+        if self._pending:
+            self._schedule_flush()
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop listening and cancel the pending flush."""
+        if self._unsub_changes is not None:
+            self._unsub_changes()
+            self._unsub_changes = None
+        if self._unsub_flush is not None:
+            self._unsub_flush()
+            self._unsub_flush = None
+
+    @callback
+    def _handle_changes(
+        self,
+        added: list[dict[str, Any]],
+        updated: list[dict[str, Any]],
+        removed: list[dict[str, Any]],
+    ) -> None:
+        """Queue newly added emergencies and closures."""
+        queued = 0
+        for notice in added:
+            if not _qualifies(notice):
+                continue
+            if (
+                notice["key"] in self._notified
+                or notice["key"] in self._pending
+                or notice["key"] in self._sending
+            ):
+                self.stats["duplicates"] += 1
+                continue
+            self._pending[notice["key"]] = notice
+            queued += 1
+
+        if queued:
+            _LOGGER.debug("Queued %d notices for the next digest", queued)
+            self._schedule_flush()
+            self._save()
+
+    @callback
+    def _schedule_flush(self) -> None:
+        """Schedule a flush at the end of the window, if none is scheduled."""
+        if self._unsub_flush is not None:
+            return
+
+        now = dt_util.utcnow()
+        flush_at = now + self._window
+        if self._last_attempt is not None:
+            flush_at = max(flush_at, self._last_attempt + self._interval)
+        self._unsub_flush = async_track_point_in_utc_time(self.hass, self._flush, flush_at)
+
+    @callback
+    def _flush(self, now: datetime) -> None:
+        """Send the pending notices as one digest."""
+        self._unsub_flush = None
+        if not self._pending or self._sending:
+            return
+
+        self._back_off(now)
+        self._last_attempt = now
+        self._sending = self._pending
+        self._pending = {}
+        self.hass.async_create_task(self._async_send(now))
+
+    def _back_off(self, now: datetime) -> None:
+        """Double the interval while digests go out window after window."""
+        if self._last_attempt is not None and now - self._last_attempt <= self._interval * 2:
+            self._interval = max(self._window, min(self._interval * 2, MAX_DIGEST_WINDOW))
+        else:
+            self._interval = self._window
+
+    async def _async_send(self, now: datetime) -> None:
+        """Call the notify service with a digest, re-queueing it on failure."""
+        notices = sorted(
+            self._sending.values(), key=lambda notice: str(notice.get("start_date") or "")
+        )
+        title, message = format_digest(notices)
+        try:
+            await self.hass.services.async_call(
+                "notify", self._service, {"title": title, "message": message}, blocking=True
+            )
+        except Exception as err:  # pylint: disable=broad-except
+            # Notify platforms raise more than HomeAssistantError, and any
+            # failure must put the digest back in the queue
+            self.stats["failures"] += 1
+            # Back in the queue, keeping any newer copy of a notice
+            self._pending = {**self._sending, **self._pending}
+            self._sending = {}
+            _LOGGER.warning(
+                "Unable to send digest through notify.%s, will retry: %s", self._service, err
+            )
+            self._save()
+            if self._unsub_changes is not None:
+                self._schedule_flush()
+            return
+
+        self._sending = {}
+        self._last_sent = now
+        timestamp = now.isoformat()
+        for notice in notices:
+            self._notified[notice["key"]] = timestamp
+        self._prune(now)
+        self._save()
+        if self._pending and self._unsub_changes is not None:
+            self._schedule_flush()
+
+        self.stats["digests"] += 1
+        self.stats["notices"] += len(notices)
+        _LOGGER.debug("Sent digest of %d notices through notify.%s", len(notices), self._service)
+
+    def _prune(self, now: datetime) -> None:
+        """Forget notified keys older than the retention period."""
+        cutoff = (now - NOTIFIED_RETENTION).isoformat()
+        self._notified = {
+            key: notified for key, notified in self._notified.items() if notified >= cutoff
+        }
+
+    @callback
+    def _save(self) -> None:
+        """Save the digest state."""
+        self._store.async_delay_save(self._data_to_save, 10)
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the digest state to store."""
+        return {
+            "notified": self._notified,
+            # A digest being sent is only notified once the call succeeds
+            "pending": {**self._sending, **self._pending},
+            "last_sent": self._last_sent.isoformat() if self._last_sent else None,
+        }
+
+    @property
+    def diagnostics(self) -> dict[str, Any]:
+        """Return the digest state for diagnostics."""
+        return {
+            **self.stats,
+            "service": f"notify.{self._service}",
+            "interval_minutes": self._interval.total_seconds() / 60,
+            "pending": len(self._pending) + len(self._sending),
+            "notified": len(self._notified),
+            "last_sent": self._last_sent.isoformat() if self._last_sent else None,
+        }
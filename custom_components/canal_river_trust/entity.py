@@ -0,0 +1,45 @@
+"""Base entity for Canal & River Trust integration."""
+from __future__ import annotations
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DOMAIN
+from .coordinator import CanalRiverTrustCoordinator
+
+
+class CanalRiverTrustEntity(CoordinatorEntity[CanalRiverTrustCoordinator]):
+    """Base class for Canal & River Trust entities."""
+
+    # Coordinator demands registered while the entity is added
+    _demands: tuple[str, ...] = ()
+
+    def __init__(
+        self,
+        coordinator: CanalRiverTrustCoordinator,
+        entry: ConfigEntry,
+        entity_type: str,
+    ) -> None:
+        """Initialize the entity."""
+        super().__init__(coordinator)
+        self._entry = entry
+        self._attr_unique_id = f"{entry.entry_id}_{entity_type}"
+        self._attr_device_info = {
+            "identifiers": {(DOMAIN, entry.entry_id)},
+            "name": "Canal & River Trust",
+            "manufacturer": "Canal & River Trust",
+            "model": "Waterway Data Feed",
+            "sw_version": "1.0.1",
+            "configuration_url": "https://canalrivertrust.org.uk",
+        }
+
+    async def async_added_to_hass(self) -> None:
+        """Register the entity's demands with the coordinator."""
+        await super().async_added_to_hass()
+        for demand in self._demands:
+            self.async_on_remove(self.coordinator.async_add_demand(demand))
+
+    @property
+    def available(self) -> bool:
+        """Return if entity is available."""
+        return self.coordinator.last_update_success
@@ -0,0 +1,151 @@
+"""Bulk notice export for Canal & River Trust integration.
+
+Exports are written by the export_notices service from an executor job.
+Notices are serialised and written in chunks, so the whole document is
+never built in memory.
+
+Exports only ever go to their own directory, with the extension of their
+format, and never replace anything but an earlier export.
+"""
+from __future__ import annotations
+
+import csv
+import json
+import os
+from typing import Any, Iterator
+
+from .const import (
+    EXPORT_FORMAT_CSV,
+    EXPORT_FORMAT_NDJSON,
+    EXPORT_FORMATS,
+    REASON_MAPPINGS,
+    TYPE_MAPPINGS,
+)
+from .geometry import extract_coordinates, notice_feature
+from .utils import notice_key, notice_path, notice_waterways
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson ships with Home Assistant
+    orjson = None
+
+# Notices serialised per write
+CHUNK_SIZE = 500
+
+CSV_FIELDS = [
+    "key",
+    "title",
+    "region",
+    "waterways",
+    "path",
+    "type",
+    "reason",
+    "programme_id",
+    "start",
+    "end",
+    "state",
+    "latitude",
+    "longitude",
+]
+
+
+def export_path(directory: str, filename: str, export_format: str) -> str:
+    """Return the path of an export file in the export directory.
+
+    The extension is replaced with the format's. Raises ValueError for
+    names that include a directory.
+    """
+    if os.path.basename(filename) != filename or filename in ("", ".", ".."):
+        raise ValueError("The filename must not include a directory")
+
+    root, extension = os.path.splitext(filename)
+    if extension.lstrip(".").lower() not in EXPORT_FORMATS:
+        root = filename
+    if not root:
+        raise ValueError("The filename must not be empty")
+    return os.path.join(directory, f"{root}.{export_format}")
+
+
+def _dumps(value: Any) -> str:
+    """Serialise a value as compact JSON."""
+    if orjson is not None:
+        return orjson.dumps(value).decode()
+    return json.dumps(value, separators=(",", ":"))
+
+
+def _chunks(notices: list[dict[str, Any]]) -> Iterator[list[dict[str, Any]]]:
+    """Yield the notices in chunks of CHUNK_SIZE."""
+    for position in range(0, len(notices), CHUNK_SIZE):
+        yield notices[position:position + CHUNK_SIZE]
+
+
+def _csv_row(notice: dict[str, Any]) -> dict[str, Any]:
+    """Return a flat CSV row for a notice."""
+    coords = extract_coordinates(notice.get("geometry"))
+    return {
+        "key": notice_key(notice),
+        "title": notice.get("title"),
+        "region": notice.get("region"),
+        "waterways": "; ".join(notice_waterways(notice)),
+        "path": " > ".join(notice_path(notice)),
+        "type": TYPE_MAPPINGS.get(notice.get("typeId", 0), "Unknown"),
+        "reason": REASON_MAPPINGS.get(notice.get("reasonId", 0), "Unknown"),
+        "programme_id": notice.get("programmeId"),
+        "start": notice.get("start"),
+        "end": notice.get("end"),
+        "state": notice.get("state"),
+        "latitude": coords[1] if coords and len(coords) >= 2 else None,
+        "longitude": coords[0] if coords and len(coords) >= 2 else None,
+    }
+
+
+def write_export(path: str, export_format: str, notices: list[dict[str, Any]]) -> int:
+    """Write notices to a file and return its size in bytes.
+
+    The file is written under a temporary name and moved into place, so a
+    failed export never leaves a partial file behind. The export directory
+    is created if needed. Raises FileExistsError if the path is taken by
+    anything but an earlier export: a directory, a link or a file with
+    another extension. Blocks, so must be run in the executor.
+    """
+    if os.path.lexists(path) and (
+        os.path.islink(path)
+        or not os.path.isfile(path)
+        or os.path.splitext(path)[1].lstrip(".") not in EXPORT_FORMATS
+    ):
+        raise FileExistsError(f"{path} exists and is not a notice export")
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary_path = f"{path}.tmp"
+    if os.path.lexists(temporary_path):
+        os.remove(temporary_path)
+    try:
+        # Exclusive creation never follows a link planted at the temporary path
+        with open(temporary_path, "x", encoding="utf-8", newline="") as file:
+            if export_format == EXPORT_FORMAT_CSV:
+                writer = csv.DictWriter(file, fieldnames=CSV_FIELDS)
+                writer.writeheader()
+                for chunk in _chunks(notices):
+                    writer.writerows(_csv_row(notice) for notice in chunk)
+            elif export_format == EXPORT_FORMAT_NDJSON:
+                for chunk in _chunks(notices):
+                    file.write(
+                        "".join(_dumps(notice_feature(notice)) + "\n" for notice in chunk)
+                    )
+            else:
+                file.write('{"type":"FeatureCollection","features":[\n')
+                separator = ""
+                for chunk in _chunks(notices):
+                    file.write(
+                        separator
+                        + ",\n".join(_dumps(notice_feature(notice)) for notice in chunk)
+                    )
+                    separator = ",\n"
+                file.write("\n]}\n")
+        os.replace(temporary_path, path)
+    except OSError:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        raise
+
+    return os.path.getsize(path)
@@ -0,0 +1,278 @@
+"""Geometry helpers for Canal & River Trust integration.
+
+Line geometries are simplified when a response is parsed and stored as
+packed arrays of quantised coordinates, so that long stoppages do not carry
+thousands of nested coordinate lists around in memory or in attributes.
+"""
+from __future__ import annotations
+
+import math
+from array import array
+from collections import Counter, defaultdict
+from typing import Any
+
+# Coordinates are stored as integers of 1e-5 degrees (about 1 metre), which is
+# also the precision of the encoded polyline format
+QUANTISATION = 100_000
+
+METRES_PER_DEGREE = 111_320.0
+EARTH_RADIUS_KM = 6371.0088
+
+LINE_TYPES = ("LineString", "MultiLineString")
+
+
+def simplify(points: list[tuple[float, float]], tolerance: float) -> list[tuple[float, float]]:
+    """Simplify a line of (longitude, latitude) points with Douglas-Peucker.
+
+    The tolerance is in metres. Distances use an equirectangular projection
+    around the line, which is accurate enough at the scale of a waterway.
+    """
+    if len(points) < 3 or tolerance <= 0:
+        return list(points)
+
+    scale_x = math.cos(math.radians(points[0][1])) * METRES_PER_DEGREE
+    scale_y = METRES_PER_DEGREE
+    projected = [(lon * scale_x, lat * scale_y) for lon, lat in points]
+
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        x1, y1 = projected[first]
+        x2, y2 = projected[last]
+        dx = x2 - x1
+        dy = y2 - y1
+        length = math.hypot(dx, dy)
+
+        max_distance = 0.0
+        index = first
+        for position in range(first + 1, last):
+            px, py = projected[position]
+            if length == 0:
+                distance = math.hypot(px - x1, py - y1)
+            else:
+                distance = abs(dy * px - dx * py + x2 * y1 - y2 * x1) / length
+            if distance > max_distance:
+                max_distance = distance
+                index = position
+
+        if max_distance > tolerance:
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+
+    return [point for point, kept in zip(points, keep) if kept]
+
+
+def _encode_value(value: int) -> str:
+    """Encode a single signed integer in the polyline format."""
+    value = ~(value << 1) if value < 0 else value << 1
+    chunks = []
+    while value >= 0x20:
+        chunks.append(chr((0x20 | (value & 0x1F)) + 63))
+        value >>= 5
+    chunks.append(chr(value + 63))
+    return "".join(chunks)
+
+
+class PackedPath:
+    """Simplified line geometry stored as quantised integer arrays."""
+
+    __slots__ = ("_coordinates", "_offsets")
+
+    def __init__(self, parts: list[list[tuple[float, float]]]) -> None:
+        """Pack one or more lines of (longitude, latitude) points."""
+        self._coordinates = array("i")
+        self._offsets = array("I", [0])
+        for part in parts:
+            for lon, lat in part:
+                self._coordinates.append(round(lon * QUANTISATION))
+                self._coordinates.append(round(lat * QUANTISATION))
+            self._offsets.append(len(self._coordinates) // 2)
+
+    def __len__(self) -> int:
+        """Return the number of vertices."""
+        return len(self._coordinates) // 2
+
+    @property
+    def nbytes(self) -> int:
+        """Return the memory used by the packed arrays."""
+        return (
+            self._coordinates.itemsize * len(self._coordinates)
+            + self._offsets.itemsize * len(self._offsets)
+        )
+
+    def _part_range(self, part: int) -> range:
+        """Return the vertex indexes of a part."""
+        return range(self._offsets[part], self._offsets[part + 1])
+
+    def parts(self) -> list[list[tuple[float, float]]]:
+        """Return the lines as (longitude, latitude) points."""
+        coordinates = self._coordinates
+        return [
+            [
+                (coordinates[2 * i] / QUANTISATION, coordinates[2 * i + 1] / QUANTISATION)
+                for i in self._part_range(part)
+            ]
+            for part in range(len(self._offsets) - 1)
+        ]
+
+    def representative_point(self) -> list[float] | None:
+        """Return the middle vertex of the first line as [longitude, latitude]."""
+        if not len(self):
+            return None
+        vertices = self._part_range(0)
+        middle = vertices[len(vertices) // 2]
+        return [
+            self._coordinates[2 * middle] / QUANTISATION,
+            self._coordinates[2 * middle + 1] / QUANTISATION,
+        ]
+
+    def encode_polylines(self) -> list[str]:
+        """Return each line in the encoded polyline format (latitude first)."""
+        coordinates = self._coordinates
+        encoded = []
+        for part in range(len(self._offsets) - 1):
+            previous_lat = previous_lon = 0
+            chunks = []
+            for i in self._part_range(part):
+                lon = coordinates[2 * i]
+                lat = coordinates[2 * i + 1]
+                chunks.append(_encode_value(lat - previous_lat))
+                chunks.append(_encode_value(lon - previous_lon))
+                previous_lat, previous_lon = lat, lon
+            encoded.append("".join(chunks))
+        return encoded
+
+    def to_geojson(self) -> dict[str, Any]:
+        """Return the geometry as a GeoJSON object."""
+        parts = [[list(point) for point in part] for part in self.parts()]
+        if len(parts) == 1:
+            return {"type": "LineString", "coordinates": parts[0]}
+        return {"type": "MultiLineString", "coordinates": parts}
+
+
+def pack_geometry(geometry: dict[str, Any], tolerance: float) -> dict[str, Any] | PackedPath:
+    """Simplify and pack line geometries, leaving point geometries untouched."""
+    geometry_type = geometry.get("type")
+    if geometry_type == "GeometryCollection":
+        lines = [
+            part for part in geometry.get("geometries", [])
+            if part.get("type") in LINE_TYPES
+        ]
+        if not lines:
+            return geometry
+    elif geometry_type in LINE_TYPES:
+        lines = [geometry]
+    else:
+        return geometry
+
+    parts = []
+    for line in lines:
+        coordinates = line.get("coordinates") or []
+        raw_parts = coordinates if line.get("type") == "MultiLineString" else [coordinates]
+        for raw_part in raw_parts:
+            points = [(point[0], point[1]) for point in raw_part if len(point) >= 2]
+            if points:
+                parts.append(simplify(points, tolerance))
+
+    return PackedPath(parts) if parts else geometry
+
+
+def notice_feature(notice: dict[str, Any]) -> dict[str, Any]:
+    """Return a notice as a GeoJSON feature, unpacking packed lines."""
+    geometry = notice.get("geometry")
+    if isinstance(geometry, PackedPath):
+        geometry = geometry.to_geojson()
+    feature: dict[str, Any] = {
+        "type": "Feature",
+        "properties": {
+            key: value for key, value in notice.items() if key not in ("geometry", "id")
+        },
+        "geometry": geometry or None,
+    }
+    if "id" in notice:
+        feature["id"] = notice["id"]
+    return feature
+
+
+def extract_coordinates(geometry: dict[str, Any] | PackedPath | None) -> list[float] | None:
+    """Return a representative [longitude, latitude] for a geometry."""
+    if not geometry:
+        return None
+
+    if isinstance(geometry, PackedPath):
+        return geometry.representative_point()
+
+    if geometry.get("type") == "GeometryCollection":
+        geometries = geometry.get("geometries", [])
+        if geometries and geometries[0].get("type") == "Point":
+            return geometries[0].get("coordinates")
+    elif geometry.get("type") == "Point":
+        return geometry.get("coordinates")
+    elif geometry.get("type") in LINE_TYPES:
+        coordinates = geometry.get("coordinates") or []
+        if geometry["type"] == "MultiLineString":
+            coordinates = coordinates[0] if coordinates else []
+        return coordinates[len(coordinates) // 2] if coordinates else None
+
+    return None
+
+
+def centroid(points: list[tuple[float, float]]) -> tuple[float, float] | None:
+    """Return the centroid of (latitude, longitude) points on the sphere."""
+    if not points:
+        return None
+
+    x = y = z = 0.0
+    for lat, lon in points:
+        lat_r = math.radians(lat)
+        lon_r = math.radians(lon)
+        x += math.cos(lat_r) * math.cos(lon_r)
+        y += math.cos(lat_r) * math.sin(lon_r)
+        z += math.sin(lat_r)
+
+    return (
+        round(math.degrees(math.atan2(z, math.hypot(x, y))), 6),
+        round(math.degrees(math.atan2(y, x)), 6),
+    )
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Return the great-circle distance between two points in kilometres."""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    a = (
+        math.sin((phi2 - phi1) / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(1.0, a)))
+
+
+def grid_clusters(
+    points: list[tuple[float, float, str]], cell_size: float
+) -> list[dict[str, Any]]:
+    """Group (latitude, longitude, reason) points into grid cells.
+
+    Returns one summary per occupied cell with the number of points, their
+    centre and the most common reason, largest clusters first.
+    """
+    cells: dict[tuple[int, int], list[tuple[float, float, str]]] = defaultdict(list)
+    for point in points:
+        cells[(math.floor(point[0] / cell_size), math.floor(point[1] / cell_size))].append(point)
+
+    clusters = []
+    for members in cells.values():
+        centre = centroid([(lat, lon) for lat, lon, _ in members])
+        clusters.append(
+            {
+                "count": len(members),
+                "latitude": centre[0],
+                "longitude": centre[1],
+                "reason": Counter(reason for _, _, reason in members).most_common(1)[0][0],
+            }
+        )
+
+    clusters.sort(key=lambda cluster: cluster["count"], reverse=True)
+    return clusters
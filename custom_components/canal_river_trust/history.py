@@ -0,0 +1,257 @@
+"""Local notice history for Canal & River Trust integration.
+
+Notices are recorded in a small SQLite database so that they can still be
+queried after they leave the API window or are edited. All methods block and
+must be run in the executor.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import sqlite3
+from datetime import datetime
+from typing import Any
+
+from .utils import compact_notice, notice_key, notice_waterways
+
+_LOGGER = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS notices (
+    key TEXT PRIMARY KEY,
+    title TEXT,
+    region TEXT,
+    type_id INTEGER,
+    reason_id INTEGER,
+    programme_id INTEGER,
+    start TEXT,
+    end TEXT,
+    state TEXT,
+    fingerprint TEXT NOT NULL,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL,
+    removed_at TEXT
+);
+CREATE TABLE IF NOT EXISTS notice_waterways (
+    key TEXT NOT NULL,
+    waterway TEXT NOT NULL,
+    PRIMARY KEY (key, waterway)
+);
+CREATE TABLE IF NOT EXISTS changes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    key TEXT NOT NULL,
+    changed_at TEXT NOT NULL,
+    change TEXT NOT NULL,
+    data TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_notices_region ON notices (region, start);
+CREATE INDEX IF NOT EXISTS idx_notices_type_start ON notices (type_id, start);
+CREATE INDEX IF NOT EXISTS idx_notices_first_seen ON notices (first_seen);
+CREATE INDEX IF NOT EXISTS idx_notices_removed_at ON notices (removed_at);
+CREATE INDEX IF NOT EXISTS idx_waterways_waterway ON notice_waterways (waterway);
+CREATE INDEX IF NOT EXISTS idx_changes_key ON changes (key, changed_at);
+CREATE INDEX IF NOT EXISTS idx_changes_changed_at ON changes (changed_at);
+"""
+
+
+def _fingerprint(summary: dict[str, Any]) -> str:
+    """Return a fingerprint of a compact notice."""
+    raw = json.dumps(summary, sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class NoticeHistory:
+    """SQLite backed history of notices."""
+
+    def __init__(self, path: str) -> None:
+        """Initialize the history store."""
+        self._path = path
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection, creating the schema on first use."""
+        connection = sqlite3.connect(self._path)
+        connection.row_factory = sqlite3.Row
+        if not self._initialized:
+            connection.executescript(SCHEMA)
+            self._initialized = True
+        return connection
+
+    def record(self, notices: list[dict[str, Any]], now: datetime) -> dict[str, int]:
+        """Record the notices seen in a refresh.
+
+        Returns the number of added, updated and removed notices.
+        """
+        seen_at = now.isoformat()
+        counts = {"added": 0, "updated": 0, "removed": 0}
+
+        connection = self._connect()
+        try:
+            with connection:
+                active = {
+                    row["key"]: row["fingerprint"]
+                    for row in connection.execute(
+                        "SELECT key, fingerprint FROM notices WHERE removed_at IS NULL"
+                    )
+                }
+
+                touched = []
+                changes = []
+                current_keys = set()
+                for notice in notices:
+                    key = notice_key(notice)
+                    if key in current_keys:
+                        continue
+                    current_keys.add(key)
+
+                    summary = compact_notice(notice)
+                    fingerprint = _fingerprint(summary)
+                    if active.get(key) == fingerprint:
+                        touched.append((seen_at, key))
+                        continue
+
+                    change = "updated" if key in active else "added"
+                    counts[change] += 1
+                    connection.execute(
+                        """
+                        INSERT INTO notices (
+                            key, title, region, type_id, reason_id, programme_id,
+                            start, end, state, fingerprint, first_seen, last_seen
+                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        ON CONFLICT (key) DO UPDATE SET
+                            title = excluded.title,
+                            region = excluded.region,
+                            type_id = excluded.type_id,
+                            reason_id = excluded.reason_id,
+                            programme_id = excluded.programme_id,
+                            start = excluded.start,
+                            end = excluded.end,
+                            state = excluded.state,
+                            fingerprint = excluded.fingerprint,
+                            last_seen = excluded.last_seen,
+                            removed_at = NULL
+                        """,
+                        (
+                            key,
+                            notice.get("title"),
+                            str(notice.get("region") or "Unknown"),
+                            notice.get("typeId"),
+                            notice.get("reasonId"),
+                            notice.get("programmeId"),
+                            notice.get("start"),
+                            notice.get("end"),
+                            notice.get("state"),
+                            fingerprint,
+                            seen_at,
+                            seen_at,
+                        ),
+                    )
+                    connection.execute("DELETE FROM notice_waterways WHERE key = ?", (key,))
+                    connection.executemany(
+                        "INSERT OR IGNORE INTO notice_waterways (key, waterway) VALUES (?, ?)",
+                        [(key, waterway) for waterway in notice_waterways(notice)],
+                    )
+                    changes.append((key, seen_at, change, json.dumps(summary, default=str)))
+
+                removed = [key for key in active if key not in current_keys]
+                counts["removed"] = len(removed)
+                connection.executemany(
+                    "UPDATE notices SET removed_at = ? WHERE key = ?",
+                    [(seen_at, key) for key in removed],
+                )
+                changes.extend((key, seen_at, "removed", None) for key in removed)
+
+                connection.executemany(
+                    "UPDATE notices SET last_seen = ? WHERE key = ?", touched
+                )
+                connection.executemany(
+                    "INSERT INTO changes (key, changed_at, change, data) VALUES (?, ?, ?, ?)",
+                    changes,
+                )
+        finally:
+            connection.close()
+
+        return counts
+
+    def waterway_durations(
+        self, since: str | None = None, waterway: str | None = None
+    ) -> list[dict[str, Any]]:
+        """Return the number of notices and mean duration in days per waterway."""
+        query = """
+            SELECT w.waterway AS waterway,
+                   COUNT(*) AS notices,
+                   AVG(julianday(n.end) - julianday(n.start)) AS mean_days
+            FROM notice_waterways AS w
+            JOIN notices AS n ON n.key = w.key
+            WHERE n.start IS NOT NULL AND n.end IS NOT NULL
+        """
+        params: list[Any] = []
+        if since:
+            query += " AND n.start >= ?"
+            params.append(since)
+        if waterway:
+            query += " AND w.waterway = ?"
+            params.append(waterway)
+        query += " GROUP BY w.waterway ORDER BY notices DESC"
+
+        connection = self._connect()
+        try:
+            return [
+                {
+                    "waterway": row["waterway"],
+                    "notices": row["notices"],
+                    "mean_days": round(row["mean_days"], 2) if row["mean_days"] is not None else None,
+                }
+                for row in connection.execute(query, params)
+            ]
+        finally:
+            connection.close()
+
+    def closure_count(
+        self,
+        title: str | None = None,
+        region: str | None = None,
+        waterway: str | None = None,
+        since: str | None = None,
+    ) -> int:
+        """Return how many closures matching the criteria started since a date."""
+        query = "SELECT COUNT(DISTINCT n.key) FROM notices AS n"
+        params: list[Any] = []
+        if waterway:
+            query += " JOIN notice_waterways AS w ON w.key = n.key AND w.waterway = ?"
+            params.append(waterway)
+        query += " WHERE n.type_id = 2"
+        if since:
+            query += " AND n.start >= ?"
+            params.append(since)
+        if region:
+            query += " AND n.region = ?"
+            params.append(region)
+        if title:
+            query += " AND n.title LIKE ?"
+            params.append(f"%{title}%")
+
+        connection = self._connect()
+        try:
+            return connection.execute(query, params).fetchone()[0]
+        finally:
+            connection.close()
+
+    def notice_changes(self, key: str) -> list[dict[str, Any]]:
+        """Return the recorded changes for a notice, oldest first."""
+        connection = self._connect()
+        try:
+            return [
+                {
+                    "changed_at": row["changed_at"],
+                    "change": row["change"],
+                    "notice": json.loads(row["data"]) if row["data"] else None,
+                }
+                for row in connection.execute(
+                    "SELECT changed_at, change, data FROM changes WHERE key = ? ORDER BY id",
+                    (key,),
+                )
+            ]
+        finally:
+            connection.close()
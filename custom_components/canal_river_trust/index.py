@@ -0,0 +1,341 @@
+"""In-memory indexes over notices for Canal & River Trust integration.
+
+Indexes are rebuilt once per refresh by the coordinator so that entities and
+services can answer queries without scanning every notice.
+"""
+from __future__ import annotations
+
+import math
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import datetime
+from itertools import product
+from typing import Any, Generic, Iterable, TypeVar
+
+from .const import REASON_MAPPINGS, TYPE_MAPPINGS
+from .geometry import EARTH_RADIUS_KM, extract_coordinates, haversine_km
+from .utils import notice_key, notice_path, notice_waterways
+
+T = TypeVar("T")
+
+
+class _IntervalNode(Generic[T]):
+    """Node of an interval tree."""
+
+    __slots__ = ("center", "by_start", "by_end", "left", "right")
+
+    def __init__(self, center: datetime) -> None:
+        """Initialize the node."""
+        self.center = center
+        self.by_start: list[tuple[datetime, datetime, T]] = []
+        self.by_end: list[tuple[datetime, datetime, T]] = []
+        self.left: _IntervalNode[T] | None = None
+        self.right: _IntervalNode[T] | None = None
+
+
+class IntervalTree(Generic[T]):
+    """Static centred interval tree over half-open [start, end) intervals.
+
+    Intervals must have end > start.
+    """
+
+    def __init__(self, intervals: Iterable[tuple[datetime, datetime, T]]) -> None:
+        """Build the tree."""
+        items = sorted(intervals, key=lambda item: item[0])
+        self._size = len(items)
+        self._starts = [item[0] for item in items]
+        self._by_start = items
+        self._root = self._build(items)
+
+    def __len__(self) -> int:
+        """Return the number of intervals."""
+        return self._size
+
+    @classmethod
+    def _build(cls, items: list[tuple[datetime, datetime, T]]) -> _IntervalNode[T] | None:
+        """Build a subtree from intervals sorted by start."""
+        if not items:
+            return None
+
+        # The median start always overlaps the centre, so every level shrinks
+        node: _IntervalNode[T] = _IntervalNode(items[len(items) // 2][0])
+        left = []
+        right = []
+        for item in items:
+            if item[1] <= node.center:
+                left.append(item)
+            elif item[0] > node.center:
+                right.append(item)
+            else:
+                node.by_start.append(item)
+
+        node.by_end = sorted(node.by_start, key=lambda item: item[1], reverse=True)
+        node.left = cls._build(left)
+        node.right = cls._build(right)
+        return node
+
+    def overlapping(self, start: datetime, end: datetime) -> list[T]:
+        """Return the values of intervals overlapping [start, end), by start."""
+        found: list[tuple[datetime, datetime, T]] = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+
+            if end <= node.center:
+                for item in node.by_start:
+                    if item[0] >= end:
+                        break
+                    found.append(item)
+                stack.append(node.left)
+            elif start > node.center:
+                for item in node.by_end:
+                    if item[1] <= start:
+                        break
+                    found.append(item)
+                stack.append(node.right)
+            else:
+                found.extend(node.by_start)
+                stack.append(node.left)
+                stack.append(node.right)
+
+        found.sort(key=lambda item: item[0])
+        return [item[2] for item in found]
+
+    def next_starting(self, after: datetime) -> tuple[datetime, datetime, T] | None:
+        """Return the first interval starting strictly after a time."""
+        position = bisect_right(self._starts, after)
+        if position == len(self._by_start):
+            return None
+        return self._by_start[position]
+
+    def starting_between(self, start: datetime, end: datetime) -> list[T]:
+        """Return the values of intervals starting in [start, end), by start."""
+        first = bisect_left(self._starts, start)
+        last = bisect_left(self._starts, end, lo=first)
+        return [item[2] for item in self._by_start[first:last]]
+
+
+class StartTimeIndex(Generic[T]):
+    """Values sorted by start time, for range queries by binary search."""
+
+    def __init__(self, items: Iterable[tuple[datetime, T]]) -> None:
+        """Build the index from (start, value) pairs."""
+        self._items = sorted(items, key=lambda item: item[0])
+        self._starts = [item[0] for item in self._items]
+
+    def __len__(self) -> int:
+        """Return the number of values."""
+        return len(self._items)
+
+    def between(self, start: datetime, end: datetime) -> list[tuple[datetime, T]]:
+        """Return the (start, value) pairs starting in [start, end], by start."""
+        first = bisect_left(self._starts, start)
+        last = bisect_right(self._starts, end, lo=first)
+        return self._items[first:last]
+
+    def count_between(self, start: datetime, end: datetime) -> int:
+        """Return the number of values starting in [start, end]."""
+        first = bisect_left(self._starts, start)
+        return bisect_right(self._starts, end, lo=first) - first
+
+
+def build_interval_tree(
+    notices: Iterable[dict[str, Any]],
+    times: dict[str, tuple[datetime, datetime]],
+) -> IntervalTree[dict[str, Any]]:
+    """Build an interval tree of notices from their parsed start and end times."""
+    intervals = []
+    for notice in notices:
+        span = times.get(notice_key(notice))
+        if span is not None:
+            intervals.append((span[0], span[1], notice))
+    return IntervalTree(intervals)
+
+
+class _TrieNode(Generic[T]):
+    """Node of a path trie."""
+
+    __slots__ = ("name", "children", "values")
+
+    def __init__(self, name: str) -> None:
+        """Initialize the node."""
+        self.name = name
+        self.children: dict[str, _TrieNode[T]] = {}
+        # Every value at or below this node, keyed by notice key
+        self.values: dict[str, T] = {}
+
+
+class PathTrie(Generic[T]):
+    """Trie of region, waterway and structure names.
+
+    Each node keeps every value inserted at or below it, so prefix and name
+    queries return without visiting the subtree. Names are matched
+    case-insensitively.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty trie."""
+        self._root: _TrieNode[T] = _TrieNode("")
+        self._nodes_by_name: dict[str, list[_TrieNode[T]]] = defaultdict(list)
+
+    def __len__(self) -> int:
+        """Return the number of values."""
+        return len(self._root.values)
+
+    def insert(self, path: list[str], key: str, value: T) -> None:
+        """Insert a value under a path of names."""
+        node = self._root
+        node.values[key] = value
+        for name in path:
+            folded = name.casefold()
+            child = node.children.get(folded)
+            if child is None:
+                child = node.children[folded] = _TrieNode(name)
+                self._nodes_by_name[folded].append(child)
+            node = child
+            node.values[key] = value
+
+    def get(self, path: list[str]) -> dict[str, T]:
+        """Return the values at or below a path, e.g. [region, waterway]."""
+        node: _TrieNode[T] | None = self._root
+        for name in path:
+            node = node.children.get(name.casefold())
+            if node is None:
+                return {}
+        return node.values
+
+    def lookup(self, name: str) -> dict[str, T]:
+        """Return the values at or below every node with a name, at any depth."""
+        nodes = self._nodes_by_name.get(name.casefold(), [])
+        if len(nodes) == 1:
+            return nodes[0].values
+        found: dict[str, T] = {}
+        for node in nodes:
+            found.update(node.values)
+        return found
+
+    def search(self, text: str) -> dict[str, T]:
+        """Return the values below every node whose name contains some text.
+
+        Only the distinct names are scanned, not the values.
+        """
+        folded = text.casefold()
+        found: dict[str, T] = {}
+        for name, nodes in self._nodes_by_name.items():
+            if folded in name:
+                for node in nodes:
+                    found.update(node.values)
+        return found
+
+
+def notice_trie_paths(notice: dict[str, Any]) -> list[list[str]]:
+    """Return the region, waterway and structure paths of a notice.
+
+    Notices without a path are placed under each of their waterways.
+    """
+    region = str(notice.get("region") or "").strip()
+    prefix = [region] if region else []
+
+    path = notice_path(notice)
+    if path:
+        if prefix and path[0].casefold() == region.casefold():
+            return [path]
+        return [prefix + path]
+
+    waterways = notice_waterways(notice)
+    if waterways:
+        return [prefix + [waterway] for waterway in waterways]
+    return [prefix] if prefix else []
+
+
+def build_path_trie(notices: Iterable[dict[str, Any]]) -> PathTrie[dict[str, Any]]:
+    """Build a path trie of notices."""
+    trie: PathTrie[dict[str, Any]] = PathTrie()
+    for notice in notices:
+        key = notice_key(notice)
+        for path in notice_trie_paths(notice):
+            trie.insert(path, key, notice)
+    return trie
+
+
+def _count_key(notice: dict[str, Any]) -> tuple[str, str, str]:
+    """Return the case-folded region, reason and type names of a notice."""
+    return (
+        str(notice.get("region") or "Unknown").casefold(),
+        REASON_MAPPINGS.get(notice.get("reasonId", 0), "Unknown").casefold(),
+        TYPE_MAPPINGS.get(notice.get("typeId", 0), "Unknown").casefold(),
+    )
+
+
+def build_count_index(
+    notices: Iterable[dict[str, Any]],
+) -> dict[tuple[str | None, str | None, str | None], int]:
+    """Count notices by region, reason and type, with None as a wildcard.
+
+    Every combination of wildcards is precomputed, so any count is a single
+    dictionary lookup.
+    """
+    counts: dict[tuple[str | None, str | None, str | None], int] = defaultdict(int)
+    for notice in notices:
+        key = _count_key(notice)
+        for mask in product((True, False), repeat=3):
+            counts[tuple(part if keep else None for part, keep in zip(key, mask))] += 1
+    return dict(counts)
+
+
+class NearestIndex(Generic[T]):
+    """Nearest-neighbour search over points sorted by latitude.
+
+    The search starts at the query latitude and walks outwards, stopping
+    once the latitude difference alone exceeds the best distance found.
+    """
+
+    def __init__(self, points: Iterable[tuple[float, float, T]]) -> None:
+        """Build the index from (latitude, longitude, value) points."""
+        self._points = sorted(points, key=lambda point: point[0])
+        self._latitudes = [point[0] for point in self._points]
+
+    def __len__(self) -> int:
+        """Return the number of points."""
+        return len(self._points)
+
+    def nearest(self, latitude: float, longitude: float) -> tuple[float, T] | None:
+        """Return the distance in kilometres to the nearest point and its value."""
+        if not self._points:
+            return None
+
+        km_per_degree = math.radians(EARTH_RADIUS_KM)
+        best: tuple[float, T] | None = None
+        below = bisect_left(self._latitudes, latitude) - 1
+        above = below + 1
+        while below >= 0 or above < len(self._points):
+            below_gap = latitude - self._latitudes[below] if below >= 0 else math.inf
+            above_gap = self._latitudes[above] - latitude if above < len(self._points) else math.inf
+            if best is not None and min(below_gap, above_gap) * km_per_degree > best[0]:
+                break
+
+            if below_gap <= above_gap:
+                point = self._points[below]
+                below -= 1
+            else:
+                point = self._points[above]
+                above += 1
+
+            distance = haversine_km(latitude, longitude, point[0], point[1])
+            if best is None or distance < best[0]:
+                best = (distance, point[2])
+
+        return best
+
+
+def build_nearest_index(notices: Iterable[dict[str, Any]]) -> NearestIndex[dict[str, Any]]:
+    """Build a nearest-neighbour index of notices with coordinates."""
+    points = []
+    for notice in notices:
+        coords = extract_coordinates(notice.get("geometry"))
+        if coords and len(coords) >= 2:
+            # Convert from [longitude, latitude]
+            points.append((coords[1], coords[0], notice))
+    return NearestIndex(points)
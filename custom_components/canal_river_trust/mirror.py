@@ -0,0 +1,144 @@
+"""Notice mirror for fleets of Canal & River Trust installations.
+
+An installation with the mirror option enabled serves its latest notice set
+as GeoJSON at MIRROR_URL. Other installations point their endpoint option
+at it, so the fleet makes one upstream request per interval. Responses carry
+an ETag and unchanged notice sets are answered with 304 Not Modified.
+
+The mirror only serves the query it made upstream. Requests for another
+geometry, other fields or a different date window are rejected rather than
+answered with data that does not match them.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from collections.abc import Mapping
+from datetime import date
+from http import HTTPStatus
+from typing import Any
+
+from aiohttp import web
+
+from homeassistant.components.http import HomeAssistantView
+from homeassistant.core import HomeAssistant, callback
+
+from .const import CONF_MIRROR, DEFAULT_MIRROR, DOMAIN, MIRROR_URL
+from .geometry import notice_feature
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson ships with Home Assistant
+    orjson = None
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_MIRROR_VIEW = f"{DOMAIN}_mirror_view"
+
+# Downstream installations poll on their own interval, so only a short
+# client-side cache lifetime is advertised
+MIRROR_MAX_AGE = 60
+
+# Downstream date windows may be this many days off the mirror's, as they
+# are computed from each installation's own clock and poll time
+MIRROR_DATE_TOLERANCE_DAYS = 1
+
+
+def build_feature_collection(notices: list[dict[str, Any]]) -> tuple[bytes, str]:
+    """Serialise notices as a GeoJSON FeatureCollection.
+
+    Returns the body and its ETag. Serialisation is deterministic, so an
+    unchanged notice set always produces the same ETag.
+    """
+    collection = {
+        "type": "FeatureCollection",
+        "features": [notice_feature(notice) for notice in notices],
+    }
+    if orjson is not None:
+        body = orjson.dumps(collection)
+    else:
+        body = json.dumps(collection, separators=(",", ":")).encode()
+    return body, f'"{hashlib.sha1(body).hexdigest()}"'
+
+
+def check_query(query: Mapping[str, str], served: Mapping[str, str]) -> str | None:
+    """Return why a downstream query cannot be answered, or None if it can.
+
+    The served parameters are those of the mirror's own upstream request.
+    Requested fields may be a subset of the served fields. Parameters the
+    mirror does not know are ignored.
+    """
+    for param in ("consult", "geometry"):
+        if param in query and query[param] != served.get(param):
+            return f"Mirror serves {param}={served.get(param)}, not {query[param]}"
+
+    if "fields" in query:
+        missing = set(query["fields"].split(",")) - set(served.get("fields", "").split(","))
+        if missing:
+            return f"Mirror does not serve fields: {', '.join(sorted(missing))}"
+
+    for param in ("start", "end"):
+        if param not in query:
+            continue
+        try:
+            offset = date.fromisoformat(query[param]) - date.fromisoformat(served[param])
+        except (KeyError, ValueError):
+            return f"Invalid {param} date: {query[param]}"
+        if abs(offset.days) > MIRROR_DATE_TOLERANCE_DAYS:
+            return f"Mirror serves {param}={served[param]}, not {query[param]}"
+
+    return None
+
+
+@callback
+def async_setup_mirror(hass: HomeAssistant) -> None:
+    """Register the mirror view once.
+
+    Views cannot be removed, so the view answers 404 while no loaded entry
+    has the mirror option enabled.
+    """
+    if hass.data.get(DATA_MIRROR_VIEW):
+        return
+    hass.http.register_view(CanalRiverTrustMirrorView())
+    hass.data[DATA_MIRROR_VIEW] = True
+    _LOGGER.info("Serving the notice mirror at %s", MIRROR_URL)
+
+
+class CanalRiverTrustMirrorView(HomeAssistantView):
+    """Serve the notice set of the mirroring entry."""
+
+    url = MIRROR_URL
+    name = f"api:{DOMAIN}:notices"
+    # The notices are public data and downstream installations have no token
+    requires_auth = False
+
+    async def get(self, request: web.Request) -> web.Response:
+        """Return the notices, or 304 when the client's copy is current."""
+        hass: HomeAssistant = request.app["hass"]
+        coordinator = next(
+            (
+                coordinator
+                for coordinator in hass.data.get(DOMAIN, {}).values()
+                if coordinator.entry.options.get(CONF_MIRROR, DEFAULT_MIRROR)
+            ),
+            None,
+        )
+        if coordinator is None or coordinator.data is None or coordinator.api.last_params is None:
+            return web.Response(status=HTTPStatus.NOT_FOUND)
+
+        if (error := check_query(request.query, coordinator.api.last_params)) is not None:
+            return self.json_message(error, HTTPStatus.BAD_REQUEST)
+
+        body, etag = coordinator.mirror_payload()
+        headers = {
+            "ETag": etag,
+            "Cache-Control": f"public, max-age={MIRROR_MAX_AGE}",
+        }
+
+        if etag in request.headers.get("If-None-Match", ""):
+            return web.Response(status=HTTPStatus.NOT_MODIFIED, headers=headers)
+
+        return web.Response(
+            body=body, content_type="application/json", headers=headers
+        )
@@ -0,0 +1,164 @@
+"""Refresh profiling for Canal & River Trust integration.
+
+A RefreshProfiler only exists while a profile has been requested, so
+refreshes pay nothing for it otherwise.
+
+cProfile follows the event loop thread only. Work the refresh hands to the
+executor, such as decoding large responses and building the statistics
+rollup, is not in the function stats; its timings are in the decode
+section of the diagnostics. Other event loop work that runs while a
+refresh awaits is counted in the stats.
+
+tracemalloc only traces during each profiled refresh, so the allocation
+sites of a refresh leave out whatever was allocated between refreshes.
+"""
+from __future__ import annotations
+
+import cProfile
+import io
+import logging
+import pstats
+import time
+import tracemalloc
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+TOP_FUNCTIONS = 40
+TOP_ALLOCATIONS = 25
+SUMMARY_SIZE = 10
+
+
+class RefreshProfiler:
+    """Profile a number of refreshes with cProfile and tracemalloc."""
+
+    def __init__(self, refreshes: int, path: str) -> None:
+        """Initialize the profiler."""
+        self.path = path
+        self.remaining = refreshes
+        self.refreshes = refreshes
+        self.active = False
+        self._profile: cProfile.Profile | None = None
+        self._profiles: list[cProfile.Profile] = []
+        self._allocations: list[list[tuple[str, int, int]]] = []
+        self._durations: list[float] = []
+        self._started_at = 0.0
+        self._started_tracemalloc = False
+        self._baseline: tracemalloc.Snapshot | None = None
+
+    def start(self) -> None:
+        """Start profiling a refresh, unless one is already being profiled."""
+        if self.active:
+            return
+
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as err:
+            # Another profiler holds the hook, so skip this refresh
+            _LOGGER.warning("Unable to profile refresh: %s", err)
+            return
+
+        if tracemalloc.is_tracing():
+            # Traced elsewhere as well, so compare against the start instead
+            self._baseline = tracemalloc.take_snapshot()
+        else:
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        self._profile = profile
+        self._started_at = time.perf_counter()
+        self.active = True
+
+    def discard(self) -> None:
+        """Stop profiling a failed refresh without counting it."""
+        if self._profile is None:
+            return
+
+        self._profile.disable()
+        self._profile = None
+        self.active = False
+        self._stop_tracemalloc()
+
+    def _stop_tracemalloc(self) -> None:
+        """Stop tracemalloc if this profiler started it."""
+        self._baseline = None
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def stop(self) -> bool:
+        """Stop profiling a refresh and return True when all are done."""
+        if self._profile is None:
+            return self.remaining <= 0
+
+        self._profile.disable()
+        self._durations.append(time.perf_counter() - self._started_at)
+        self._profiles.append(self._profile)
+        self._profile = None
+        self.active = False
+
+        snapshot = tracemalloc.take_snapshot()
+        if self._baseline is not None:
+            allocations = [
+                (str(stat.traceback), stat.size_diff, stat.count_diff)
+                for stat in snapshot.compare_to(self._baseline, "lineno")[:TOP_ALLOCATIONS]
+            ]
+        else:
+            allocations = [
+                (str(stat.traceback), stat.size, stat.count)
+                for stat in snapshot.statistics("lineno")[:TOP_ALLOCATIONS]
+            ]
+        self._allocations.append(allocations)
+        self._stop_tracemalloc()
+
+        self.remaining -= 1
+        return self.remaining <= 0
+
+    def write_report(self) -> dict[str, Any]:
+        """Write the collected stats to the report file and return a summary.
+
+        Blocks, so must be run in the executor.
+        """
+        stats_stream = io.StringIO()
+        stats = pstats.Stats(self._profiles[0], stream=stats_stream)
+        for profile in self._profiles[1:]:
+            stats.add(profile)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(TOP_FUNCTIONS)
+
+        with open(self.path, "w", encoding="utf-8") as report:
+            report.write(f"Canal & River Trust refresh profile ({len(self._profiles)} refreshes)\n")
+            report.write(
+                "Durations (s): "
+                + ", ".join(f"{duration:.3f}" for duration in self._durations)
+                + "\n\n"
+            )
+            report.write(stats_stream.getvalue())
+            for number, allocations in enumerate(self._allocations, start=1):
+                report.write(f"\nTop allocation sites during refresh {number}\n")
+                for site, size, count in allocations:
+                    report.write(f"{size / 1024:10.1f} KiB {count:8d} blocks  {site}\n")
+
+        top_functions = []
+        for func, (_, calls, _, cumulative, _) in sorted(
+            stats.stats.items(), key=lambda item: item[1][3], reverse=True
+        )[:SUMMARY_SIZE]:
+            filename, line, name = func
+            top_functions.append(
+                {
+                    "function": f"{filename}:{line}({name})",
+                    "calls": calls,
+                    "cumulative_s": round(cumulative, 4),
+                }
+            )
+
+        _LOGGER.info("Refresh profile written to %s", self.path)
+        return {
+            "path": self.path,
+            "refreshes": len(self._profiles),
+            "durations_s": [round(duration, 3) for duration in self._durations],
+            "top_functions": top_functions,
+            "top_allocations": [
+                {"site": site, "size_kib": round(size / 1024, 1), "blocks": count}
+                for site, size, count in (self._allocations[-1] if self._allocations else [])[:SUMMARY_SIZE]
+            ],
+        }
@@ -0,0 +1,93 @@
+"""Cruise route blockage checks for Canal & River Trust integration.
+
+A route is an ordered list of region, waterway or structure names. Each
+segment is looked up in the coordinator's path trie, so a route is checked
+with one dictionary lookup per segment. Every route is re-evaluated after
+each refresh, so the notices it reports are always those of the latest
+refresh.
+"""
+from __future__ import annotations
+
+import logging
+from datetime import datetime
+from typing import Any
+
+from .index import PathTrie
+from .utils import compact_notice, notice_key
+
+_LOGGER = logging.getLogger(__name__)
+
+# Stoppages and closures block navigation; restrictions and advisories do not
+BLOCKING_TYPE_IDS = {1, 2}
+
+
+def parse_routes(text: str | None) -> dict[str, list[str]]:
+    """Parse configured routes.
+
+    Routes are separated by semicolons or new lines and written as
+    "Name: Waterway A > Lock 5 > Waterway B".
+    """
+    routes: dict[str, list[str]] = {}
+    if not text:
+        return routes
+
+    for line in text.replace(";", "\n").splitlines():
+        name, separator, segments = line.partition(":")
+        if not separator:
+            continue
+        parsed = [segment.strip() for segment in segments.split(">") if segment.strip()]
+        if name.strip() and parsed:
+            routes[name.strip()] = parsed
+
+    return routes
+
+
+class RouteChecker:
+    """Keep the blocking notices of configured routes up to date."""
+
+    def __init__(self, routes: dict[str, list[str]]) -> None:
+        """Initialize the route checker."""
+        self.routes = routes
+        self._trie: PathTrie[dict[str, Any]] = PathTrie()
+        self._blocking: dict[str, list[dict[str, Any]]] = {name: [] for name in routes}
+
+    def update(self, trie: PathTrie[dict[str, Any]]) -> None:
+        """Switch to a new path trie and re-evaluate every route."""
+        self._trie = trie
+        self._blocking = {
+            name: self.find_blocking(segments) for name, segments in self.routes.items()
+        }
+
+    def _segment_notices(self, segment: str) -> list[dict[str, Any]]:
+        """Return the blocking notices at or below a segment."""
+        return [
+            notice for notice in self._trie.lookup(segment).values()
+            if notice.get("typeId") in BLOCKING_TYPE_IDS
+        ]
+
+    def find_blocking(self, segments: list[str]) -> list[dict[str, Any]]:
+        """Return the blocking notices on any segment of a route, by start date."""
+        found: dict[str, dict[str, Any]] = {}
+        for segment in segments:
+            for notice in self._segment_notices(segment):
+                found.setdefault(notice_key(notice), notice)
+        return sorted(found.values(), key=lambda notice: str(notice.get("start") or ""))
+
+    def blocking(self, name: str) -> list[dict[str, Any]]:
+        """Return the blocking notices of a configured route."""
+        return self._blocking.get(name, [])
+
+
+def within_window(
+    notices: list[dict[str, Any]],
+    times: dict[str, tuple[datetime, datetime]],
+    start: datetime,
+    end: datetime,
+) -> list[dict[str, Any]]:
+    """Return compact notices whose dates overlap [start, end)."""
+    result = []
+    for notice in notices:
+        span = times.get(notice_key(notice))
+        if span is not None and span[0] < end and span[1] > start:
+            result.append(compact_notice(notice))
+    return result
@@ -2,22 +2,36 @@
 from __future__ import annotations
 
 import logging
+from datetime import datetime, timedelta
 from typing import Any
 
 from homeassistant.components.sensor import SensorEntity, SensorStateClass
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.helpers.json import json_bytes
+from homeassistant.util import dt as dt_util
+from homeassistant.util import slugify
 
 from .const import (
+    ATTRIBUTE_FORMAT_COLUMNAR,
     ATTR_LAST_UPDATED,
     ATTR_NOTICES,
+    CONF_ATTRIBUTE_FORMAT,
+    CONF_NOTICE_LISTS,
+    DEFAULT_ATTRIBUTE_FORMAT,
+    DEFAULT_NOTICE_LISTS,
     DOMAIN,
     REASON_MAPPINGS,
     TYPE_MAPPINGS,
+    UPCOMING_DAYS,
 )
-from .coordinator import CanalRiverTrustCoordinator
+from .coordinator import DEMAND_CUBE, DEMAND_TRANSITIONS, CanalRiverTrustCoordinator
+from .cube import DIMENSIONS
+from .entity import CanalRiverTrustEntity
+from .geometry import PackedPath, extract_coordinates
+from .routes import within_window
+from .utils import to_columnar
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -35,15 +49,31 @@ async def async_setup_entry(
         CanalRiverTrustStoppagesSensor(coordinator, entry),
         CanalRiverTrustEmergencySensor(coordinator, entry),
         CanalRiverTrustRegionalSensor(coordinator, entry),
-        CanalRiverTrustUpcomingSensor(coordinator, entry),
     ]
+    sensors.extend(
+        CanalRiverTrustBreakdownSensor(coordinator, entry, dimension)
+        for dimension in DIMENSIONS
+        if dimension != "region"
+    )
+    sensors.extend(
+        CanalRiverTrustUpcomingSensor(coordinator, entry, days)
+        for days in coordinator.upcoming_horizons
+    )
+    sensors.extend(
+        CanalRiverTrustRouteSensor(coordinator, entry, name)
+        for name in coordinator.routes.routes
+    )
 
     async_add_entities(sensors)
 
 
-class CanalRiverTrustSensorBase(CoordinatorEntity, SensorEntity):
+class CanalRiverTrustSensorBase(CanalRiverTrustEntity, SensorEntity):
     """Base class for Canal & River Trust sensors."""
 
+    # Also write state whenever the filtered notices change, as templates
+    # using the template functions track these sensors
+    _tracks_notices = False
+
     def __init__(
         self,
         coordinator: CanalRiverTrustCoordinator,
@@ -51,58 +81,93 @@ class CanalRiverTrustSensorBase(CoordinatorEntity, SensorEntity):
         sensor_type: str,
     ) -> None:
         """Initialize the sensor."""
-        super().__init__(coordinator)
-        self._entry = entry
+        super().__init__(coordinator, entry, sensor_type)
         self._sensor_type = sensor_type
-        self._attr_unique_id = f"{entry.entry_id}_{sensor_type}"
-        self._attr_device_info = {
-            "identifiers": {(DOMAIN, entry.entry_id)},
-            "name": "Canal & River Trust",
-            "manufacturer": "Canal & River Trust",
-            "model": "Waterway Data Feed",
-            "sw_version": "1.0.1",
-            "configuration_url": "https://canalrivertrust.org.uk",
-        }
+        self._columnar = (
+            entry.options.get(CONF_ATTRIBUTE_FORMAT, DEFAULT_ATTRIBUTE_FORMAT)
+            == ATTRIBUTE_FORMAT_COLUMNAR
+        )
+        # Full notice lists and clusters are opt-in, the state is the count
+        self._notice_lists = entry.options.get(CONF_NOTICE_LISTS, DEFAULT_NOTICE_LISTS)
+        self._attributes: dict[str, Any] | None = None
+        self._fingerprint: int | None = None
+        self._write_stats = coordinator.state_write_stats.setdefault(
+            sensor_type, {"written": 0, "suppressed": 0}
+        )
+
+    def _build_attributes(self) -> dict[str, Any]:
+        """Build the state attributes."""
+        return {}
 
     @property
-    def available(self) -> bool:
-        """Return if entity is available."""
-        return self.coordinator.last_update_success
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the state attributes, built once per update."""
+        if self._attributes is None:
+            self._attributes = self._build_attributes()
+        return self._attributes
+
+    def _format_notices(self, rows: list[dict[str, Any]]) -> list[dict[str, Any]] | dict[str, Any]:
+        """Return a notice list in the configured attribute format."""
+        return to_columnar(rows) if self._columnar else rows
 
-    def _extract_coordinates(self, geometry: dict[str, Any] | None) -> list[float] | None:
+    def _state_fingerprint(self) -> int:
+        """Return a fingerprint of the state and attributes.
+
+        The last_updated attribute is left out so that a refresh that
+        returns identical notices does not count as a change.
+        """
+        attributes = {
+            key: value for key, value in self.extra_state_attributes.items()
+            if key != ATTR_LAST_UPDATED
+        }
+        revision = self.coordinator.notice_revision if self._tracks_notices else None
+        return hash((self.available, self.native_value, json_bytes(attributes), revision))
+
+    async def async_added_to_hass(self) -> None:
+        """Fingerprint the state that is written when the entity is added."""
+        await super().async_added_to_hass()
+        self._fingerprint = self._state_fingerprint()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only when the value or attributes changed."""
+        self._attributes = None
+        fingerprint = self._state_fingerprint()
+        if fingerprint == self._fingerprint:
+            self._write_stats["suppressed"] += 1
+            return
+
+        self._fingerprint = fingerprint
+        self._write_stats["written"] += 1
+        self.async_write_ha_state()
+
+    def _extract_coordinates(self, geometry: dict[str, Any] | PackedPath | None) -> list[float] | None:
         """Extract coordinates from geometry object."""
-        if not geometry:
-            return None
-        
-        if geometry.get("type") == "GeometryCollection":
-            geometries = geometry.get("geometries", [])
-            if geometries and geometries[0].get("type") == "Point":
-                return geometries[0].get("coordinates")
-        elif geometry.get("type") == "Point":
-            return geometry.get("coordinates")
-        
-        return None
-
-    def _get_representative_location(self, notices: list[dict[str, Any]]) -> tuple[float, float] | None:
-        """Get a representative location from a list of notices."""
-        valid_coords = []
-        for notice in notices:
-            coords = self._extract_coordinates(notice.get("geometry"))
-            if coords and len(coords) >= 2:
-                # Convert from [longitude, latitude] to [latitude, longitude]
-                valid_coords.append((coords[1], coords[0]))
-        
-        if not valid_coords:
-            return None
-        
-        # Return the first valid coordinate as representative location
-        # In future versions, this could be enhanced to return center of all points
-        return valid_coords[0]
+        return extract_coordinates(geometry)
+
+    def _add_line(self, info: dict[str, Any], geometry: Any) -> dict[str, Any]:
+        """Add encoded polylines to notice info when line geometry is available."""
+        if isinstance(geometry, PackedPath):
+            info["line"] = geometry.encode_polylines()
+        return info
+
+    def _map_location(self, category: str) -> tuple[float, float] | None:
+        """Return the centre of a category's notices as (latitude, longitude)."""
+        return self.coordinator.map_centre(category)
+
+    def _map_clusters(self, category: str) -> dict[str, list[dict[str, Any]]]:
+        """Return the map clusters of a category's notices per zoom level."""
+        return self.coordinator.map_clusters(category)
 
 
 class CanalRiverTrustClosuresSensor(CanalRiverTrustSensorBase):
     """Sensor for Canal & River Trust closures."""
 
+    # Map clusters are rebuilt every refresh and not worth recording
+    _unrecorded_attributes = frozenset({"clusters"})
+    # Tracked by templates using the template functions
+    _tracks_notices = True
+
     def __init__(
         self,
         coordinator: CanalRiverTrustCoordinator,
@@ -121,18 +186,20 @@ class CanalRiverTrustClosuresSensor(CanalRiverTrustSensorBase):
             return 0
         return len(self.coordinator.data.get("closures", []))
 
-    @property
-    def extra_state_attributes(self) -> dict[str, Any]:
-        """Return the state attributes."""
+    def _build_attributes(self) -> dict[str, Any]:
+        """Build the state attributes."""
         if self.coordinator.data is None:
             return {}
 
         closures = self.coordinator.data.get("closures", [])
         last_updated = self.coordinator.data.get("last_updated")
+        if not self._notice_lists:
+            return {ATTR_LAST_UPDATED: last_updated}
 
         attributes = {
             ATTR_LAST_UPDATED: last_updated,
             "closures": [],
+            "clusters": self._map_clusters("closures"),
         }
 
         for closure in closures:
@@ -147,8 +214,9 @@ class CanalRiverTrustClosuresSensor(CanalRiverTrustSensorBase):
                 "state": closure.get("state", "Unknown"),
                 "coordinates": self._extract_coordinates(closure.get("geometry")),
             }
-            attributes["closures"].append(closure_info)
+            attributes["closures"].append(self._add_line(closure_info, closure.get("geometry")))
 
+        attributes["closures"] = self._format_notices(attributes["closures"])
         return attributes
 
     @property
@@ -156,9 +224,8 @@ class CanalRiverTrustClosuresSensor(CanalRiverTrustSensorBase):
         """Return latitude for map display."""
         if self.coordinator.data is None:
             return None
-        
-        closures = self.coordinator.data.get("closures", [])
-        location = self._get_representative_location(closures)
+
+        location = self._map_location("closures")
         return location[0] if location else None
 
     @property
@@ -166,15 +233,19 @@ class CanalRiverTrustClosuresSensor(CanalRiverTrustSensorBase):
         """Return longitude for map display."""
         if self.coordinator.data is None:
             return None
-        
-        closures = self.coordinator.data.get("closures", [])
-        location = self._get_representative_location(closures)
+
+        location = self._map_location("closures")
         return location[1] if location else None
 
 
 class CanalRiverTrustStoppagesSensor(CanalRiverTrustSensorBase):
     """Sensor for Canal & River Trust stoppages."""
 
+    # Map clusters are rebuilt every refresh and not worth recording
+    _unrecorded_attributes = frozenset({"clusters"})
+    # Tracked by templates using the template functions
+    _tracks_notices = True
+
     def __init__(
         self,
         coordinator: CanalRiverTrustCoordinator,
@@ -193,18 +264,20 @@ class CanalRiverTrustStoppagesSensor(CanalRiverTrustSensorBase):
             return 0
         return len(self.coordinator.data.get("stoppages", []))
 
-    @property
-    def extra_state_attributes(self) -> dict[str, Any]:
-        """Return the state attributes."""
+    def _build_attributes(self) -> dict[str, Any]:
+        """Build the state attributes."""
         if self.coordinator.data is None:
             return {}
 
         stoppages = self.coordinator.data.get("stoppages", [])
         last_updated = self.coordinator.data.get("last_updated")
+        if not self._notice_lists:
+            return {ATTR_LAST_UPDATED: last_updated}
 
         attributes = {
             ATTR_LAST_UPDATED: last_updated,
             "stoppages": [],
+            "clusters": self._map_clusters("stoppages"),
         }
 
         for stoppage in stoppages:
@@ -219,8 +292,9 @@ class CanalRiverTrustStoppagesSensor(CanalRiverTrustSensorBase):
                 "state": stoppage.get("state", "Unknown"),
                 "coordinates": self._extract_coordinates(stoppage.get("geometry")),
             }
-            attributes["stoppages"].append(stoppage_info)
+            attributes["stoppages"].append(self._add_line(stoppage_info, stoppage.get("geometry")))
 
+        attributes["stoppages"] = self._format_notices(attributes["stoppages"])
         return attributes
 
     @property
@@ -228,9 +302,8 @@ class CanalRiverTrustStoppagesSensor(CanalRiverTrustSensorBase):
         """Return latitude for map display."""
         if self.coordinator.data is None:
             return None
-        
-        stoppages = self.coordinator.data.get("stoppages", [])
-        location = self._get_representative_location(stoppages)
+
+        location = self._map_location("stoppages")
         return location[0] if location else None
 
     @property
@@ -238,9 +311,8 @@ class CanalRiverTrustStoppagesSensor(CanalRiverTrustSensorBase):
         """Return longitude for map display."""
         if self.coordinator.data is None:
             return None
-        
-        stoppages = self.coordinator.data.get("stoppages", [])
-        location = self._get_representative_location(stoppages)
+
+        location = self._map_location("stoppages")
         return location[1] if location else None
 
 
@@ -269,11 +341,12 @@ class CanalRiverTrustEmergencySensor(CanalRiverTrustSensorBase):
                             if notice.get("reasonId") == 4)  # Emergency reason ID
         return emergency_count
 
-    @property
-    def extra_state_attributes(self) -> dict[str, Any]:
-        """Return the state attributes."""
+    def _build_attributes(self) -> dict[str, Any]:
+        """Build the state attributes."""
         if self.coordinator.data is None:
             return {}
+        if not self._notice_lists:
+            return {ATTR_LAST_UPDATED: self.coordinator.data.get("last_updated")}
 
         all_notices = self.coordinator.data.get("notices", [])
         emergency_notices = [notice for notice in all_notices
@@ -296,11 +369,15 @@ class CanalRiverTrustEmergencySensor(CanalRiverTrustSensorBase):
             }
             attributes["emergency_issues"].append(notice_info)
 
+        attributes["emergency_issues"] = self._format_notices(attributes["emergency_issues"])
         return attributes
 
 
 class CanalRiverTrustRegionalSensor(CanalRiverTrustSensorBase):
-    """Sensor showing regional breakdown of issues."""
+    """Sensor showing regional breakdown of issues, disabled by default."""
+
+    _attr_entity_registry_enabled_default = False
+    _demands = (DEMAND_CUBE,)
 
     def __init__(
         self,
@@ -319,136 +396,189 @@ class CanalRiverTrustRegionalSensor(CanalRiverTrustSensorBase):
         if self.coordinator.data is None:
             return 0
 
-        all_notices = self.coordinator.data.get("notices", [])
-        regions = set(notice.get("region", "Unknown") for notice in all_notices)
-        return len(regions)
+        return len(self.coordinator.cube.breakdown("region"))
 
-    @property
-    def extra_state_attributes(self) -> dict[str, Any]:
-        """Return the state attributes."""
+    def _build_attributes(self) -> dict[str, Any]:
+        """Build the state attributes."""
         if self.coordinator.data is None:
             return {}
 
-        all_notices = self.coordinator.data.get("notices", [])
+        cube = self.coordinator.cube
+        closures = cube.breakdown("region", type=TYPE_MAPPINGS[2])
         regional_breakdown = {}
-
-        for notice in all_notices:
-            region = notice.get("region", "Unknown")
-            if region not in regional_breakdown:
-                regional_breakdown[region] = {"closures": 0, "stoppages": 0, "total": 0}
-
-            regional_breakdown[region]["total"] += 1
-            if notice.get("typeId") == 2:  # Closure
-                regional_breakdown[region]["closures"] += 1
-            else:
-                regional_breakdown[region]["stoppages"] += 1
+        for region, totals in cube.breakdown("region").items():
+            closure_count = closures.get(region, {}).get("count", 0)
+            regional_breakdown[region] = {
+                "closures": closure_count,
+                "stoppages": totals["count"] - closure_count,
+                "total": totals["count"],
+                "closure_days": totals["closure_days"],
+            }
 
         attributes = {
             ATTR_LAST_UPDATED: self.coordinator.data.get("last_updated"),
             "regional_breakdown": regional_breakdown,
-            "most_affected_region": max(regional_breakdown.keys(),
-                                      key=lambda k: regional_breakdown[k]["total"])
-                                    if regional_breakdown else "None",
+            # Breakdowns are ordered by total, largest first
+            "most_affected_region": next(iter(regional_breakdown), "None"),
         }
 
         return attributes
 
 
+class CanalRiverTrustBreakdownSensor(CanalRiverTrustSensorBase):
+    """Sensor breaking notices down by one dimension, disabled by default."""
+
+    _attr_entity_registry_enabled_default = False
+    _demands = (DEMAND_CUBE,)
+
+    def __init__(
+        self,
+        coordinator: CanalRiverTrustCoordinator,
+        entry: ConfigEntry,
+        dimension: str,
+    ) -> None:
+        """Initialize the breakdown sensor."""
+        super().__init__(coordinator, entry, f"breakdown_{dimension}")
+        self._dimension = dimension
+        self._attr_name = f"Canal & River Trust Notices by {dimension.title()}"
+        self._attr_icon = "mdi:chart-box"
+        self._attr_state_class = SensorStateClass.MEASUREMENT
+
+    @property
+    def native_value(self) -> int:
+        """Return the number of distinct values with notices."""
+        if self.coordinator.data is None:
+            return 0
+
+        return len(self.coordinator.cube.breakdown(self._dimension))
+
+    def _build_attributes(self) -> dict[str, Any]:
+        """Build the state attributes."""
+        if self.coordinator.data is None:
+            return {}
+
+        return {
+            ATTR_LAST_UPDATED: self.coordinator.data.get("last_updated"),
+            "breakdown": self.coordinator.cube.breakdown(self._dimension),
+        }
+
+
 class CanalRiverTrustUpcomingSensor(CanalRiverTrustSensorBase):
-    """Sensor for upcoming Canal & River Trust issues."""
+    """Sensor for Canal & River Trust issues starting within a horizon, disabled by default."""
+
+    _attr_entity_registry_enabled_default = False
+    _demands = (DEMAND_TRANSITIONS,)
 
     def __init__(
         self,
         coordinator: CanalRiverTrustCoordinator,
         entry: ConfigEntry,
+        days: int = UPCOMING_DAYS,
     ) -> None:
         """Initialize the upcoming sensor."""
-        super().__init__(coordinator, entry, "upcoming")
-        self._attr_name = "Canal & River Trust Upcoming Issues"
+        # The original 7 day sensor keeps its unique ID
+        super().__init__(
+            coordinator, entry, "upcoming" if days == UPCOMING_DAYS else f"upcoming_{days}d"
+        )
+        self._days = days
+        self._attr_name = (
+            "Canal & River Trust Upcoming Issues"
+            if days == UPCOMING_DAYS
+            else f"Canal & River Trust Upcoming Issues {days} Days"
+        )
         self._attr_icon = "mdi:calendar-clock"
         self._attr_state_class = SensorStateClass.MEASUREMENT
 
+    def _window(self) -> tuple[datetime, datetime]:
+        """Return the current horizon."""
+        now = dt_util.now()
+        return now, now + timedelta(days=self._days)
+
     @property
     def native_value(self) -> int:
         """Return the number of upcoming issues."""
         if self.coordinator.data is None:
             return 0
 
-        from datetime import datetime, timedelta
-
-        all_notices = self.coordinator.data.get("notices", [])
-        upcoming_count = 0
-        now = datetime.now()
-        next_week = now + timedelta(days=7)
-
-        for notice in all_notices:
-            start_date_str = notice.get("start")
-            if start_date_str:
-                try:
-                    # Parse the date string and make it timezone-naive for comparison
-                    if 'T' in start_date_str:
-                        # ISO format with time
-                        start_date = datetime.fromisoformat(start_date_str.replace('Z', '+00:00'))
-                        start_date = start_date.replace(tzinfo=None)  # Make timezone-naive
-                    else:
-                        # Date only format
-                        start_date = datetime.strptime(start_date_str, '%Y-%m-%d')
-
-                    if now <= start_date <= next_week:
-                        upcoming_count += 1
-                except (ValueError, AttributeError):
-                    continue
-
-        return upcoming_count
+        return self.coordinator.start_index.count_between(*self._window())
 
-    @property
-    def extra_state_attributes(self) -> dict[str, Any]:
-        """Return the state attributes."""
+    def _build_attributes(self) -> dict[str, Any]:
+        """Build the state attributes."""
         if self.coordinator.data is None:
             return {}
 
-        from datetime import datetime, timedelta
-
-        all_notices = self.coordinator.data.get("notices", [])
+        now, horizon = self._window()
         upcoming_notices = []
-        now = datetime.now()
-        next_week = now + timedelta(days=7)
-
-        for notice in all_notices:
-            start_date_str = notice.get("start")
-            if start_date_str:
-                try:
-                    # Parse the date string and make it timezone-naive for comparison
-                    if 'T' in start_date_str:
-                        # ISO format with time
-                        start_date = datetime.fromisoformat(start_date_str.replace('Z', '+00:00'))
-                        start_date = start_date.replace(tzinfo=None)  # Make timezone-naive
-                    else:
-                        # Date only format
-                        start_date = datetime.strptime(start_date_str, '%Y-%m-%d')
-
-                    if now <= start_date <= next_week:
-                        notice_info = {
-                            "title": notice.get("title", "Unknown"),
-                            "region": notice.get("region", "Unknown"),
-                            "waterways": notice.get("waterways", "Unknown"),
-                            "type": TYPE_MAPPINGS.get(notice.get("typeId", 0), "Unknown"),
-                            "reason": REASON_MAPPINGS.get(notice.get("reasonId", 0), "Unknown"),
-                            "start_date": notice.get("start"),
-                            "end_date": notice.get("end"),
-                            "days_until": (start_date - now).days,
-                            "coordinates": self._extract_coordinates(notice.get("geometry")),
-                        }
-                        upcoming_notices.append(notice_info)
-                except (ValueError, AttributeError):
-                    continue
-
-        # Sort by start date
-        upcoming_notices.sort(key=lambda x: x.get("start_date", ""))
+        # Already sorted by start date
+        for start_date, notice in self.coordinator.start_index.between(now, horizon):
+            notice_info = {
+                "title": notice.get("title", "Unknown"),
+                "region": notice.get("region", "Unknown"),
+                "waterways": notice.get("waterways", "Unknown"),
+                "type": TYPE_MAPPINGS.get(notice.get("typeId", 0), "Unknown"),
+                "reason": REASON_MAPPINGS.get(notice.get("reasonId", 0), "Unknown"),
+                "start_date": notice.get("start"),
+                "end_date": notice.get("end"),
+                "days_until": (start_date - now).days,
+                "coordinates": self._extract_coordinates(notice.get("geometry")),
+            }
+            upcoming_notices.append(notice_info)
 
         attributes = {
             ATTR_LAST_UPDATED: self.coordinator.data.get("last_updated"),
-            "upcoming_issues": upcoming_notices,
+            "days": self._days,
+            "upcoming_issues": self._format_notices(upcoming_notices),
         }
 
         return attributes
+
+
+class CanalRiverTrustRouteSensor(CanalRiverTrustSensorBase):
+    """Sensor for notices blocking a configured cruise route."""
+
+    _demands = (DEMAND_TRANSITIONS,)
+
+    def __init__(
+        self,
+        coordinator: CanalRiverTrustCoordinator,
+        entry: ConfigEntry,
+        route_name: str,
+    ) -> None:
+        """Initialize the route sensor."""
+        super().__init__(coordinator, entry, f"route_{slugify(route_name)}")
+        self._route_name = route_name
+        self._attr_name = f"Canal & River Trust Route {route_name}"
+        self._attr_icon = "mdi:map-marker-path"
+        self._attr_state_class = SensorStateClass.MEASUREMENT
+
+    def _blocking_notices(self) -> list[dict[str, Any]]:
+        """Return the notices blocking the route within the route window."""
+        now = dt_util.now()
+        return within_window(
+            self.coordinator.routes.blocking(self._route_name),
+            self.coordinator.notice_times,
+            now,
+            now + timedelta(days=self.coordinator.route_days),
+        )
+
+    @property
+    def native_value(self) -> int:
+        """Return the number of notices blocking the route."""
+        if self.coordinator.data is None:
+            return 0
+
+        return len(self._blocking_notices())
+
+    def _build_attributes(self) -> dict[str, Any]:
+        """Build the state attributes."""
+        if self.coordinator.data is None:
+            return {}
+
+        blocking = self._blocking_notices()
+        return {
+            ATTR_LAST_UPDATED: self.coordinator.data.get("last_updated"),
+            "route": self.coordinator.routes.routes.get(self._route_name, []),
+            "days": self.coordinator.route_days,
+            "blocked": bool(blocking),
+            "blocking_notices": self._format_notices(blocking),
+        }
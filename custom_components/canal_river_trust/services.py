@@ -0,0 +1,382 @@
+"""Services for Canal & River Trust integration."""
+from __future__ import annotations
+
+import logging
+from datetime import datetime, time, timedelta
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
+from homeassistant.exceptions import (
+    HomeAssistantError,
+    ServiceValidationError,
+    Unauthorized,
+    UnknownUser,
+)
+from homeassistant.const import ATTR_ENTITY_ID
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers import entity_registry as er
+from homeassistant.util import dt as dt_util
+
+from .api import categorize_notices
+from .const import (
+    ATTR_ENTRY_ID,
+    CONF_INCLUDE_EMERGENCY,
+    CONF_INCLUDE_PLANNED,
+    CONF_LOCATION_FILTER,
+    DEFAULT_INCLUDE_EMERGENCY,
+    DEFAULT_INCLUDE_PLANNED,
+    DOMAIN,
+    EXPORT_FILENAME,
+    EXPORT_FORMAT_GEOJSON,
+    EXPORT_DIRECTORY,
+    EXPORT_FORMATS,
+    PROFILE_FILENAME,
+    SERVICE_CHECK_ROUTE,
+    SERVICE_EXPORT_NOTICES,
+    SERVICE_PROFILE_REFRESH,
+    SERVICE_QUERY_HISTORY,
+    SERVICE_QUERY_STATISTICS,
+    SERVICE_REFRESH_DATA,
+)
+from .coordinator import CanalRiverTrustCoordinator, get_coordinator
+from .cube import DIMENSIONS
+from .export import export_path, write_export
+from .profiler import RefreshProfiler
+from .routes import within_window
+
+_LOGGER = logging.getLogger(__name__)
+
+HISTORY_QUERIES = ["waterway_durations", "closure_count", "notice_changes"]
+
+QUERY_HISTORY_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_ENTRY_ID): cv.string,
+        vol.Required("query"): vol.In(HISTORY_QUERIES),
+        vol.Optional("waterway"): cv.string,
+        vol.Optional("region"): cv.string,
+        vol.Optional("title"): cv.string,
+        vol.Optional("key"): cv.string,
+        vol.Optional("since"): cv.date,
+    }
+)
+
+PROFILE_REFRESH_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_ENTRY_ID): cv.string,
+        vol.Optional("refreshes", default=1): vol.All(vol.Coerce(int), vol.Range(min=1, max=10)),
+        vol.Optional("refresh_now", default=True): cv.boolean,
+    }
+)
+
+CHECK_ROUTE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_ENTRY_ID): cv.string,
+        vol.Exclusive("route", "route"): vol.All(cv.ensure_list, [cv.string]),
+        vol.Exclusive("name", "route"): cv.string,
+        vol.Optional("start"): cv.date,
+        vol.Optional("days"): vol.All(vol.Coerce(int), vol.Range(min=1, max=365)),
+    }
+)
+
+REFRESH_DATA_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_ENTITY_ID): cv.entity_ids,
+        vol.Optional(ATTR_ENTRY_ID): cv.string,
+        vol.Optional("force", default=False): cv.boolean,
+    }
+)
+
+EXPORT_NOTICES_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_ENTRY_ID): cv.string,
+        vol.Optional("format", default=EXPORT_FORMAT_GEOJSON): vol.In(EXPORT_FORMATS),
+        vol.Optional("filename"): cv.string,
+        vol.Optional(CONF_LOCATION_FILTER): vol.Any(None, cv.string),
+        vol.Optional(CONF_INCLUDE_PLANNED): cv.boolean,
+        vol.Optional(CONF_INCLUDE_EMERGENCY): cv.boolean,
+    }
+)
+
+QUERY_STATISTICS_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_ENTRY_ID): cv.string,
+        vol.Optional("group_by"): vol.In(DIMENSIONS),
+        **{vol.Optional(dimension): cv.string for dimension in DIMENSIONS},
+    }
+)
+
+
+def _get_coordinator(hass: HomeAssistant, call: ServiceCall) -> CanalRiverTrustCoordinator:
+    """Return the coordinator a service call refers to.
+
+    Defaults to the first loaded entry when no entry_id is given.
+    """
+    entry_id = call.data.get(ATTR_ENTRY_ID)
+    coordinator = get_coordinator(hass, entry_id)
+
+    if coordinator is None:
+        if entry_id:
+            raise ServiceValidationError(f"Canal & River Trust entry {entry_id} is not loaded")
+        raise ServiceValidationError("No Canal & River Trust entries are loaded")
+    return coordinator
+
+
+async def _async_query_history(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    """Answer a query against the local notice history."""
+    history = _get_coordinator(hass, call).history
+    query = call.data["query"]
+    since = call.data["since"].isoformat() if "since" in call.data else None
+
+    result: Any
+    if query == "waterway_durations":
+        result = await hass.async_add_executor_job(
+            history.waterway_durations, since, call.data.get("waterway")
+        )
+    elif query == "closure_count":
+        result = await hass.async_add_executor_job(
+            history.closure_count,
+            call.data.get("title"),
+            call.data.get("region"),
+            call.data.get("waterway"),
+            since,
+        )
+    else:
+        if "key" not in call.data:
+            raise ServiceValidationError("The notice_changes query requires a key")
+        result = await hass.async_add_executor_job(history.notice_changes, call.data["key"])
+
+    return {"query": query, "result": result}
+
+
+async def _async_profile_refresh(hass: HomeAssistant, call: ServiceCall) -> None:
+    """Profile the next refreshes of a coordinator."""
+    coordinator = _get_coordinator(hass, call)
+    if coordinator.profiler is not None:
+        raise ServiceValidationError("A refresh profile is already running")
+
+    path = hass.config.path(
+        PROFILE_FILENAME.format(
+            domain=DOMAIN, timestamp=dt_util.now().strftime("%Y%m%d_%H%M%S")
+        )
+    )
+    coordinator.profiler = RefreshProfiler(call.data["refreshes"], path)
+    _LOGGER.info(
+        "Profiling the next %d refreshes, report will be written to %s",
+        call.data["refreshes"], path
+    )
+
+    if call.data["refresh_now"]:
+        await coordinator.async_request_refresh()
+
+
+async def _async_check_route(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    """Return the notices blocking a route within a date window."""
+    coordinator = _get_coordinator(hass, call)
+    routes = coordinator.routes
+
+    if "name" in call.data:
+        if call.data["name"] not in routes.routes:
+            raise ServiceValidationError(f"Route {call.data['name']} is not configured")
+        segments = routes.routes[call.data["name"]]
+        notices = routes.blocking(call.data["name"])
+    elif "route" in call.data:
+        segments = call.data["route"]
+        notices = routes.find_blocking(segments)
+    else:
+        raise ServiceValidationError("Either a route or the name of a configured route is required")
+
+    if "start" in call.data:
+        start = dt_util.as_utc(
+            datetime.combine(call.data["start"], time.min, tzinfo=dt_util.DEFAULT_TIME_ZONE)
+        )
+    else:
+        start = dt_util.utcnow()
+    days = call.data.get("days", coordinator.route_days)
+
+    blocking = within_window(
+        notices, coordinator.notice_times, start, start + timedelta(days=days)
+    )
+    return {
+        "route": segments,
+        "start": start.isoformat(),
+        "days": days,
+        "blocked": bool(blocking),
+        "notices": blocking,
+    }
+
+
+async def _async_refresh_data(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    """Refresh the entries of the given entities, or all entries."""
+    coordinators: dict[str, CanalRiverTrustCoordinator] = hass.data.get(DOMAIN, {})
+
+    entry_ids: set[str] = set()
+    if ATTR_ENTRY_ID in call.data:
+        entry_ids.add(call.data[ATTR_ENTRY_ID])
+    if ATTR_ENTITY_ID in call.data:
+        registry = er.async_get(hass)
+        for entity_id in call.data[ATTR_ENTITY_ID]:
+            entity = registry.async_get(entity_id)
+            if entity is None or entity.config_entry_id not in coordinators:
+                raise ServiceValidationError(
+                    f"{entity_id} is not a loaded Canal & River Trust entity"
+                )
+            entry_ids.add(entity.config_entry_id)
+    if not entry_ids:
+        entry_ids = set(coordinators)
+
+    results = {}
+    for entry_id in entry_ids:
+        if entry_id not in coordinators:
+            raise ServiceValidationError(f"Canal & River Trust entry {entry_id} is not loaded")
+        results[entry_id] = await coordinators[entry_id].async_refresh_coalesced(
+            force=call.data["force"]
+        )
+
+    return {"entries": results}
+
+
+async def _async_export_notices(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    """Export the current notices to a file in the export directory.
+
+    Filters default to the entry's options and can be overridden per call.
+    """
+    coordinator = _get_coordinator(hass, call)
+    if coordinator.data is None:
+        raise ServiceValidationError("No notices have been fetched yet")
+
+    export_format = call.data["format"]
+    filename = call.data.get("filename") or EXPORT_FILENAME.format(
+        domain=DOMAIN, timestamp=dt_util.now().strftime("%Y%m%d_%H%M%S")
+    )
+    try:
+        path = export_path(
+            hass.config.path(EXPORT_DIRECTORY.format(domain=DOMAIN)), filename, export_format
+        )
+    except ValueError as err:
+        raise ServiceValidationError(str(err)) from err
+
+    options = coordinator.entry.options
+    data = coordinator.filter_notices(
+        categorize_notices(coordinator.data.get("notices", [])),
+        call.data.get(CONF_LOCATION_FILTER, options.get(CONF_LOCATION_FILTER)),
+        call.data.get(
+            CONF_INCLUDE_PLANNED, options.get(CONF_INCLUDE_PLANNED, DEFAULT_INCLUDE_PLANNED)
+        ),
+        call.data.get(
+            CONF_INCLUDE_EMERGENCY,
+            options.get(CONF_INCLUDE_EMERGENCY, DEFAULT_INCLUDE_EMERGENCY),
+        ),
+    )
+    notices = data["closures"] + data["stoppages"]
+
+    try:
+        size = await hass.async_add_executor_job(write_export, path, export_format, notices)
+    except OSError as err:
+        raise HomeAssistantError(f"Unable to write notice export to {path}: {err}") from err
+
+    _LOGGER.info("Exported %d notices to %s", len(notices), path)
+    return {"path": path, "format": export_format, "notices": len(notices), "bytes": size}
+
+
+async def _async_query_statistics(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    """Return notice counts and closure days from the aggregation cube."""
+    cube = await _get_coordinator(hass, call).async_get_cube()
+    filters = {
+        dimension: call.data[dimension] for dimension in DIMENSIONS if dimension in call.data
+    }
+
+    response: dict[str, Any] = {"filters": filters, **cube.total(**filters)}
+    if "group_by" in call.data:
+        response["group_by"] = call.data["group_by"]
+        response["breakdown"] = cube.breakdown(call.data["group_by"], **filters)
+    return response
+
+
+async def _async_check_admin(hass: HomeAssistant, call: ServiceCall) -> None:
+    """Raise unless a service call was made by an administrator or by the system.
+
+    The same check as async_register_admin_service, which only supports
+    service responses in later Home Assistant versions.
+    """
+    if not call.context.user_id:
+        return
+
+    user = await hass.auth.async_get_user(call.context.user_id)
+    if user is None:
+        raise UnknownUser(context=call.context)
+    if not user.is_admin:
+        raise Unauthorized(context=call.context)
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration services."""
+
+    async def async_query_history(call: ServiceCall) -> ServiceResponse:
+        """Handle the query_history service call."""
+        return await _async_query_history(hass, call)
+
+    async def async_profile_refresh(call: ServiceCall) -> None:
+        """Handle the profile_refresh service call, for administrators only."""
+        await _async_check_admin(hass, call)
+        await _async_profile_refresh(hass, call)
+
+    async def async_check_route(call: ServiceCall) -> ServiceResponse:
+        """Handle the check_route service call."""
+        return await _async_check_route(hass, call)
+
+    async def async_refresh_data(call: ServiceCall) -> ServiceResponse:
+        """Handle the refresh_data service call."""
+        return await _async_refresh_data(hass, call)
+
+    async def async_export_notices(call: ServiceCall) -> ServiceResponse:
+        """Handle the export_notices service call, for administrators only."""
+        await _async_check_admin(hass, call)
+        return await _async_export_notices(hass, call)
+
+    async def async_query_statistics(call: ServiceCall) -> ServiceResponse:
+        """Handle the query_statistics service call."""
+        return await _async_query_statistics(hass, call)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_REFRESH_DATA,
+        async_refresh_data,
+        schema=REFRESH_DATA_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_QUERY_HISTORY,
+        async_query_history,
+        schema=QUERY_HISTORY_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE_REFRESH,
+        async_profile_refresh,
+        schema=PROFILE_REFRESH_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_CHECK_ROUTE,
+        async_check_route,
+        schema=CHECK_ROUTE_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_EXPORT_NOTICES,
+        async_export_notices,
+        schema=EXPORT_NOTICES_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_QUERY_STATISTICS,
+        async_query_statistics,
+        schema=QUERY_STATISTICS_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
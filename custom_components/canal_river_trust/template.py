@@ -0,0 +1,225 @@
+"""Template functions for Canal & River Trust integration.
+
+Home Assistant has no public API for integration-provided template
+functions, so they are added as globals to every template environment:
+those already created and, by wrapping TemplateEnvironment.__init__, those
+created later. The functions are installed while at least one entry is
+loaded, and TemplateEnvironment is restored when the last one is unloaded.
+They are not installed on Home Assistant versions before MIN_HA_VERSION or
+that lack any of the template internals they use. Each function answers
+from the coordinator's per-refresh indexes instead of iterating over sensor
+attributes.
+
+A template using the functions tracks the closures and stoppages sensors,
+which are written whenever the filtered notices change, so it is re-rendered
+then like a template reading their states. crt_upcoming also re-renders
+every minute, as its result depends on the time.
+
+The functions cover the filtered notices shown by the closures and
+stoppages sensors. They take an optional entry_id and default to the first
+loaded entry.
+"""
+from __future__ import annotations
+
+import logging
+from datetime import timedelta
+from functools import wraps
+from typing import Any
+
+from homeassistant.const import MAJOR_VERSION, MINOR_VERSION, __short_version__
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .coordinator import CanalRiverTrustCoordinator, get_coordinator
+from .utils import compact_notice
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_TEMPLATE_FUNCTIONS = f"{DOMAIN}_template_functions"
+
+# hass.data keys of the cached template environments
+_ENVIRONMENT_KEYS = ("_ENVIRONMENT", "_ENVIRONMENT_LIMITED", "_ENVIRONMENT_STRICT")
+
+# Attribute of the wrapped TemplateEnvironment.__init__ holding the original
+_ORIGINAL_INIT = f"_{DOMAIN}_original_init"
+
+# Oldest Home Assistant release whose template internals have been checked
+MIN_HA_VERSION = (2024, 1)
+
+# Template module internals the functions use
+_REQUIRED_INTERNALS = ("TemplateEnvironment", "_collect_state", "_render_info")
+
+# Sensors a template using the functions tracks
+TRACKED_SENSORS = ("closures", "stoppages")
+
+
+def _fold(value: Any) -> str | None:
+    """Case-fold an optional filter value."""
+    return str(value).casefold() if value not in (None, "") else None
+
+
+def _track_notices(hass: HomeAssistant, coordinator: CanalRiverTrustCoordinator) -> None:
+    """Have the rendering template re-render when the notices change."""
+    from homeassistant.helpers import template
+
+    registry = er.async_get(hass)
+    for sensor_type in TRACKED_SENSORS:
+        entity_id = registry.async_get_entity_id(
+            "sensor", DOMAIN, f"{coordinator.entry.entry_id}_{sensor_type}"
+        )
+        if entity_id is not None:
+            template._collect_state(hass, entity_id)  # pylint: disable=protected-access
+
+
+def _track_time() -> None:
+    """Have the rendering template re-render every minute."""
+    from homeassistant.helpers import template
+
+    if (render_info := template._render_info.get()) is not None:  # pylint: disable=protected-access
+        render_info.has_time = True
+
+
+def crt_count(
+    hass: HomeAssistant,
+    region: str | None = None,
+    reason: str | None = None,
+    type: str | None = None,  # pylint: disable=redefined-builtin
+    entry_id: str | None = None,
+) -> int:
+    """Return the number of notices matching a region, reason and type name."""
+    coordinator = get_coordinator(hass, entry_id)
+    if coordinator is None:
+        return 0
+    _track_notices(hass, coordinator)
+    return coordinator.notice_counts.get((_fold(region), _fold(reason), _fold(type)), 0)
+
+
+def crt_nearest(
+    hass: HomeAssistant,
+    latitude: float,
+    longitude: float,
+    entry_id: str | None = None,
+) -> dict[str, Any] | None:
+    """Return the notice nearest to a location, with its distance in km."""
+    coordinator = get_coordinator(hass, entry_id)
+    if coordinator is None:
+        return None
+    _track_notices(hass, coordinator)
+
+    found = coordinator.nearest_index.nearest(float(latitude), float(longitude))
+    if found is None:
+        return None
+    distance, notice = found
+    return {**compact_notice(notice), "distance_km": round(distance, 2)}
+
+
+def crt_upcoming(
+    hass: HomeAssistant,
+    days: float = 7,
+    entry_id: str | None = None,
+) -> list[dict[str, Any]]:
+    """Return the notices starting within a number of days, by start date."""
+    _track_time()
+    coordinator = get_coordinator(hass, entry_id)
+    if coordinator is None:
+        return []
+    _track_notices(hass, coordinator)
+
+    now = dt_util.now()
+    return [
+        compact_notice(notice)
+        for notice in coordinator.calendar_index("notices").starting_between(now, now + timedelta(days=float(days)))
+    ]
+
+
+def _bind(hass: HomeAssistant) -> dict[str, Any]:
+    """Return the template functions bound to a Home Assistant instance."""
+
+    def bind(function: Any) -> Any:
+        @wraps(function)
+        def bound(*args: Any, **kwargs: Any) -> Any:
+            return function(hass, *args, **kwargs)
+
+        return bound
+
+    return {
+        "crt_count": bind(crt_count),
+        "crt_nearest": bind(crt_nearest),
+        "crt_upcoming": bind(crt_upcoming),
+    }
+
+
+@callback
+def async_setup_template_functions(hass: HomeAssistant) -> None:
+    """Make the template functions available to all templates.
+
+    Called when an entry is set up; does nothing while the functions are
+    already installed.
+    """
+    if DATA_TEMPLATE_FUNCTIONS in hass.data:
+        return
+
+    from homeassistant.helpers import template
+
+    if (MAJOR_VERSION, MINOR_VERSION) < MIN_HA_VERSION or not all(
+        hasattr(template, name) for name in _REQUIRED_INTERNALS
+    ):
+        _LOGGER.warning(
+            "Template functions are not supported by Home Assistant %s", __short_version__
+        )
+        return
+
+    environment_cls = template.TemplateEnvironment
+
+    functions = _bind(hass)
+    # Never wrap a wrapper left by an earlier installation
+    original_init = environment_cls.__init__
+    original_init = getattr(original_init, _ORIGINAL_INIT, original_init)
+
+    @wraps(original_init)
+    def init_with_functions(self: Any, *args: Any, **kwargs: Any) -> None:
+        original_init(self, *args, **kwargs)
+        self.globals.update(functions)
+
+    setattr(init_with_functions, _ORIGINAL_INIT, original_init)
+    environment_cls.__init__ = init_with_functions
+
+    for environment in _cached_environments(hass, template, environment_cls):
+        environment.globals.update(functions)
+
+    hass.data[DATA_TEMPLATE_FUNCTIONS] = (environment_cls, functions)
+
+
+@callback
+def async_remove_template_functions(hass: HomeAssistant) -> None:
+    """Remove the template functions and restore TemplateEnvironment.
+
+    Called when the last entry is unloaded.
+    """
+    if (installed := hass.data.pop(DATA_TEMPLATE_FUNCTIONS, None)) is None:
+        return
+
+    from homeassistant.helpers import template
+
+    environment_cls, functions = installed
+    original_init = getattr(environment_cls.__init__, _ORIGINAL_INIT, None)
+    if original_init is not None:
+        environment_cls.__init__ = original_init
+
+    for environment in _cached_environments(hass, template, environment_cls):
+        for name, function in functions.items():
+            if environment.globals.get(name) is function:
+                del environment.globals[name]
+
+
+def _cached_environments(hass: HomeAssistant, template: Any, environment_cls: type) -> list[Any]:
+    """Return the template environments Home Assistant has already created."""
+    environments = []
+    for name in _ENVIRONMENT_KEYS:
+        key = getattr(template, name, None)
+        environment = hass.data.get(key) if key is not None else None
+        if isinstance(environment, environment_cls):
+            environments.append(environment)
+    return environments
@@ -1,10 +1,13 @@
 """Utility functions for Canal & River Trust integration."""
 from __future__ import annotations
 
+import hashlib
 import re
-from datetime import datetime
+from datetime import datetime, timezone, tzinfo
 from typing import Any
 
+from .const import REASON_MAPPINGS, TYPE_MAPPINGS
+
 
 def parse_date(date_str: str | None) -> str | None:
     """Parse date string from API response."""
@@ -174,3 +177,170 @@ def format_duration(start_date: str | None, end_date: str | None) -> str:
     
     except (ValueError, AttributeError):
         return "Duration unknown"
+
+
+def parse_notice_time(value: Any, default_tz: tzinfo = timezone.utc) -> datetime | None:
+    """Parse a notice start or end value into an aware datetime.
+
+    Naive values are assumed to be in default_tz.
+    """
+    if value is None or value == "":
+        return None
+
+    try:
+        if isinstance(value, (int, float)) or (isinstance(value, str) and value.isdigit()):
+            timestamp = int(value) / 1000 if int(value) > 1e10 else int(value)
+            return datetime.fromtimestamp(timestamp, tz=timezone.utc)
+
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except (ValueError, OSError, OverflowError):
+        return None
+
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=default_tz)
+    return parsed
+
+
+def notice_key(notice: dict[str, Any]) -> str:
+    """Return a key that identifies a notice across refreshes."""
+    notice_id = notice.get("id")
+    if notice_id is not None:
+        return str(notice_id)
+
+    # Without an id there is no field that survives an edit, so fall back to
+    # the title and start. Editing either is seen as a removal and an addition.
+    raw = f"{notice.get('title', '')}|{notice.get('start', '')}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def notice_waterways(notice: dict[str, Any]) -> list[str]:
+    """Return the waterway names a notice applies to."""
+    value = notice.get("waterways")
+    if not value:
+        return []
+
+    if isinstance(value, (list, tuple)):
+        names = []
+        for item in value:
+            if isinstance(item, dict):
+                item = item.get("name") or item.get("title")
+            if item and str(item).strip():
+                names.append(str(item).strip())
+        return names
+
+    name = str(value).strip()
+    return [name] if name else []
+
+
+def notice_path(notice: dict[str, Any]) -> list[str]:
+    """Return the hierarchical path of a notice, e.g. region, waterway, structure."""
+    value = notice.get("path")
+    if not value:
+        return []
+
+    if isinstance(value, (list, tuple)):
+        parts = []
+        for item in value:
+            if isinstance(item, dict):
+                item = item.get("name") or item.get("title")
+            if item and str(item).strip():
+                parts.append(str(item).strip())
+        return parts
+
+    return [part for part in re.split(r"\s*[>/|]\s*", str(value).strip()) if part]
+
+
+def parse_horizons(text: str | None, maximum: int) -> list[int] | None:
+    """Parse a comma-separated list of horizons in days.
+
+    Returns the sorted, distinct horizons, or None if any is invalid.
+    """
+    horizons = set()
+    for part in str(text or "").replace(";", ",").split(","):
+        if not part.strip():
+            continue
+        try:
+            days = int(part)
+        except ValueError:
+            return None
+        if not 1 <= days <= maximum:
+            return None
+        horizons.add(days)
+    return sorted(horizons)
+
+
+def compact_notice(notice: dict[str, Any]) -> dict[str, Any]:
+    """Return a small, serialisable summary of a notice."""
+    return {
+        "key": notice_key(notice),
+        "title": notice.get("title", "Unknown"),
+        "region": notice.get("region", "Unknown"),
+        "waterways": notice.get("waterways", "Unknown"),
+        "type": TYPE_MAPPINGS.get(notice.get("typeId", 0), "Unknown"),
+        "reason": REASON_MAPPINGS.get(notice.get("reasonId", 0), "Unknown"),
+        "start_date": notice.get("start"),
+        "end_date": notice.get("end"),
+        "state": notice.get("state", "Unknown"),
+    }
+
+
+def diff_notices(
+    previous: dict[str, dict[str, Any]],
+    current: dict[str, dict[str, Any]],
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]], list[dict[str, Any]]]:
+    """Compare two keyed snapshots of compact notices.
+
+    Returns the added, updated and removed notices.
+    """
+    added = [notice for key, notice in current.items() if key not in previous]
+    updated = [
+        notice for key, notice in current.items()
+        if key in previous and previous[key] != notice
+    ]
+    removed = [notice for key, notice in previous.items() if key not in current]
+    return added, updated, removed
+
+
+def to_columnar(
+    rows: list[dict[str, Any]],
+    dictionary_fields: tuple[str, ...] = ("region", "type", "reason"),
+) -> dict[str, Any]:
+    """Encode a list of dicts as one list per field.
+
+    Fields in dictionary_fields are stored as indexes into a lookup table of
+    their distinct values. Missing values are None, so a missing field and a
+    None value decode the same.
+    """
+    fields: list[str] = []
+    for row in rows:
+        for field in row:
+            if field not in fields:
+                fields.append(field)
+
+    columns: dict[str, list[Any]] = {}
+    lookups: dict[str, list[Any]] = {}
+    for field in fields:
+        values = [row.get(field) for row in rows]
+        if field in dictionary_fields:
+            positions: dict[tuple[type, Any], int] = {}
+            lookup: list[Any] = []
+            encoded = []
+            for value in values:
+                # Keyed by type too, so that 1, 1.0 and True stay distinct, and
+                # lists or dicts are compared by value but kept as they are
+                hashable = value if isinstance(value, (str, int, float, type(None))) else repr(value)
+                position = positions.setdefault((type(value), hashable), len(lookup))
+                if position == len(lookup):
+                    lookup.append(value)
+                encoded.append(position)
+            lookups[field] = lookup
+            values = encoded
+        columns[field] = values
+
+    return {
+        "format": "columnar",
+        "count": len(rows),
+        "fields": fields,
+        "columns": columns,
+        "lookups": lookups,
+    }
@@ -0,0 +1,107 @@
+"""Watchlist matching for Canal & River Trust integration.
+
+A watchlist item is either a region, waterway or structure name, or a
+regular expression over notice titles written as /pattern/. Names are
+looked up in the coordinator's path trie. Title patterns are combined into
+one compiled expression that rejects most titles in a single search, so
+each notice is tested once per refresh rather than once per item.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import re
+from typing import Any
+
+from .index import PathTrie
+from .utils import notice_key
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def parse_watchlist(text: str | None) -> list[str]:
+    """Parse watchlist items separated by semicolons or new lines.
+
+    Invalid title patterns are logged and skipped, and so are repeats of
+    an item, names being compared case-insensitively as they are matched.
+    """
+    items: list[str] = []
+    if not text:
+        return items
+
+    seen: set[str] = set()
+    for line in text.replace(";", "\n").splitlines():
+        item = line.strip()
+        if not item or watchlist_item_id(item) in seen:
+            continue
+        if _is_pattern(item):
+            try:
+                re.compile(item[1:-1])
+            except re.error as err:
+                _LOGGER.warning("Ignoring invalid watchlist pattern %s: %s", item, err)
+                continue
+        seen.add(watchlist_item_id(item))
+        items.append(item)
+
+    return items
+
+
+def watchlist_item_id(item: str) -> str:
+    """Return a stable identifier of a watchlist item for unique IDs.
+
+    The identifier is the kind of item followed by a hash of it, so names
+    and patterns that slugify alike, or to nothing, stay distinct.
+    """
+    if _is_pattern(item):
+        kind, value = "re", item
+    else:
+        kind, value = "text", item.casefold()
+    return f"{kind}_{hashlib.sha1(value.encode()).hexdigest()[:12]}"
+
+
+def _is_pattern(item: str) -> bool:
+    """Return True if an item is a /pattern/ over titles."""
+    return len(item) > 2 and item.startswith("/") and item.endswith("/")
+
+
+class Watchlist:
+    """Keep the notices affecting each watchlist item up to date."""
+
+    def __init__(self, items: list[str]) -> None:
+        """Initialize the watchlist."""
+        self.items = items
+        self._names = [item for item in items if not _is_pattern(item)]
+        self._patterns = {
+            item: re.compile(item[1:-1], re.IGNORECASE)
+            for item in items if _is_pattern(item)
+        }
+        self._any_pattern = (
+            re.compile(
+                "|".join(f"(?:{item[1:-1]})" for item in self._patterns), re.IGNORECASE
+            )
+            if self._patterns
+            else None
+        )
+        self._matches: dict[str, list[dict[str, Any]]] = {item: [] for item in items}
+
+    def update(self, trie: PathTrie[dict[str, Any]], notices: list[dict[str, Any]]) -> None:
+        """Match the notices of a refresh against every item."""
+        matches: dict[str, dict[str, dict[str, Any]]] = {item: {} for item in self.items}
+
+        for name in self._names:
+            matches[name].update(trie.lookup(name))
+
+        if self._any_pattern is not None:
+            for notice in notices:
+                title = str(notice.get("title") or "")
+                if not self._any_pattern.search(title):
+                    continue
+                for item, pattern in self._patterns.items():
+                    if pattern.search(title):
+                        matches[item][notice_key(notice)] = notice
+
+        self._matches = {item: list(found.values()) for item, found in matches.items()}
+
+    def notices(self, item: str) -> list[dict[str, Any]]:
+        """Return the notices affecting an item."""
+        return self._matches.get(item, [])
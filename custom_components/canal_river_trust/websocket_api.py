@@ -0,0 +1,98 @@
+"""Websocket API for Canal & River Trust integration."""
+from __future__ import annotations
+
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+
+from .const import ATTR_ENTRY_ID, DOMAIN
+from .coordinator import get_coordinator
+
+WS_LIST_NOTICES = f"{DOMAIN}/notices/list"
+WS_SUBSCRIBE_NOTICES = f"{DOMAIN}/notices/subscribe"
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+@callback
+def async_setup_websocket_api(hass: HomeAssistant) -> None:
+    """Register the websocket commands."""
+    websocket_api.async_register_command(hass, ws_list_notices)
+    websocket_api.async_register_command(hass, ws_subscribe_notices)
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): WS_LIST_NOTICES,
+        vol.Optional(ATTR_ENTRY_ID): str,
+        vol.Optional("offset", default=0): vol.All(vol.Coerce(int), vol.Range(min=0)),
+        vol.Optional("limit", default=DEFAULT_PAGE_SIZE): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=MAX_PAGE_SIZE)
+        ),
+    }
+)
+@callback
+def ws_list_notices(
+    hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict[str, Any]
+) -> None:
+    """Return a page of the current notices."""
+    coordinator = get_coordinator(hass, msg.get(ATTR_ENTRY_ID))
+    if coordinator is None:
+        connection.send_error(msg["id"], websocket_api.ERR_NOT_FOUND, "Entry not loaded")
+        return
+
+    notices = list(coordinator.notice_snapshot.values())
+    offset = msg["offset"]
+    connection.send_result(
+        msg["id"],
+        {
+            "total": len(notices),
+            "offset": offset,
+            "notices": notices[offset:offset + msg["limit"]],
+            "last_updated": (coordinator.data or {}).get("last_updated"),
+        },
+    )
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): WS_SUBSCRIBE_NOTICES,
+        vol.Optional(ATTR_ENTRY_ID): str,
+    }
+)
+@callback
+def ws_subscribe_notices(
+    hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict[str, Any]
+) -> None:
+    """Push added, updated and removed notices after each refresh."""
+    coordinator = get_coordinator(hass, msg.get(ATTR_ENTRY_ID))
+    if coordinator is None:
+        connection.send_error(msg["id"], websocket_api.ERR_NOT_FOUND, "Entry not loaded")
+        return
+
+    @callback
+    def forward_changes(
+        added: list[dict[str, Any]],
+        updated: list[dict[str, Any]],
+        removed: list[dict[str, Any]],
+    ) -> None:
+        """Send a delta to the subscriber."""
+        connection.send_message(
+            websocket_api.event_message(
+                msg["id"],
+                {
+                    "added": added,
+                    "updated": updated,
+                    "removed": [notice["key"] for notice in removed],
+                },
+            )
+        )
+
+    connection.subscriptions[msg["id"]] = coordinator.async_add_change_listener(
+        forward_changes
+    )
+    connection.send_result(msg["id"])
@@ -0,0 +1 @@
+"""Tests for the Canal & River Trust integration."""
@@ -0,0 +1,185 @@
+"""Fixtures for Canal & River Trust tests."""
+from __future__ import annotations
+
+import asyncio
+import json
+from collections.abc import Generator
+from datetime import datetime, timedelta, timezone
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import template
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.canal_river_trust.api import CanalRiverTrustAPI
+from custom_components.canal_river_trust.const import DOMAIN, NOTICE_FIELDS
+from custom_components.canal_river_trust.coordinator import CanalRiverTrustCoordinator
+
+START = datetime(2026, 1, 5, tzinfo=timezone.utc)
+
+ENTRY_ID = "test_entry"
+
+
+def make_notice(notice_id: int, **fields: Any) -> dict[str, Any]:
+    """Return a raw API notice with defaults for the fields not given."""
+    return {
+        "id": notice_id,
+        "title": f"Notice {notice_id}",
+        "region": "North West",
+        "waterways": "Leeds & Liverpool Canal",
+        "typeId": 1,
+        "reasonId": 1,
+        "programmeId": None,
+        **fields,
+    }
+
+
+def notice_span(days_from: float, days: float) -> tuple[datetime, datetime]:
+    """Return a (start, end) span relative to START."""
+    start = START + timedelta(days=days_from)
+    return start, start + timedelta(days=days)
+
+
+def live_notice(notice_id: int, days_from: float, days: float, **fields: Any) -> dict[str, Any]:
+    """Return a raw API notice running for some days from some days from now."""
+    start = dt_util.utcnow() + timedelta(days=days_from)
+    return make_notice(
+        notice_id,
+        start=start.isoformat(),
+        end=(start + timedelta(days=days)).isoformat(),
+        **fields,
+    )
+
+
+def feature_collection(notices: list[dict[str, Any]]) -> dict[str, Any]:
+    """Return notices as the GeoJSON the API serves.
+
+    Notices without a geometry are placed at a point derived from their id.
+    """
+    features = []
+    for notice in notices:
+        properties = {key: value for key, value in notice.items() if key not in ("id", "geometry")}
+        geometry = notice.get("geometry") or {
+            "type": "Point",
+            "coordinates": [-2.0 + notice["id"] * 0.01, 53.0 + notice["id"] * 0.01],
+        }
+        features.append(
+            {"type": "Feature", "id": notice["id"], "geometry": geometry, "properties": properties}
+        )
+    return {"type": "FeatureCollection", "features": features}
+
+
+def from_columnar(encoded: dict[str, Any]) -> list[dict[str, Any]]:
+    """Decode columnar notices the way the README tells dashboards to."""
+    rows = []
+    for position in range(encoded["count"]):
+        row = {}
+        for field in encoded["fields"]:
+            value = encoded["columns"][field][position]
+            if field in encoded["lookups"]:
+                value = encoded["lookups"][field][value]
+            row[field] = value
+        rows.append(row)
+    return rows
+
+
+class MockNoticesApi:
+    """Serve notices in place of the Canal & River Trust API."""
+
+    def __init__(self) -> None:
+        """Start with no notices."""
+        self.notices: list[dict[str, Any]] = []
+        self.requests = 0
+        # Requests wait for this event while it is set
+        self.gate: asyncio.Event | None = None
+
+    def body(self) -> bytes:
+        """Return the response body for the current notices."""
+        return json.dumps(feature_collection(self.notices)).encode()
+
+
+@pytest.fixture
+def notices() -> list[dict[str, Any]]:
+    """Return a small set of notices across regions, waterways and types."""
+    return [
+        make_notice(1, typeId=2, reasonId=4, path="North West > Leeds & Liverpool Canal > Lock 21"),
+        make_notice(2, typeId=1, reasonId=2, path="North West > Leeds & Liverpool Canal > Lock 30"),
+        make_notice(
+            3,
+            region="Midlands",
+            waterways=["Trent & Mersey Canal", "Coventry Canal"],
+            typeId=2,
+            reasonId=3,
+        ),
+        make_notice(4, region="Midlands", waterways="Coventry Canal", typeId=4, reasonId=6),
+    ]
+
+
+@pytest.fixture
+def times() -> dict[str, tuple[datetime, datetime]]:
+    """Return the parsed times of the notices fixture, keyed by notice key."""
+    return {
+        "1": notice_span(0, 2),
+        "2": notice_span(1, 5),
+        "3": notice_span(3, 1.5),
+        "4": notice_span(10, 30),
+    }
+
+
+@pytest.fixture
+def mock_api(enable_custom_integrations: None) -> Generator[MockNoticesApi, None, None]:
+    """Patch the API client to serve the notices of a MockNoticesApi."""
+    api = MockNoticesApi()
+
+    async def _async_fetch_body(
+        self: CanalRiverTrustAPI,
+        start_date: str | None = None,
+        end_date: str | None = None,
+        fields: str = NOTICE_FIELDS,
+        geometry: str | None = None,
+    ) -> bytes:
+        api.requests += 1
+        if api.gate is not None:
+            await api.gate.wait()
+        today = dt_util.now().date()
+        self.last_params = {
+            "consult": "false",
+            "geometry": geometry or self._geometry,
+            "start": start_date or today.isoformat(),
+            "end": end_date or (today + timedelta(days=364)).isoformat(),
+            "fields": fields,
+        }
+        return api.body()
+
+    # Home Assistant stops without unloading entries, so restore the
+    # TemplateEnvironment the template functions wrap after each test
+    with patch.object(CanalRiverTrustAPI, "_async_fetch_body", _async_fetch_body), patch.object(
+        template.TemplateEnvironment, "__init__", template.TemplateEnvironment.__init__
+    ):
+        yield api
+
+
+async def async_setup_integration(
+    hass: HomeAssistant, options: dict[str, Any] | None = None
+) -> MockConfigEntry:
+    """Set up a current config entry with the given options."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="Canal & River Trust",
+        data={},
+        options=options or {},
+        entry_id=ENTRY_ID,
+        minor_version=2,
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    return entry
+
+
+def get_coordinator(hass: HomeAssistant) -> CanalRiverTrustCoordinator:
+    """Return the coordinator of the test entry."""
+    return hass.data[DOMAIN][ENTRY_ID]
@@ -0,0 +1,86 @@
+"""Tests for the API client."""
+from __future__ import annotations
+
+import gzip
+import json
+import time
+from typing import Any
+from unittest.mock import patch
+
+from custom_components.canal_river_trust import api as api_module
+from custom_components.canal_river_trust.api import CanalRiverTrustAPI
+from custom_components.canal_river_trust.client import decompress
+
+from .conftest import feature_collection, make_notice
+
+DELAY = 0.05
+
+
+class MockContent:
+    """Stream a response body in one chunk."""
+
+    def __init__(self, body: bytes) -> None:
+        """Hold the body."""
+        self._body = body
+
+    async def iter_chunked(self, size: int):
+        """Yield the body."""
+        yield self._body
+
+
+class MockResponse:
+    """Response with a fixed status, headers and body."""
+
+    def __init__(self, body: bytes, headers: dict[str, str]) -> None:
+        """Hold the body and headers."""
+        self.status = 200
+        self.headers = headers
+        self.content_length = len(body)
+        self.content = MockContent(body)
+
+    async def __aenter__(self) -> MockResponse:
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        return None
+
+
+class MockSession:
+    """Session that serves one gzipped response body."""
+
+    auto_decompress = False
+
+    def __init__(self, body: bytes) -> None:
+        """Hold the compressed body."""
+        self._body = gzip.compress(body)
+
+    def get(self, *args: Any, **kwargs: Any) -> MockResponse:
+        """Return the response."""
+        return MockResponse(
+            self._body, {"content-type": "application/json", "Content-Encoding": "gzip"}
+        )
+
+
+def _slow_decompress(body: bytes, encoding: str, limit: int) -> bytes:
+    """Decompress a body, taking at least DELAY seconds."""
+    time.sleep(DELAY)
+    return decompress(body, encoding, limit)
+
+
+async def test_loop_blocking_includes_decompression() -> None:
+    """Test that decompressing a small body on the event loop counts as blocking."""
+    body = json.dumps(feature_collection([make_notice(1), make_notice(2, typeId=2)])).encode()
+    api = CanalRiverTrustAPI(MockSession(body))
+
+    with patch.object(api_module, "decompress", _slow_decompress):
+        data = await api.get_all_data()
+
+    assert [notice["id"] for notice in data["closures"]] == [2]
+    assert api.transfer["decoded_bytes"] == len(body)
+    assert api.metrics["offloaded"] is False
+    assert api.metrics["loop_blocking_ms"] >= DELAY * 1000
+    assert api.metrics["decode_ms"] < DELAY * 1000
+
+    # The decompression time is only counted once
+    await api._async_decode(body, api_module.parse_notices)
+    assert api.metrics["loop_blocking_ms"] < DELAY * 1000
@@ -0,0 +1,78 @@
+"""Tests for the notice calendars."""
+from __future__ import annotations
+
+from datetime import timedelta
+
+from homeassistant.const import STATE_OFF, STATE_ON
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from .conftest import MockNoticesApi, async_setup_integration, live_notice
+
+CALENDAR = "calendar.canal_river_trust_notices"
+
+
+async def _async_get_events(hass: HomeAssistant, days: int) -> list[dict]:
+    """Return the events of the notices calendar in the next days."""
+    response = await hass.services.async_call(
+        "calendar",
+        "get_events",
+        {"entity_id": CALENDAR, "start_date_time": dt_util.now(), "duration": {"days": days}},
+        blocking=True,
+        return_response=True,
+    )
+    return response[CALENDAR]["events"]
+
+
+async def test_current_notice(hass: HomeAssistant, mock_api: MockNoticesApi) -> None:
+    """Test that the calendar is on during a notice and shows it."""
+    mock_api.notices = [
+        live_notice(1, -1, 2, typeId=2, reasonId=4, title="Lock 21 gate failure"),
+        live_notice(2, 5, 3),
+    ]
+    await async_setup_integration(hass)
+
+    state = hass.states.get(CALENDAR)
+    assert state.state == STATE_ON
+    assert state.attributes["message"] == "Lock 21 gate failure"
+    assert state.attributes["location"] == "Leeds & Liverpool Canal"
+    assert "Reason: Emergency" in state.attributes["description"]
+
+
+async def test_next_notice(hass: HomeAssistant, mock_api: MockNoticesApi) -> None:
+    """Test that the calendar is off and shows the next notice between notices."""
+    mock_api.notices = [live_notice(1, 5, 3), live_notice(2, 2, 1, title="Bridge repair")]
+    await async_setup_integration(hass)
+
+    state = hass.states.get(CALENDAR)
+    assert state.state == STATE_OFF
+    assert state.attributes["message"] == "Bridge repair"
+
+
+async def test_get_events(hass: HomeAssistant, mock_api: MockNoticesApi) -> None:
+    """Test that events are the notices overlapping the requested range."""
+    mock_api.notices = [
+        live_notice(1, -3, 4),
+        live_notice(2, 2, 1, typeId=2),
+        live_notice(3, 10, 1),
+        live_notice(4, -5, 1),
+    ]
+    await async_setup_integration(hass)
+
+    events = await _async_get_events(hass, 7)
+
+    assert [event["summary"] for event in events] == ["Notice 1", "Notice 2"]
+    start = dt_util.parse_datetime(events[1]["start"])
+    end = dt_util.parse_datetime(events[1]["end"])
+    assert end - start == timedelta(days=1)
+    events = await _async_get_events(hass, 30)
+    assert [event["summary"] for event in events] == ["Notice 1", "Notice 2", "Notice 3"]
+
+
+async def test_category_calendars_are_disabled_by_default(
+    hass: HomeAssistant, mock_api: MockNoticesApi
+) -> None:
+    """Test that only the notices calendar is enabled on a new install."""
+    await async_setup_integration(hass)
+
+    assert hass.states.async_entity_ids("calendar") == [CALENDAR]
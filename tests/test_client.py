@@ -0,0 +1,84 @@
+"""Tests for response decompression."""
+from __future__ import annotations
+
+import gzip
+import zlib
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from custom_components.canal_river_trust.client import ResponseTooLarge, decompress
+
+from .conftest import MockNoticesApi, async_setup_integration, get_coordinator
+
+BODY = b'{"features": [' + b", ".join(b'{"id": %d}' % number for number in range(500)) + b"]}"
+
+
+@pytest.mark.parametrize(
+    ("encoding", "compressed"),
+    [
+        ("gzip", gzip.compress(BODY)),
+        ("x-gzip", gzip.compress(BODY)),
+        ("deflate", zlib.compress(BODY)),
+        ("deflate", zlib.compress(BODY)[2:-4]),
+        (" GZIP ", gzip.compress(BODY)),
+        ("", BODY),
+        ("identity", BODY),
+    ],
+)
+def test_decompress(encoding: str, compressed: bytes) -> None:
+    """Test gzip, zlib, raw deflate and identity bodies."""
+    assert decompress(compressed, encoding, len(BODY)) == BODY
+
+
+def test_decompress_brotli() -> None:
+    """Test brotli bodies when brotli is installed."""
+    brotli = pytest.importorskip("brotli")
+
+    assert decompress(brotli.compress(BODY), "br", len(BODY)) == BODY
+    with pytest.raises(ResponseTooLarge):
+        decompress(brotli.compress(BODY), "br", len(BODY) - 1)
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "deflate"])
+def test_decompress_stops_at_limit(encoding: str) -> None:
+    """Test that a body expanding past the limit is rejected."""
+    bomb = b"\0" * (4 * 1024 * 1024)
+    compressed = gzip.compress(bomb) if encoding == "gzip" else zlib.compress(bomb)
+
+    with pytest.raises(ResponseTooLarge):
+        decompress(compressed, encoding, 1024)
+
+
+@pytest.mark.parametrize(
+    ("encoding", "body"),
+    [
+        ("gzip", gzip.compress(BODY)[:-20]),
+        ("gzip", b"not gzip at all"),
+        ("deflate", b"not deflate at all"),
+        ("compress", BODY),
+    ],
+)
+def test_decompress_rejects_invalid_bodies(encoding: str, body: bytes) -> None:
+    """Test truncated, corrupt and unsupported bodies."""
+    with pytest.raises(ValueError):
+        decompress(body, encoding, len(BODY))
+
+
+async def test_session_shares_the_connector(hass: HomeAssistant, mock_api: MockNoticesApi) -> None:
+    """Test that the traced session is detached, not closed, with its entry."""
+    entry = await async_setup_integration(hass)
+    session = get_coordinator(hass).api._session
+    shared = async_get_clientsession(hass)
+
+    assert session is not shared
+    assert session.connector is shared.connector
+    assert session.auto_decompress is False
+    assert len(session.trace_configs) == 1
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert session.closed
+    assert not shared.closed
@@ -0,0 +1,132 @@
+"""Tests for the coordinator."""
+from __future__ import annotations
+
+from datetime import timedelta
+
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.const import STATE_OFF, STATE_ON
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import (
+    async_capture_events,
+    async_fire_time_changed,
+)
+
+from custom_components.canal_river_trust.const import (
+    EVENT_BATCH_THRESHOLD,
+    EVENT_NOTICE_ADDED,
+    EVENT_NOTICE_REMOVED,
+    EVENT_NOTICE_UPDATED,
+    EVENT_NOTICES_CHANGED,
+)
+from custom_components.canal_river_trust.coordinator import DEMAND_TRANSITIONS
+
+from .conftest import (
+    ENTRY_ID,
+    MockNoticesApi,
+    async_setup_integration,
+    get_coordinator,
+    live_notice,
+)
+
+CALENDAR = "calendar.canal_river_trust_notices"
+
+
+def _capture(hass: HomeAssistant) -> dict[str, list]:
+    """Capture every notice event type."""
+    return {
+        event_type: async_capture_events(hass, event_type)
+        for event_type in (
+            EVENT_NOTICE_ADDED,
+            EVENT_NOTICE_UPDATED,
+            EVENT_NOTICE_REMOVED,
+            EVENT_NOTICES_CHANGED,
+        )
+    }
+
+
+async def test_notice_events(hass: HomeAssistant, mock_api: MockNoticesApi) -> None:
+    """Test that added, updated and removed notices fire one event each."""
+    mock_api.notices = [live_notice(1, 0, 2), live_notice(2, 1, 3, typeId=2)]
+    events = _capture(hass)
+    await async_setup_integration(hass)
+
+    # The first refresh only establishes a baseline
+    assert not any(events.values())
+
+    mock_api.notices = [
+        live_notice(1, 0, 2, title="Notice 1 (extended)"),
+        live_notice(3, 2, 1),
+    ]
+    await get_coordinator(hass).async_refresh()
+    await hass.async_block_till_done()
+
+    assert [event.data["key"] for event in events[EVENT_NOTICE_ADDED]] == ["3"]
+    assert [event.data["title"] for event in events[EVENT_NOTICE_UPDATED]] == ["Notice 1 (extended)"]
+    assert [event.data["key"] for event in events[EVENT_NOTICE_REMOVED]] == ["2"]
+    assert all(
+        event.data["entry_id"] == ENTRY_ID for event_list in events.values() for event in event_list
+    )
+    assert events[EVENT_NOTICES_CHANGED] == []
+
+    # An unchanged refresh fires nothing
+    await get_coordinator(hass).async_refresh()
+    await hass.async_block_till_done()
+    assert sum(len(event_list) for event_list in events.values()) == 3
+
+
+async def test_large_changes_are_batched(hass: HomeAssistant, mock_api: MockNoticesApi) -> None:
+    """Test that more than EVENT_BATCH_THRESHOLD changes fire one batch event."""
+    mock_api.notices = [live_notice(1, 0, 2)]
+    events = _capture(hass)
+    await async_setup_integration(hass)
+
+    mock_api.notices = [live_notice(number, 0, 2) for number in range(2, EVENT_BATCH_THRESHOLD + 3)]
+    await get_coordinator(hass).async_refresh()
+    await hass.async_block_till_done()
+
+    assert events[EVENT_NOTICE_ADDED] == events[EVENT_NOTICE_REMOVED] == []
+    assert len(events[EVENT_NOTICES_CHANGED]) == 1
+    batch = events[EVENT_NOTICES_CHANGED][0].data
+    assert batch["entry_id"] == ENTRY_ID
+    assert len(batch["added"]) == EVENT_BATCH_THRESHOLD + 1
+    assert [notice["key"] for notice in batch["removed"]] == ["1"]
+    assert batch["updated"] == []
+
+
+async def test_changes_at_the_threshold_fire_single_events(
+    hass: HomeAssistant, mock_api: MockNoticesApi
+) -> None:
+    """Test that exactly EVENT_BATCH_THRESHOLD changes still fire per-notice events."""
+    events = _capture(hass)
+    await async_setup_integration(hass)
+
+    mock_api.notices = [live_notice(number, 0, 2) for number in range(1, EVENT_BATCH_THRESHOLD + 1)]
+    await get_coordinator(hass).async_refresh()
+    await hass.async_block_till_done()
+
+    assert len(events[EVENT_NOTICE_ADDED]) == EVENT_BATCH_THRESHOLD
+    assert events[EVENT_NOTICES_CHANGED] == []
+
+
+async def test_entities_update_at_transitions(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory, mock_api: MockNoticesApi
+) -> None:
+    """Test that entities change state when a notice starts or ends, without a refresh."""
+    mock_api.notices = [live_notice(1, -1, 1 + 1 / 24), live_notice(2, 1 / 12, 1)]
+    await async_setup_integration(hass)
+    requests = mock_api.requests
+    assert get_coordinator(hass).demand_diagnostics["demands"][DEMAND_TRANSITIONS] >= 1
+    assert hass.states.get(CALENDAR).state == STATE_ON
+
+    freezer.tick(timedelta(hours=1, seconds=1))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+    assert hass.states.get(CALENDAR).state == STATE_OFF
+    assert hass.states.get(CALENDAR).attributes["message"] == "Notice 2"
+
+    freezer.tick(timedelta(hours=1))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+    assert hass.states.get(CALENDAR).state == STATE_ON
+    assert mock_api.requests == requests
+
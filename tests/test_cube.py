@@ -0,0 +1,77 @@
+"""Tests for the notice aggregation cube."""
+from __future__ import annotations
+
+import pytest
+
+from custom_components.canal_river_trust.cube import NoticeCube
+
+
+def test_totals(notices, times) -> None:
+    """Test totals with and without filters."""
+    cube = NoticeCube.build(notices, times)
+
+    # Only stoppages and closures count towards closure days
+    assert cube.total() == {"count": 4, "closure_days": 8.5}
+    assert cube.total(region="Midlands") == {"count": 2, "closure_days": 1.5}
+    assert cube.total(region="north west", type="Stoppage") == {"count": 1, "closure_days": 5.0}
+    assert cube.total(reason="Emergency") == {"count": 1, "closure_days": 2.0}
+    assert cube.total(programme="None") == {"count": 4, "closure_days": 8.5}
+    assert cube.total(region="Scotland") == {"count": 0, "closure_days": 0.0}
+
+
+def test_empty_filters_are_ignored(notices, times) -> None:
+    """Test that empty and None filters leave a dimension open."""
+    cube = NoticeCube.build(notices, times)
+
+    assert cube.total(region="", waterway=None) == cube.total()
+
+
+def test_notice_on_several_waterways(notices, times) -> None:
+    """Test that a notice counts once per waterway but once in totals."""
+    cube = NoticeCube.build(notices, times)
+
+    assert cube.total(waterway="Coventry Canal")["count"] == 2
+    assert cube.total(waterway="Trent & Mersey Canal")["count"] == 1
+    assert cube.total(region="Midlands")["count"] == 2
+    assert sum(row["count"] for row in cube.breakdown("waterway").values()) == 5
+
+
+def test_breakdown(notices, times) -> None:
+    """Test breakdowns keep display names and sort by count."""
+    cube = NoticeCube.build(notices, times)
+
+    regions = cube.breakdown("region")
+    assert set(regions) == {"North West", "Midlands"}
+    assert regions["North West"] == {"count": 2, "closure_days": 7.0}
+
+    types = cube.breakdown("type", region="midlands")
+    assert types == {
+        "Closure": {"count": 1, "closure_days": 1.5},
+        "Advisory": {"count": 1, "closure_days": 0.0},
+    }
+
+    waterways = cube.breakdown("waterway", region="Midlands")
+    assert list(waterways)[0] == "Coventry Canal"
+    assert cube.breakdown("reason", region="Scotland") == {}
+
+
+def test_unknown_dimensions(notices, times) -> None:
+    """Test that unknown dimensions are rejected."""
+    cube = NoticeCube.build(notices, times)
+
+    with pytest.raises(ValueError):
+        cube.total(lock="Lock 21")
+    with pytest.raises(ValueError):
+        cube.breakdown("lock")
+
+
+def test_notices_without_times_or_fields() -> None:
+    """Test that missing fields fall back to Unknown and count no closure days."""
+    cube = NoticeCube.build([{"id": 1, "typeId": 2}], {})
+
+    assert cube.total() == {"count": 1, "closure_days": 0.0}
+    assert cube.total(region="Unknown", waterway="Unknown", reason="Unknown") == {
+        "count": 1,
+        "closure_days": 0.0,
+    }
+    assert len(NoticeCube.build([], {})) == 0
@@ -0,0 +1,233 @@
+"""Tests for notification digests."""
+from __future__ import annotations
+
+from datetime import timedelta
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.exceptions import HomeAssistantError
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.canal_river_trust.digest import NotificationDigest, format_digest
+from custom_components.canal_river_trust.utils import compact_notice
+
+from .conftest import make_notice
+
+WINDOW = timedelta(minutes=15)
+
+
+def _compact(notice_id: int, **fields: Any) -> dict[str, Any]:
+    """Return a compact notice as passed to change listeners."""
+    return compact_notice(make_notice(notice_id, **fields))
+
+
+EMERGENCY = {"reasonId": 4}
+CLOSURE = {"typeId": 2}
+
+
+class NotifyService:
+    """Notify service that records calls and fails on request."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Register the service."""
+        self.calls: list[ServiceCall] = []
+        self.fail = False
+        self.error: Exception = HomeAssistantError("Phone unreachable")
+        hass.services.async_register("notify", "test", self._handle)
+
+    async def _handle(self, call: ServiceCall) -> None:
+        """Record a call, or fail it."""
+        if self.fail:
+            raise self.error
+        self.calls.append(call)
+
+
+@pytest.fixture
+def coordinator() -> MagicMock:
+    """Return a coordinator that hands out its change listener."""
+    coordinator = MagicMock()
+    coordinator.entry.entry_id = "test_entry"
+    return coordinator
+
+
+async def _async_start(hass: HomeAssistant, coordinator: MagicMock) -> NotificationDigest:
+    """Start a digest for the coordinator."""
+    digest = NotificationDigest(hass, coordinator, "notify.test", WINDOW)
+    await digest.async_load()
+    digest.async_start()
+    return digest
+
+
+def _handle_changes(coordinator: MagicMock):
+    """Return the change listener the digest registered last."""
+    return coordinator.async_add_change_listener.call_args[0][0]
+
+
+async def _async_tick(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory, delay: timedelta
+) -> None:
+    """Move time forward and let the digest send."""
+    freezer.tick(delay)
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+
+
+def test_format_digest() -> None:
+    """Test the digest title and the summary of long lists."""
+    notices = [_compact(1, **EMERGENCY)] + [_compact(number, **CLOSURE) for number in range(2, 13)]
+
+    title, message = format_digest(notices)
+
+    assert title == "Canal & River Trust: 1 emergency notice and 11 closures"
+    assert message.splitlines()[0].startswith("• Notice 1 (North West) - Emergency")
+    assert message.splitlines()[-1] == "…and 2 more"
+
+
+async def test_coalesces_notices_into_one_digest(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory, coordinator
+) -> None:
+    """Test that notices within a window are sent once, together."""
+    notify = NotifyService(hass)
+    digest = await _async_start(hass, coordinator)
+    handle_changes = _handle_changes(coordinator)
+
+    handle_changes([_compact(1, **EMERGENCY), _compact(2)], [], [])
+    handle_changes([_compact(3, **CLOSURE), _compact(1, **EMERGENCY)], [], [])
+    assert notify.calls == []
+
+    await _async_tick(hass, freezer, WINDOW + timedelta(seconds=1))
+
+    assert len(notify.calls) == 1
+    assert notify.calls[0].data["title"] == "Canal & River Trust: 1 emergency notice and 1 closure"
+    assert digest.diagnostics["digests"] == 1
+    assert digest.diagnostics["notices"] == 2
+    assert digest.diagnostics["duplicates"] == 1
+    assert digest.diagnostics["pending"] == 0
+    assert digest.diagnostics["notified"] == 2
+
+    # A notice that comes back is not announced again
+    handle_changes([_compact(3, **CLOSURE)], [], [])
+    await _async_tick(hass, freezer, WINDOW * 3)
+    assert len(notify.calls) == 1
+    assert digest.diagnostics["duplicates"] == 2
+    digest.async_stop()
+
+
+async def test_backs_off_under_bursts(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory, coordinator
+) -> None:
+    """Test that back-to-back digests are spaced further apart."""
+    notify = NotifyService(hass)
+    digest = await _async_start(hass, coordinator)
+    handle_changes = _handle_changes(coordinator)
+
+    handle_changes([_compact(1, **EMERGENCY)], [], [])
+    await _async_tick(hass, freezer, WINDOW + timedelta(seconds=1))
+    handle_changes([_compact(2, **EMERGENCY)], [], [])
+    await _async_tick(hass, freezer, WINDOW + timedelta(seconds=1))
+    assert len(notify.calls) == 2
+
+    handle_changes([_compact(3, **EMERGENCY)], [], [])
+    await _async_tick(hass, freezer, WINDOW + timedelta(seconds=1))
+    assert len(notify.calls) == 2
+    await _async_tick(hass, freezer, WINDOW * 2 + timedelta(seconds=1))
+    assert len(notify.calls) == 3
+    assert digest.diagnostics["interval_minutes"] == 60
+    digest.async_stop()
+
+
+async def test_failed_digest_is_retried(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory, coordinator
+) -> None:
+    """Test that notices stay queued until the notify call succeeds."""
+    notify = NotifyService(hass)
+    notify.fail = True
+    digest = await _async_start(hass, coordinator)
+    handle_changes = _handle_changes(coordinator)
+
+    handle_changes([_compact(1, **EMERGENCY), _compact(2, **CLOSURE)], [], [])
+    await _async_tick(hass, freezer, WINDOW + timedelta(seconds=1))
+
+    assert notify.calls == []
+    assert digest.diagnostics["failures"] == 1
+    assert digest.diagnostics["pending"] == 2
+    assert digest.diagnostics["notified"] == 0
+    assert digest.diagnostics["last_sent"] is None
+
+    # Retries back off like digests
+    await _async_tick(hass, freezer, WINDOW)
+    assert digest.diagnostics["failures"] == 2
+    assert digest.diagnostics["interval_minutes"] == 30
+
+    # A notice added while the retry waits joins it, and no key is queued twice
+    handle_changes([_compact(3, **EMERGENCY), _compact(1, **EMERGENCY)], [], [])
+    assert digest.diagnostics["pending"] == 3
+    assert digest.diagnostics["duplicates"] == 1
+
+    notify.fail = False
+    await _async_tick(hass, freezer, WINDOW + timedelta(seconds=1))
+    assert notify.calls == []
+
+    await _async_tick(hass, freezer, WINDOW)
+    assert len(notify.calls) == 1
+    assert notify.calls[0].data["title"] == "Canal & River Trust: 2 emergency notices and 1 closure"
+    assert digest.diagnostics["failures"] == 2
+    assert digest.diagnostics["pending"] == 0
+    assert digest.diagnostics["notified"] == 3
+    digest.async_stop()
+
+
+async def test_unexpected_error_is_retried(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory, coordinator
+) -> None:
+    """Test that a notify platform's own errors re-queue the digest too."""
+    notify = NotifyService(hass)
+    notify.fail = True
+    notify.error = OSError("Connection reset")
+    digest = await _async_start(hass, coordinator)
+
+    _handle_changes(coordinator)([_compact(1, **EMERGENCY)], [], [])
+    await _async_tick(hass, freezer, WINDOW + timedelta(seconds=1))
+
+    assert digest.diagnostics["failures"] == 1
+    assert digest.diagnostics["pending"] == 1
+    assert digest._sending == {}
+
+    notify.fail = False
+    await _async_tick(hass, freezer, WINDOW * 2 + timedelta(seconds=1))
+    assert len(notify.calls) == 1
+    assert digest.diagnostics["notified"] == 1
+    digest.async_stop()
+
+
+async def test_failed_digest_survives_restart(
+    hass: HomeAssistant,
+    freezer: FrozenDateTimeFactory,
+    coordinator,
+    hass_storage: dict[str, Any],
+) -> None:
+    """Test that queued notices of a failed digest are stored as pending."""
+    notify = NotifyService(hass)
+    notify.fail = True
+    digest = await _async_start(hass, coordinator)
+
+    _handle_changes(coordinator)([_compact(1, **EMERGENCY)], [], [])
+    await _async_tick(hass, freezer, WINDOW + timedelta(seconds=1))
+    digest.async_stop()
+    await _async_tick(hass, freezer, timedelta(seconds=11))
+
+    stored = hass_storage["canal_river_trust_test_entry_digest"]["data"]
+    assert list(stored["pending"]) == ["1"]
+    assert stored["notified"] == {}
+
+    notify.fail = False
+    restarted = await _async_start(hass, coordinator)
+    assert restarted.diagnostics["pending"] == 1
+    await _async_tick(hass, freezer, WINDOW + timedelta(seconds=1))
+    assert len(notify.calls) == 1
+    assert restarted.diagnostics["notified"] == 1
+    restarted.async_stop()
+
@@ -0,0 +1,154 @@
+"""Tests for bulk notice exports."""
+from __future__ import annotations
+
+import csv
+import json
+import os
+
+import pytest
+
+from custom_components.canal_river_trust import export
+from custom_components.canal_river_trust.export import CSV_FIELDS, export_path, write_export
+
+from .conftest import make_notice
+
+
+def _notices(count: int) -> list[dict]:
+    """Return notices with point geometries."""
+    return [
+        make_notice(
+            number,
+            start="2026-01-05T00:00:00Z",
+            geometry={"type": "Point", "coordinates": [-2.0, 53.0 + number * 0.01]},
+        )
+        for number in range(1, count + 1)
+    ]
+
+
+@pytest.mark.parametrize(
+    ("filename", "export_format", "expected"),
+    [
+        ("notices", "csv", "notices.csv"),
+        ("notices.csv", "csv", "notices.csv"),
+        ("notices.CSV", "geojson", "notices.geojson"),
+        ("notices.geojson", "ndjson", "notices.ndjson"),
+        ("notices.txt", "csv", "notices.txt.csv"),
+        (".bashrc", "csv", ".bashrc.csv"),
+    ],
+)
+def test_export_path(tmp_path, filename: str, export_format: str, expected: str) -> None:
+    """Test that the extension is always the format's."""
+    assert export_path(str(tmp_path), filename, export_format) == str(tmp_path / expected)
+
+
+@pytest.mark.parametrize("filename", ["", ".", "..", "../notices", "sub/notices", "/etc/passwd"])
+def test_export_path_rejects_directories(tmp_path, filename: str) -> None:
+    """Test that names reaching outside the export directory are rejected."""
+    with pytest.raises(ValueError):
+        export_path(str(tmp_path), filename, "csv")
+
+
+def test_write_csv(tmp_path, monkeypatch) -> None:
+    """Test a CSV export written across several chunks."""
+    monkeypatch.setattr(export, "CHUNK_SIZE", 2)
+    path = str(tmp_path / "exports" / "notices.csv")
+
+    size = write_export(path, "csv", _notices(5))
+
+    assert size == os.path.getsize(path)
+    with open(path, encoding="utf-8", newline="") as file:
+        rows = list(csv.DictReader(file))
+    assert [row["key"] for row in rows] == ["1", "2", "3", "4", "5"]
+    assert list(rows[0]) == CSV_FIELDS
+    assert rows[0]["type"] == "Stoppage"
+    assert float(rows[0]["latitude"]) == pytest.approx(53.01)
+    assert not os.path.exists(f"{path}.tmp")
+
+
+@pytest.mark.parametrize("count", [0, 1, 5])
+def test_write_geojson(tmp_path, monkeypatch, count: int) -> None:
+    """Test that a GeoJSON export is one valid document whatever the chunking."""
+    monkeypatch.setattr(export, "CHUNK_SIZE", 2)
+    path = str(tmp_path / "notices.geojson")
+
+    write_export(path, "geojson", _notices(count))
+
+    with open(path, encoding="utf-8") as file:
+        document = json.load(file)
+    assert document["type"] == "FeatureCollection"
+    assert [feature["id"] for feature in document["features"]] == list(range(1, count + 1))
+
+
+def test_write_ndjson(tmp_path) -> None:
+    """Test that an NDJSON export has one feature per line."""
+    path = str(tmp_path / "notices.ndjson")
+
+    write_export(path, "ndjson", _notices(3))
+
+    with open(path, encoding="utf-8") as file:
+        features = [json.loads(line) for line in file]
+    assert [feature["id"] for feature in features] == [1, 2, 3]
+    assert features[0]["geometry"]["type"] == "Point"
+
+
+def test_write_replaces_earlier_export(tmp_path) -> None:
+    """Test that an earlier export and a stale temporary file are replaced."""
+    path = tmp_path / "notices.csv"
+    path.write_text("old", encoding="utf-8")
+    (tmp_path / "notices.csv.tmp").write_text("stale", encoding="utf-8")
+
+    write_export(str(path), "csv", _notices(1))
+
+    assert path.read_text(encoding="utf-8").startswith("key,title")
+    assert not (tmp_path / "notices.csv.tmp").exists()
+
+
+def test_write_refuses_directories_and_other_files(tmp_path) -> None:
+    """Test that only an earlier export is ever replaced."""
+    (tmp_path / "notices.csv").mkdir()
+    with pytest.raises(FileExistsError):
+        write_export(str(tmp_path / "notices.csv"), "csv", _notices(1))
+
+    other = tmp_path / "notices.txt"
+    other.write_text("keep", encoding="utf-8")
+    with pytest.raises(FileExistsError):
+        write_export(str(other), "csv", _notices(1))
+    assert other.read_text(encoding="utf-8") == "keep"
+
+
+def test_write_does_not_follow_links(tmp_path) -> None:
+    """Test that links at the export or temporary path are never written through."""
+    target = tmp_path / "target.txt"
+    target.write_text("keep", encoding="utf-8")
+    exports = tmp_path / "exports"
+    exports.mkdir()
+
+    os.symlink(target, exports / "notices.csv")
+    with pytest.raises(FileExistsError):
+        write_export(str(exports / "notices.csv"), "csv", _notices(1))
+
+    # A dangling link at the export path is refused too
+    os.symlink(tmp_path / "missing.csv", exports / "dangling.csv")
+    with pytest.raises(FileExistsError):
+        write_export(str(exports / "dangling.csv"), "csv", _notices(1))
+    assert not (tmp_path / "missing.csv").exists()
+
+    # A link planted at the temporary path is removed, not written through
+    os.symlink(target, exports / "planted.csv.tmp")
+    write_export(str(exports / "planted.csv"), "csv", _notices(1))
+    assert target.read_text(encoding="utf-8") == "keep"
+    assert not os.path.lexists(exports / "planted.csv.tmp")
+
+
+def test_failed_write_leaves_no_file(tmp_path, monkeypatch) -> None:
+    """Test that a failed export removes its temporary file."""
+    path = tmp_path / "notices.ndjson"
+
+    def _fail(value):
+        raise OSError("Disk full")
+
+    monkeypatch.setattr(export, "_dumps", _fail)
+    with pytest.raises(OSError):
+        write_export(str(path), "ndjson", _notices(1))
+
+    assert os.listdir(tmp_path) == []
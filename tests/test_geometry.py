@@ -0,0 +1,166 @@
+"""Tests for geometry helpers."""
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from custom_components.canal_river_trust.api import parse_notices
+from custom_components.canal_river_trust.geometry import (
+    PackedPath,
+    centroid,
+    extract_coordinates,
+    grid_clusters,
+    haversine_km,
+    notice_feature,
+    pack_geometry,
+    simplify,
+)
+
+from .conftest import feature_collection, make_notice
+
+# A line heading east with a 20 metre kink in the middle, at about 53°N
+KINKED = [(-2.0, 53.0), (-1.999, 53.0), (-1.998, 53.00018), (-1.997, 53.0), (-1.996, 53.0)]
+
+
+def test_simplify_keeps_points_beyond_tolerance() -> None:
+    """Test that only vertices further than the tolerance from the line are kept."""
+    assert simplify(KINKED, 50) == [KINKED[0], KINKED[-1]]
+    assert simplify(KINKED, 10) == [KINKED[0], KINKED[2], KINKED[-1]]
+    assert simplify(KINKED, 0) == KINKED
+    assert simplify(KINKED[:2], 1000) == KINKED[:2]
+
+
+def test_simplify_closed_line() -> None:
+    """Test a line that ends where it starts."""
+    loop = [(-2.0, 53.0), (-1.99, 53.0), (-1.99, 53.01), (-2.0, 53.0)]
+
+    assert simplify(loop, 10) == loop
+
+
+def test_packed_path_quantises_coordinates() -> None:
+    """Test that coordinates are stored to 1e-5 degrees."""
+    path = PackedPath([[(-2.123456, 53.987654), (-2.1, 54.0)], [(-1.5, 52.5)]])
+
+    assert len(path) == 3
+    assert path.parts() == [[(-2.12346, 53.98765), (-2.1, 54.0)], [(-1.5, 52.5)]]
+    assert path.nbytes == 3 * 2 * 4 + 3 * 4
+    assert path.representative_point() == [-2.1, 54.0]
+    assert path.to_geojson() == {
+        "type": "MultiLineString",
+        "coordinates": [[[-2.12346, 53.98765], [-2.1, 54.0]], [[-1.5, 52.5]]],
+    }
+    assert PackedPath([]).representative_point() is None
+
+
+def test_encode_polylines() -> None:
+    """Test the encoded polyline format against its reference example."""
+    path = PackedPath([[(-120.2, 38.5), (-120.95, 40.7), (-126.453, 43.252)]])
+
+    assert path.encode_polylines() == ["_p~iF~ps|U_ulLnnqC_mqNvxq`@"]
+
+
+@pytest.mark.parametrize(
+    "geometry",
+    [
+        {"type": "LineString", "coordinates": [list(point) for point in KINKED]},
+        {"type": "MultiLineString", "coordinates": [[list(point) for point in KINKED]]},
+        {
+            "type": "GeometryCollection",
+            "geometries": [
+                {"type": "Point", "coordinates": [-2.0, 53.0]},
+                {"type": "LineString", "coordinates": [list(point) for point in KINKED]},
+            ],
+        },
+    ],
+)
+def test_pack_geometry_lines(geometry) -> None:
+    """Test that line geometries are simplified and packed."""
+    packed = pack_geometry(geometry, 50)
+
+    assert isinstance(packed, PackedPath)
+    assert packed.parts() == [[KINKED[0], KINKED[-1]]]
+
+
+@pytest.mark.parametrize(
+    "geometry",
+    [
+        {"type": "Point", "coordinates": [-2.0, 53.0]},
+        {"type": "GeometryCollection", "geometries": [{"type": "Point", "coordinates": [-2.0, 53.0]}]},
+        {"type": "LineString", "coordinates": []},
+    ],
+)
+def test_pack_geometry_leaves_other_geometries(geometry) -> None:
+    """Test that points and empty lines are returned unchanged."""
+    assert pack_geometry(geometry, 50) is geometry
+
+
+@pytest.mark.parametrize(
+    ("geometry", "expected"),
+    [
+        (None, None),
+        ({"type": "Point", "coordinates": [-2.0, 53.0]}, [-2.0, 53.0]),
+        (
+            {"type": "GeometryCollection", "geometries": [{"type": "Point", "coordinates": [-2.0, 53.0]}]},
+            [-2.0, 53.0],
+        ),
+        ({"type": "LineString", "coordinates": [[0, 0], [1, 1], [2, 2]]}, [1, 1]),
+        ({"type": "MultiLineString", "coordinates": [[[0, 0], [1, 1]], [[5, 5]]]}, [1, 1]),
+        ({"type": "Polygon", "coordinates": []}, None),
+        (PackedPath([list(KINKED)]), [-1.998, 53.00018]),
+    ],
+)
+def test_extract_coordinates(geometry, expected) -> None:
+    """Test the representative point of each geometry type."""
+    assert extract_coordinates(geometry) == expected
+
+
+def test_parse_notices_packs_lines() -> None:
+    """Test that line geometries are packed when a response is parsed."""
+    line = {"type": "LineString", "coordinates": [list(point) for point in KINKED]}
+    body = json.dumps(feature_collection([make_notice(1, geometry=line), make_notice(2)])).encode()
+
+    notices = parse_notices(body, simplify_tolerance=50)
+
+    assert isinstance(notices[0]["geometry"], PackedPath)
+    assert notices[1]["geometry"] == {"type": "Point", "coordinates": [-1.98, 53.02]}
+    feature = notice_feature(notices[0])
+    assert feature["id"] == 1
+    assert feature["geometry"] == {"type": "LineString", "coordinates": [[-2.0, 53.0], [-1.996, 53.0]]}
+    assert "geometry" not in feature["properties"]
+
+
+def test_centroid() -> None:
+    """Test the centroid of points on the sphere."""
+    assert centroid([]) is None
+    assert centroid([(53.0, -2.0)]) == (53.0, -2.0)
+    assert centroid([(52.0, -2.0), (54.0, -2.0)]) == pytest.approx((53.0, -2.0), abs=0.01)
+    # Points either side of the antimeridian meet at it, not at the meridian
+    assert abs(centroid([(0.0, 179.0), (0.0, -179.0)])[1]) == pytest.approx(180.0)
+
+
+def test_haversine_km() -> None:
+    """Test the distance between two points."""
+    assert haversine_km(53.0, -2.0, 53.0, -2.0) == 0
+    assert haversine_km(53.0, -2.0, 54.0, -2.0) == pytest.approx(111.19, abs=0.01)
+
+
+def test_grid_clusters() -> None:
+    """Test that points are grouped per cell, largest clusters first."""
+    points = [
+        (53.01, -2.01, "Emergency"),
+        (53.02, -2.02, "Maintenance"),
+        (53.03, -2.03, "Emergency"),
+        (52.51, -1.51, "Lock Works"),
+    ]
+
+    clusters = grid_clusters(points, 0.1)
+
+    assert [cluster["count"] for cluster in clusters] == [3, 1]
+    assert clusters[0]["reason"] == "Emergency"
+    assert clusters[0]["latitude"] == pytest.approx(53.02, abs=0.001)
+    assert clusters[0]["longitude"] == pytest.approx(-2.02, abs=0.001)
+    assert (clusters[1]["latitude"], clusters[1]["longitude"]) == (52.51, -1.51)
+    assert len(grid_clusters(points, 1.0)) == 2
+    assert len(grid_clusters(points, 0.01)) == 4
+    assert grid_clusters([], 0.1) == []
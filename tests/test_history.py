@@ -0,0 +1,116 @@
+"""Tests for the local notice history."""
+from __future__ import annotations
+
+from datetime import timedelta
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.canal_river_trust.const import DOMAIN, SERVICE_QUERY_HISTORY
+from custom_components.canal_river_trust.history import NoticeHistory
+
+from .conftest import (
+    START,
+    MockNoticesApi,
+    async_setup_integration,
+    get_coordinator,
+    live_notice,
+    make_notice,
+)
+
+
+def _notice(notice_id: int, days_from: float, days: float, **fields):
+    """Return a notice running for some days from some days after START."""
+    start = START + timedelta(days=days_from)
+    return make_notice(
+        notice_id,
+        start=start.isoformat(),
+        end=(start + timedelta(days=days)).isoformat(),
+        **fields,
+    )
+
+
+def test_record_counts_changes(tmp_path) -> None:
+    """Test that each refresh records added, updated and removed notices."""
+    history = NoticeHistory(str(tmp_path / "history.db"))
+
+    assert history.record([_notice(1, 0, 2), _notice(2, 1, 4), _notice(1, 0, 2)], START) == {
+        "added": 2, "updated": 0, "removed": 0
+    }
+    assert history.record([_notice(1, 0, 2), _notice(2, 1, 4)], START + timedelta(hours=4)) == {
+        "added": 0, "updated": 0, "removed": 0
+    }
+    assert history.record([_notice(1, 0, 3)], START + timedelta(hours=8)) == {
+        "added": 0, "updated": 1, "removed": 1
+    }
+
+    changes = history.notice_changes("1")
+    assert [change["change"] for change in changes] == ["added", "updated"]
+    assert changes[1]["notice"]["end_date"] == (START + timedelta(days=3)).isoformat()
+    assert [change["change"] for change in history.notice_changes("2")] == ["added", "removed"]
+    assert history.notice_changes("3") == []
+
+    # A removed notice that comes back is added again
+    assert history.record([_notice(1, 0, 3), _notice(2, 1, 4)], START + timedelta(hours=12)) == {
+        "added": 1, "updated": 0, "removed": 0
+    }
+    assert [change["change"] for change in history.notice_changes("2")] == [
+        "added", "removed", "added"
+    ]
+
+
+def test_queries(tmp_path) -> None:
+    """Test the waterway duration and closure count queries."""
+    history = NoticeHistory(str(tmp_path / "history.db"))
+    history.record(
+        [
+            _notice(1, 0, 2, typeId=2, title="Lock 21 gate repair"),
+            _notice(2, 10, 4, typeId=2, region="Midlands", waterways=["Coventry Canal", "Oxford Canal"]),
+            _notice(3, 20, 1, waterways="Coventry Canal"),
+            make_notice(4, typeId=2),
+        ],
+        START,
+    )
+
+    assert history.waterway_durations() == [
+        {"waterway": "Coventry Canal", "notices": 2, "mean_days": 2.5},
+        {"waterway": "Leeds & Liverpool Canal", "notices": 1, "mean_days": 2.0},
+        {"waterway": "Oxford Canal", "notices": 1, "mean_days": 4.0},
+    ]
+    since = (START + timedelta(days=5)).isoformat()
+    assert history.waterway_durations(since, "Coventry Canal") == [
+        {"waterway": "Coventry Canal", "notices": 2, "mean_days": 2.5}
+    ]
+
+    assert history.closure_count() == 3
+    assert history.closure_count(title="lock 21") == 1
+    assert history.closure_count(region="Midlands", waterway="Oxford Canal") == 1
+    assert history.closure_count(waterway="Coventry Canal", since=since) == 1
+    assert history.closure_count(region="Wales") == 0
+
+
+async def test_query_history_service(
+    hass: HomeAssistant, mock_api: MockNoticesApi, tmp_path
+) -> None:
+    """Test the query_history service against the notices of a refresh."""
+    hass.config.config_dir = str(tmp_path)
+    (tmp_path / ".storage").mkdir()
+    mock_api.notices = [live_notice(1, 0, 2, typeId=2), live_notice(2, 1, 3)]
+    await async_setup_integration(hass)
+
+    mock_api.notices = [live_notice(1, 0, 5, typeId=2)]
+    await get_coordinator(hass).async_refresh()
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_QUERY_HISTORY,
+        {"query": "notice_changes", "key": "1"},
+        blocking=True,
+        return_response=True,
+    )
+    assert response["query"] == "notice_changes"
+    assert [change["change"] for change in response["result"]] == ["added", "updated"]
+
+    response = await hass.services.async_call(
+        DOMAIN, SERVICE_QUERY_HISTORY, {"query": "closure_count"}, blocking=True, return_response=True
+    )
+    assert response["result"] == 1
@@ -0,0 +1,121 @@
+"""Tests for the interval tree, start-time index and path trie."""
+from __future__ import annotations
+
+import random
+from datetime import timedelta
+
+from custom_components.canal_river_trust.index import (
+    IntervalTree,
+    PathTrie,
+    StartTimeIndex,
+    build_interval_tree,
+    build_path_trie,
+)
+
+from .conftest import START, make_notice
+
+
+def _brute_force(intervals, start, end):
+    """Return the values overlapping [start, end) by scanning every interval."""
+    return [item for item in intervals if item[0] < end and item[1] > start]
+
+
+def test_interval_tree_matches_brute_force() -> None:
+    """Test overlap queries against a linear scan of random intervals."""
+    rng = random.Random(4)
+    intervals = []
+    for value in range(300):
+        start = START + timedelta(hours=rng.randrange(0, 24 * 60))
+        intervals.append((start, start + timedelta(hours=rng.randrange(1, 24 * 14)), value))
+    tree = IntervalTree(intervals)
+    starts = {value: start for start, _, value in intervals}
+
+    assert len(tree) == 300
+    for _ in range(200):
+        start = START + timedelta(hours=rng.randrange(-48, 24 * 75))
+        end = start + timedelta(hours=rng.randrange(1, 24 * 10))
+        found = tree.overlapping(start, end)
+        assert sorted(found) == sorted(item[2] for item in _brute_force(intervals, start, end))
+        assert [starts[value] for value in found] == sorted(starts[value] for value in found)
+
+
+def test_interval_tree_is_half_open() -> None:
+    """Test that intervals touching the query window do not overlap it."""
+    tree = IntervalTree([(START, START + timedelta(days=1), "a")])
+
+    assert tree.overlapping(START + timedelta(days=1), START + timedelta(days=2)) == []
+    assert tree.overlapping(START - timedelta(days=1), START) == []
+    assert tree.overlapping(START - timedelta(days=1), START + timedelta(seconds=1)) == ["a"]
+
+
+def test_interval_tree_start_queries() -> None:
+    """Test the next interval and the intervals starting in a window."""
+    tree = IntervalTree(
+        (START + timedelta(days=day), START + timedelta(days=day + 1), day) for day in (3, 1, 2)
+    )
+
+    assert tree.next_starting(START)[2] == 1
+    assert tree.next_starting(START + timedelta(days=1))[2] == 2
+    assert tree.next_starting(START + timedelta(days=3)) is None
+    assert tree.starting_between(START + timedelta(days=1), START + timedelta(days=3)) == [1, 2]
+    assert len(IntervalTree([])) == 0
+    assert IntervalTree([]).overlapping(START, START + timedelta(days=1)) == []
+
+
+def test_build_interval_tree_skips_notices_without_times(notices, times) -> None:
+    """Test that notices without parsed times are left out of the tree."""
+    del times["4"]
+    tree = build_interval_tree(notices, times)
+
+    assert len(tree) == 3
+    found = tree.overlapping(START + timedelta(days=1), START + timedelta(days=2))
+    assert [notice["id"] for notice in found] == [1, 2]
+
+
+def test_start_time_index_bounds_are_inclusive() -> None:
+    """Test range queries on the start-time index."""
+    index = StartTimeIndex((START + timedelta(days=day), day) for day in (5, 0, 2, 2, 9))
+
+    assert len(index) == 5
+    window = (START + timedelta(days=2), START + timedelta(days=5))
+    assert [value for _, value in index.between(*window)] == [2, 2, 5]
+    assert index.count_between(*window) == 3
+    assert index.count_between(START + timedelta(days=10), START + timedelta(days=20)) == 0
+
+
+def test_path_trie_queries() -> None:
+    """Test prefix, name and substring queries, ignoring case."""
+    trie: PathTrie[str] = PathTrie()
+    trie.insert(["North West", "Leeds & Liverpool Canal", "Lock 21"], "1", "a")
+    trie.insert(["North West", "Leeds & Liverpool Canal", "Lock 30"], "2", "b")
+    trie.insert(["Midlands", "Coventry Canal"], "3", "c")
+    trie.insert(["Yorkshire", "Lock 21"], "4", "d")
+
+    assert len(trie) == 4
+    assert trie.get(["north west"]) == {"1": "a", "2": "b"}
+    assert trie.get(["North West", "Leeds & Liverpool Canal", "Lock 30"]) == {"2": "b"}
+    assert trie.get(["North West", "Coventry Canal"]) == {}
+    assert trie.lookup("LOCK 21") == {"1": "a", "4": "d"}
+    assert trie.lookup("Lock 99") == {}
+    assert trie.search("canal") == {"1": "a", "2": "b", "3": "c"}
+
+
+def test_build_path_trie_places_notices_without_path(notices) -> None:
+    """Test that notices without a path are placed under each waterway."""
+    trie = build_path_trie(notices)
+
+    assert set(trie.lookup("Coventry Canal")) == {"3", "4"}
+    assert set(trie.lookup("Trent & Mersey Canal")) == {"3"}
+    assert set(trie.get(["North West", "Leeds & Liverpool Canal"])) == {"1", "2"}
+    # A path repeating the region is not nested under it twice
+    assert trie.get(["North West", "North West"]) == {}
+
+
+def test_build_path_trie_without_region_or_waterway() -> None:
+    """Test that a notice with neither region nor waterway is left out."""
+    trie = build_path_trie(
+        [make_notice(1, region=None, waterways=None), make_notice(2, region="Wales", waterways=None)]
+    )
+
+    assert len(trie) == 1
+    assert set(trie.get(["Wales"])) == {"2"}
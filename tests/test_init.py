@@ -0,0 +1,87 @@
+"""Tests for config entry setup and migration."""
+from __future__ import annotations
+
+from unittest.mock import patch
+
+from homeassistant import config_entries
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import HomeAssistant
+from homeassistant.data_entry_flow import FlowResultType
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.canal_river_trust.const import (
+    CONF_NOTICE_LISTS,
+    CONF_UPDATE_INTERVAL,
+    DOMAIN,
+)
+
+from .conftest import ENTRY_ID, MockNoticesApi, live_notice
+
+CLOSURES = "sensor.canal_river_trust_closures"
+
+
+async def _async_setup_entry(hass: HomeAssistant, entry: MockConfigEntry) -> None:
+    """Set up a config entry."""
+    entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+
+async def test_migration_keeps_notice_lists(
+    hass: HomeAssistant, mock_api: MockNoticesApi
+) -> None:
+    """Test that entries set up before notice lists became optional keep them."""
+    mock_api.notices = [live_notice(1, 0, 2, typeId=2)]
+    entry = MockConfigEntry(
+        domain=DOMAIN, data={}, options={CONF_UPDATE_INTERVAL: 60}, entry_id=ENTRY_ID
+    )
+
+    await _async_setup_entry(hass, entry)
+
+    assert entry.state is ConfigEntryState.LOADED
+    assert (entry.version, entry.minor_version) == (1, 2)
+    assert entry.options == {CONF_UPDATE_INTERVAL: 60, CONF_NOTICE_LISTS: True}
+    assert len(hass.states.get(CLOSURES).attributes["closures"]) == 1
+
+
+async def test_migration_keeps_chosen_option(
+    hass: HomeAssistant, mock_api: MockNoticesApi
+) -> None:
+    """Test that a notice lists option already chosen is left alone."""
+    entry = MockConfigEntry(
+        domain=DOMAIN, data={}, options={CONF_NOTICE_LISTS: False}, entry_id=ENTRY_ID
+    )
+
+    await _async_setup_entry(hass, entry)
+
+    assert entry.minor_version == 2
+    assert entry.options == {CONF_NOTICE_LISTS: False}
+    assert "closures" not in hass.states.get(CLOSURES).attributes
+
+
+async def test_newer_entry_is_not_set_up(hass: HomeAssistant, mock_api: MockNoticesApi) -> None:
+    """Test that an entry from a newer release is not migrated."""
+    entry = MockConfigEntry(domain=DOMAIN, data={}, version=2, entry_id=ENTRY_ID)
+
+    await _async_setup_entry(hass, entry)
+
+    assert entry.state is ConfigEntryState.MIGRATION_ERROR
+
+
+async def test_new_entry_is_count_only(hass: HomeAssistant, mock_api: MockNoticesApi) -> None:
+    """Test that entries created by the config flow start without notice lists."""
+    mock_api.notices = [live_notice(1, 0, 2, typeId=2)]
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_USER}
+    )
+    with patch("custom_components.canal_river_trust.api.CanalRiverTrustAPI.probe"):
+        result = await hass.config_entries.flow.async_configure(result["flow_id"], {})
+        await hass.async_block_till_done()
+
+    assert result["type"] == FlowResultType.CREATE_ENTRY
+    entry = result["result"]
+    assert (entry.version, entry.minor_version) == (1, 2)
+    assert CONF_NOTICE_LISTS not in entry.options
+    state = hass.states.get(CLOSURES)
+    assert state.state == "1"
+    assert "closures" not in state.attributes
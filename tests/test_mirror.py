@@ -0,0 +1,106 @@
+"""Tests for the notice mirror."""
+from __future__ import annotations
+
+from http import HTTPStatus
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.setup import async_setup_component
+
+from custom_components.canal_river_trust.api import CanalRiverTrustAPI, parse_notices
+from custom_components.canal_river_trust.const import CONF_MIRROR, MIRROR_URL
+from custom_components.canal_river_trust.mirror import build_feature_collection, check_query
+
+from .conftest import (
+    MockNoticesApi,
+    async_setup_integration,
+    get_coordinator,
+    live_notice,
+    make_notice,
+)
+
+# Captured before the mock_api fixture patches it, for the downstream client
+FETCH_BODY = CanalRiverTrustAPI._async_fetch_body
+
+SERVED = {
+    "consult": "false",
+    "geometry": "point",
+    "start": "2026-01-05",
+    "end": "2027-01-04",
+    "fields": "title,region,start,end",
+}
+
+
+@pytest.mark.parametrize(
+    ("query", "allowed"),
+    [
+        ({}, True),
+        (SERVED, True),
+        ({"fields": "title,start", "unknown": "1"}, True),
+        ({"start": "2026-01-04", "end": "2027-01-05"}, True),
+        ({"fields": "title,geometry"}, False),
+        ({"geometry": "line"}, False),
+        ({"consult": "true"}, False),
+        ({"start": "2026-01-07"}, False),
+        ({"end": "not a date"}, False),
+    ],
+)
+def test_check_query(query: dict[str, str], allowed: bool) -> None:
+    """Test which downstream queries the mirror answers."""
+    assert (check_query(query, SERVED) is None) is allowed
+
+
+def test_feature_collection_round_trip() -> None:
+    """Test that a mirrored notice set parses back to the same notices."""
+    notice = make_notice(1, geometry={"type": "Point", "coordinates": [-2.0, 53.0]})
+    notices = parse_notices(build_feature_collection([notice])[0])
+
+    assert notices == [notice]
+    assert build_feature_collection(notices)[1] == build_feature_collection(notices)[1]
+
+
+async def test_mirror_view(
+    hass: HomeAssistant, hass_client_no_auth, mock_api: MockNoticesApi
+) -> None:
+    """Test the mirror view and a downstream client's conditional requests."""
+    assert await async_setup_component(hass, "http", {})
+    mock_api.notices = [live_notice(1, 0, 2), live_notice(2, 1, 2, typeId=2)]
+    await async_setup_integration(hass, {CONF_MIRROR: True})
+    client = await hass_client_no_auth()
+
+    response = await client.get(MIRROR_URL)
+    assert response.status == HTTPStatus.OK
+    etag = response.headers["ETag"]
+    assert [feature["id"] for feature in (await response.json())["features"]] == [1, 2]
+
+    response = await client.get(MIRROR_URL, headers={"If-None-Match": etag})
+    assert response.status == HTTPStatus.NOT_MODIFIED
+
+    response = await client.get(MIRROR_URL, params={"geometry": "line"})
+    assert response.status == HTTPStatus.BAD_REQUEST
+
+    # A downstream installation pointed at the mirror reuses its copy on 304
+    downstream = CanalRiverTrustAPI(client, endpoint=MIRROR_URL)
+    body = await FETCH_BODY(downstream)
+    assert await FETCH_BODY(downstream) is body
+    assert downstream.metrics["not_modified"] == 1
+    assert [notice["id"] for notice in parse_notices(body)] == [1, 2]
+
+    mock_api.notices = [live_notice(1, 0, 2)]
+    await get_coordinator(hass).async_refresh()
+    response = await client.get(MIRROR_URL, headers={"If-None-Match": etag})
+    assert response.status == HTTPStatus.OK
+    assert response.headers["ETag"] != etag
+    assert [notice["id"] for notice in parse_notices(await FETCH_BODY(downstream))] == [1]
+
+
+async def test_mirror_disabled(
+    hass: HomeAssistant, hass_client_no_auth, mock_api: MockNoticesApi
+) -> None:
+    """Test that the mirror is not served unless enabled."""
+    assert await async_setup_component(hass, "http", {})
+    await async_setup_integration(hass)
+    client = await hass_client_no_auth()
+
+    response = await client.get(MIRROR_URL)
+    assert response.status == HTTPStatus.NOT_FOUND
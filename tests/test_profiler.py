@@ -0,0 +1,137 @@
+"""Tests for the refresh profiler."""
+from __future__ import annotations
+
+import tracemalloc
+
+import pytest
+
+from custom_components.canal_river_trust.profiler import RefreshProfiler
+
+
+@pytest.fixture(autouse=True)
+def stop_tracemalloc():
+    """Leave tracemalloc as the test found it."""
+    was_tracing = tracemalloc.is_tracing()
+    yield
+    if tracemalloc.is_tracing() and not was_tracing:
+        tracemalloc.stop()
+
+
+def _work() -> int:
+    """Do something worth profiling."""
+    return sum(len(str(number)) for number in range(2000))
+
+
+def _allocate() -> list[bytes]:
+    """Allocate memory that outlives the call."""
+    return [bytes(1000) for _ in range(100)]
+
+
+ALLOCATION_SITE = f"{__file__}:{_allocate.__code__.co_firstlineno + 2}"
+
+
+def _allocated(allocations: list[tuple[str, int, int]]) -> int:
+    """Return the bytes a refresh allocated in _allocate."""
+    return sum(size for site, size, _ in allocations if site == ALLOCATION_SITE)
+
+
+def test_profiles_the_requested_refreshes(tmp_path) -> None:
+    """Test that the profiler counts refreshes and writes a report."""
+    profiler = RefreshProfiler(2, str(tmp_path / "profile.txt"))
+
+    profiler.start()
+    assert profiler.active
+    assert tracemalloc.is_tracing()
+    _work()
+    assert profiler.stop() is False
+    assert not profiler.active
+    assert not tracemalloc.is_tracing()
+    assert profiler.remaining == 1
+
+    profiler.start()
+    _work()
+    assert profiler.stop() is True
+    assert not tracemalloc.is_tracing()
+
+    summary = profiler.write_report()
+    assert summary["refreshes"] == 2
+    assert len(summary["durations_s"]) == 2
+    assert summary["top_functions"]
+    report = (tmp_path / "profile.txt").read_text(encoding="utf-8")
+    assert report.startswith("Canal & River Trust refresh profile (2 refreshes)")
+    assert "_work" in report
+
+
+def test_start_is_a_no_op_while_active(tmp_path) -> None:
+    """Test that a second start keeps the running profile."""
+    profiler = RefreshProfiler(1, str(tmp_path / "profile.txt"))
+
+    profiler.start()
+    profile = profiler._profile
+    profiler.start()
+    assert profiler._profile is profile
+
+    assert profiler.stop() is True
+    assert profiler.remaining == 0
+
+
+def test_discard_does_not_count(tmp_path) -> None:
+    """Test that a failed refresh is dropped without using up the count."""
+    profiler = RefreshProfiler(1, str(tmp_path / "profile.txt"))
+
+    profiler.start()
+    profiler.discard()
+    assert not profiler.active
+    assert profiler.remaining == 1
+    assert not tracemalloc.is_tracing()
+
+    # Stopping after a discard is not a completed refresh either
+    assert profiler.stop() is False
+    profiler.discard()
+
+    profiler.start()
+    assert profiler.stop() is True
+
+
+def test_keeps_tracemalloc_started_elsewhere(tmp_path) -> None:
+    """Test that tracemalloc is only stopped by the profiler that started it."""
+    tracemalloc.start()
+    profiler = RefreshProfiler(1, str(tmp_path / "profile.txt"))
+
+    profiler.start()
+    assert profiler.stop() is True
+    assert tracemalloc.is_tracing()
+
+    profiler.start()
+    profiler.discard()
+    assert tracemalloc.is_tracing()
+
+
+def test_allocations_are_per_refresh(tmp_path) -> None:
+    """Test that memory allocated between refreshes is not reported."""
+    profiler = RefreshProfiler(2, str(tmp_path / "profile.txt"))
+
+    profiler.start()
+    during = _allocate()
+    profiler.stop()
+    between = _allocate()
+    profiler.start()
+    profiler.stop()
+
+    assert _allocated(profiler._allocations[0]) >= 100 * 1000
+    assert _allocated(profiler._allocations[1]) == 0
+    assert len(during) == len(between)
+
+
+def test_allocations_with_tracemalloc_started_elsewhere(tmp_path) -> None:
+    """Test that only the refresh's allocations count when tracing was already on."""
+    tracemalloc.start()
+    before = _allocate()
+    profiler = RefreshProfiler(1, str(tmp_path / "profile.txt"))
+
+    profiler.start()
+    during = _allocate()
+    profiler.stop()
+
+    assert 100 * 1000 <= _allocated(profiler._allocations[0]) < 2 * 100 * 1000
+    assert len(before) == len(during)
@@ -0,0 +1,92 @@
+"""Tests for cruise route checks."""
+from __future__ import annotations
+
+from datetime import timedelta
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ServiceValidationError
+
+from custom_components.canal_river_trust.const import (
+    CONF_ROUTE_DAYS,
+    CONF_ROUTES,
+    DOMAIN,
+    SERVICE_CHECK_ROUTE,
+)
+from custom_components.canal_river_trust.index import build_path_trie
+from custom_components.canal_river_trust.routes import RouteChecker, parse_routes, within_window
+
+from .conftest import START, MockNoticesApi, async_setup_integration, live_notice
+
+
+def test_parse_routes() -> None:
+    """Test routes separated by semicolons and new lines."""
+    assert parse_routes(
+        "Home: Leeds & Liverpool Canal > Lock 21; Midlands loop: Coventry Canal >  > Trent & Mersey Canal\n"
+        "no separator\nEmpty: \n: Nameless"
+    ) == {
+        "Home": ["Leeds & Liverpool Canal", "Lock 21"],
+        "Midlands loop": ["Coventry Canal", "Trent & Mersey Canal"],
+    }
+    assert parse_routes(None) == {}
+
+
+def test_route_checker(notices) -> None:
+    """Test that only stoppages and closures on a segment block a route."""
+    checker = RouteChecker(
+        {"Home": ["Lock 21", "Lock 30"], "Midlands": ["Coventry Canal"], "Nowhere": ["Wales"]}
+    )
+    assert checker.blocking("Home") == []
+
+    checker.update(build_path_trie(notices))
+
+    assert [notice["id"] for notice in checker.blocking("Home")] == [1, 2]
+    # The advisory on the Coventry Canal does not block it
+    assert [notice["id"] for notice in checker.blocking("Midlands")] == [3]
+    assert checker.blocking("Nowhere") == []
+    assert checker.blocking("Unknown") == []
+    # A notice on several segments is reported once
+    assert [notice["id"] for notice in checker.find_blocking(["North West", "Lock 21"])] == [1, 2]
+
+
+def test_within_window(notices, times) -> None:
+    """Test that notices are kept when their dates overlap the window."""
+    window = within_window(notices, times, START + timedelta(days=2), START + timedelta(days=4))
+
+    assert [notice["key"] for notice in window] == ["2", "3"]
+    assert within_window(notices, {}, START, START + timedelta(days=30)) == []
+
+
+async def test_route_sensor_and_service(hass: HomeAssistant, mock_api: MockNoticesApi) -> None:
+    """Test the route sensor and the check_route service."""
+    mock_api.notices = [
+        live_notice(1, 1, 2, typeId=2, path="North West > Leeds & Liverpool Canal > Lock 21"),
+        live_notice(2, 20, 2, typeId=1, path="North West > Leeds & Liverpool Canal > Lock 30"),
+        live_notice(3, 1, 2, typeId=4, path="North West > Leeds & Liverpool Canal > Lock 30"),
+    ]
+    await async_setup_integration(
+        hass, {CONF_ROUTES: "Home: Lock 21 > Lock 30", CONF_ROUTE_DAYS: 7}
+    )
+
+    state = hass.states.get("sensor.canal_river_trust_route_home")
+    assert state.state == "1"
+    assert state.attributes["route"] == ["Lock 21", "Lock 30"]
+    assert state.attributes["blocked"] is True
+    assert [notice["key"] for notice in state.attributes["blocking_notices"]] == ["1"]
+
+    response = await hass.services.async_call(
+        DOMAIN, SERVICE_CHECK_ROUTE, {"name": "Home", "days": 30}, blocking=True, return_response=True
+    )
+    assert response["route"] == ["Lock 21", "Lock 30"]
+    assert [notice["key"] for notice in response["notices"]] == ["1", "2"]
+
+    response = await hass.services.async_call(
+        DOMAIN, SERVICE_CHECK_ROUTE, {"route": ["Lock 30"]}, blocking=True, return_response=True
+    )
+    assert response["days"] == 7
+    assert response["blocked"] is False
+
+    with pytest.raises(ServiceValidationError):
+        await hass.services.async_call(
+            DOMAIN, SERVICE_CHECK_ROUTE, {"name": "Away"}, blocking=True, return_response=True
+        )
@@ -0,0 +1,147 @@
+"""Tests for the notice sensors."""
+from __future__ import annotations
+
+from datetime import timedelta
+
+import pytest
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.canal_river_trust.const import (
+    ATTRIBUTE_FORMAT_COLUMNAR,
+    CLUSTER_LEVELS,
+    CONF_ATTRIBUTE_FORMAT,
+    CONF_NOTICE_LISTS,
+    CONF_UPCOMING_HORIZONS,
+    DOMAIN,
+)
+from custom_components.canal_river_trust.sensor import CanalRiverTrustClosuresSensor
+
+from .conftest import (
+    ENTRY_ID,
+    MockNoticesApi,
+    async_setup_integration,
+    from_columnar,
+    get_coordinator,
+    live_notice,
+)
+
+CLOSURES = "sensor.canal_river_trust_closures"
+
+
+async def test_map_centre_and_clusters(hass: HomeAssistant, mock_api: MockNoticesApi) -> None:
+    """Test that closures are placed at their centre and clustered per zoom level."""
+    mock_api.notices = [
+        live_notice(1, 0, 2, typeId=2, reasonId=4),
+        live_notice(3, 0, 2, typeId=2, reasonId=4),
+        live_notice(40, 0, 2, typeId=2, reasonId=1),
+        live_notice(2, 0, 2),
+    ]
+    await async_setup_integration(hass, {CONF_NOTICE_LISTS: True})
+    coordinator = get_coordinator(hass)
+
+    latitude, longitude = coordinator.map_centre("closures")
+    assert latitude == pytest.approx(53.147, abs=0.01)
+    assert longitude == pytest.approx(-1.853, abs=0.01)
+
+    clusters = hass.states.get(CLOSURES).attributes["clusters"]
+    assert list(clusters) == list(CLUSTER_LEVELS)
+    assert [cluster["count"] for cluster in clusters["region"]] == [3]
+    assert [(cluster["count"], cluster["reason"]) for cluster in clusters["area"]] == [
+        (2, "Emergency"), (1, "Maintenance")
+    ]
+    assert sum(cluster["count"] for cluster in clusters["local"]) == 3
+
+    # Derived once per refresh and shared by the entities
+    assert coordinator.map_clusters("closures") is coordinator.map_clusters("closures")
+    assert "clusters" in CanalRiverTrustClosuresSensor._unrecorded_attributes
+
+
+async def test_no_located_notices(hass: HomeAssistant, mock_api: MockNoticesApi) -> None:
+    """Test the centre and clusters when no notice has a location."""
+    mock_api.notices = [live_notice(1, 0, 2, typeId=2, geometry={"type": "Point", "coordinates": []})]
+    await async_setup_integration(hass, {CONF_NOTICE_LISTS: True})
+    coordinator = get_coordinator(hass)
+
+    assert coordinator.map_centre("closures") is None
+    assert coordinator.map_clusters("closures") == {level: [] for level in CLUSTER_LEVELS}
+
+
+async def test_unchanged_states_are_not_written(
+    hass: HomeAssistant, mock_api: MockNoticesApi
+) -> None:
+    """Test that a refresh returning the same notices does not write state."""
+    mock_api.notices = [live_notice(1, 0, 2, typeId=2), live_notice(2, 0, 2)]
+    await async_setup_integration(hass, {CONF_NOTICE_LISTS: True})
+    coordinator = get_coordinator(hass)
+    stats = coordinator.state_write_stats["closures"]
+    written = stats["written"]
+    last_changed = hass.states.get(CLOSURES).last_updated
+
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+    assert stats == {"written": written, "suppressed": 1}
+    assert hass.states.get(CLOSURES).last_updated == last_changed
+
+    # A change to a listed notice is written even though the count is the same
+    mock_api.notices = [live_notice(1, 0, 3, typeId=2), live_notice(2, 0, 2)]
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+    assert stats == {"written": written + 1, "suppressed": 1}
+    assert hass.states.get(CLOSURES).state == "1"
+    assert hass.states.get(CLOSURES).last_updated != last_changed
+
+
+async def test_columnar_attributes(hass: HomeAssistant, mock_api: MockNoticesApi) -> None:
+    """Test that columnar notice lists decode to the rows format."""
+    mock_api.notices = [
+        live_notice(1, 0, 2, typeId=2, reasonId=4),
+        live_notice(2, 1, 2, typeId=2, region="Midlands", waterways=["Coventry Canal"]),
+    ]
+    entry = await async_setup_integration(hass, {CONF_NOTICE_LISTS: True})
+    rows = hass.states.get(CLOSURES).attributes["closures"]
+
+    hass.config_entries.async_update_entry(
+        entry, options={**entry.options, CONF_ATTRIBUTE_FORMAT: ATTRIBUTE_FORMAT_COLUMNAR}
+    )
+    await hass.async_block_till_done()
+    columnar = hass.states.get(CLOSURES).attributes["closures"]
+
+    assert columnar["format"] == "columnar"
+    assert from_columnar(columnar) == rows
+
+
+async def test_upcoming_horizons(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory, mock_api: MockNoticesApi
+) -> None:
+    """Test one upcoming sensor per horizon, updated as notices come within it."""
+    registry = er.async_get(hass)
+    # Upcoming sensors are disabled by default
+    for unique_id in ("upcoming", "upcoming_30d"):
+        registry.async_get_or_create("sensor", DOMAIN, f"{ENTRY_ID}_{unique_id}")
+    mock_api.notices = [
+        live_notice(1, -1, 3),
+        live_notice(2, 2, 1, typeId=2),
+        live_notice(3, 8, 1),
+        live_notice(4, 40, 1),
+    ]
+    await async_setup_integration(hass, {CONF_UPCOMING_HORIZONS: "30, 7"})
+    week = registry.async_get_entity_id("sensor", DOMAIN, f"{ENTRY_ID}_upcoming")
+    month = registry.async_get_entity_id("sensor", DOMAIN, f"{ENTRY_ID}_upcoming_30d")
+
+    assert hass.states.get(week).state == "1"
+    assert hass.states.get(week).attributes["days"] == 7
+    assert [notice["days_until"] for notice in hass.states.get(week).attributes["upcoming_issues"]] == [2]
+    assert hass.states.get(month).state == "2"
+    assert hass.states.get(month).attributes["days"] == 30
+
+    # Notice 3 comes within a week without another refresh
+    freezer.tick(timedelta(days=1, hours=1))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+    assert hass.states.get(week).state == "2"
+    assert hass.states.get(month).state == "2"
@@ -0,0 +1,103 @@
+"""Tests for the integration services."""
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+from typing import Any
+
+import pytest
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.auth.models import User
+from homeassistant.core import Context, HomeAssistant
+from homeassistant.exceptions import ServiceValidationError, Unauthorized
+
+from custom_components.canal_river_trust.const import (
+    DOMAIN,
+    REFRESH_COOLDOWN,
+    SERVICE_PROFILE_REFRESH,
+    SERVICE_REFRESH_DATA,
+)
+
+from .conftest import (
+    ENTRY_ID,
+    MockNoticesApi,
+    async_setup_integration,
+    get_coordinator,
+    live_notice,
+)
+
+
+async def _async_refresh_data(hass: HomeAssistant, **data: Any) -> dict[str, Any]:
+    """Call refresh_data and return the result of the test entry."""
+    response = await hass.services.async_call(
+        DOMAIN, SERVICE_REFRESH_DATA, data, blocking=True, return_response=True
+    )
+    return response["entries"][ENTRY_ID]
+
+
+async def test_profile_refresh_requires_admin(
+    hass: HomeAssistant, hass_read_only_user: User, mock_api: MockNoticesApi
+) -> None:
+    """Test that only administrators can start a refresh profile."""
+    await async_setup_integration(hass)
+
+    with pytest.raises(Unauthorized):
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_PROFILE_REFRESH,
+            {"refresh_now": False},
+            blocking=True,
+            context=Context(user_id=hass_read_only_user.id),
+        )
+    assert get_coordinator(hass).profiler is None
+
+    await hass.services.async_call(
+        DOMAIN, SERVICE_PROFILE_REFRESH, {"refresh_now": False}, blocking=True
+    )
+    assert get_coordinator(hass).profiler is not None
+    get_coordinator(hass).profiler = None
+
+
+async def test_refresh_data_cooldown(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory, mock_api: MockNoticesApi
+) -> None:
+    """Test that refreshes within the cooldown return the cached data unless forced."""
+    mock_api.notices = [live_notice(1, 0, 2)]
+    await async_setup_integration(hass)
+
+    result = await _async_refresh_data(hass)
+    assert result["fetched"] is False
+    assert result["notices"] == 1
+    assert mock_api.requests == 1
+
+    result = await _async_refresh_data(hass, force=True)
+    assert (result["fetched"], result["joined"], result["success"]) == (True, False, True)
+    assert mock_api.requests == 2
+
+    freezer.tick(REFRESH_COOLDOWN + timedelta(seconds=1))
+    mock_api.notices.append(live_notice(2, 0, 2))
+    result = await _async_refresh_data(hass, entity_id="sensor.canal_river_trust_stoppages")
+    assert result["fetched"] is True
+    assert result["notices"] == 2
+    assert mock_api.requests == 3
+
+    with pytest.raises(ServiceValidationError):
+        await _async_refresh_data(hass, entity_id="sensor.unknown")
+
+
+async def test_refresh_data_single_flight(hass: HomeAssistant, mock_api: MockNoticesApi) -> None:
+    """Test that refreshes requested during a refresh join it."""
+    await async_setup_integration(hass)
+    mock_api.gate = asyncio.Event()
+
+    first = hass.async_create_task(_async_refresh_data(hass, force=True))
+    while mock_api.requests < 2:
+        await asyncio.sleep(0)
+    others = [hass.async_create_task(_async_refresh_data(hass, force=True)) for _ in range(3)]
+    await asyncio.sleep(0)
+    mock_api.gate.set()
+    results = [await first] + [await task for task in others]
+
+    assert mock_api.requests == 2
+    assert [result["joined"] for result in results] == [False, True, True, True]
+    assert all(result["fetched"] and result["success"] for result in results)
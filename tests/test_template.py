@@ -0,0 +1,123 @@
+"""Tests for the template functions."""
+from __future__ import annotations
+
+from unittest.mock import patch
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import TemplateError
+from homeassistant.helpers import template
+from homeassistant.helpers.event import TrackTemplate, async_track_template_result
+from homeassistant.helpers.template import Template
+
+from custom_components.canal_river_trust import template as crt_template
+
+from .conftest import MockNoticesApi, async_setup_integration, get_coordinator, live_notice
+
+CLOSURES = "sensor.canal_river_trust_closures"
+STOPPAGES = "sensor.canal_river_trust_stoppages"
+
+
+def _render(hass: HomeAssistant, source: str):
+    """Render a template."""
+    return Template(source, hass).async_render()
+
+
+async def test_functions(hass: HomeAssistant, mock_api: MockNoticesApi) -> None:
+    """Test the answers of the template functions."""
+    mock_api.notices = [
+        live_notice(1, -1, 3, typeId=2, reasonId=4),
+        live_notice(2, 2, 1, typeId=2, reasonId=4, region="Midlands"),
+        live_notice(3, 10, 1),
+        live_notice(4, 1, 1, typeId=4),
+    ]
+    await async_setup_integration(hass)
+
+    # Advisories are listed with the stoppages
+    assert _render(hass, "{{ crt_count() }}") == 4
+    assert _render(hass, "{{ crt_count(reason='emergency', type='Closure') }}") == 2
+    assert _render(hass, "{{ crt_count(region='Midlands', reason='Emergency') }}") == 1
+    assert _render(hass, "{{ crt_count(region='Wales') }}") == 0
+    assert _render(hass, "{{ crt_nearest(53.02, -1.98).key }}") == 2
+    assert _render(hass, "{{ crt_nearest(53.02, -1.98).distance_km }}") == 0
+    assert _render(hass, "{{ crt_upcoming(5) | map(attribute='key') | list }}") == ["4", "2"]
+    assert _render(hass, "{{ crt_upcoming(30) | map(attribute='key') | list }}") == ["4", "2", "3"]
+    assert _render(hass, "{{ crt_count(entry_id='unknown') }}") == 0
+
+
+async def test_templates_track_the_notices(hass: HomeAssistant, mock_api: MockNoticesApi) -> None:
+    """Test that templates using the functions re-render when the notices change."""
+    mock_api.notices = [live_notice(1, 0, 2, typeId=2, region="Midlands"), live_notice(2, 0, 2)]
+    await async_setup_integration(hass)
+
+    info = Template("{{ crt_count(region='Midlands') }}", hass).async_render_to_info()
+    assert info.entities == {CLOSURES, STOPPAGES}
+    assert not info.has_time
+    assert Template("{{ crt_upcoming() }}", hass).async_render_to_info().has_time
+
+    results = []
+    tracker = async_track_template_result(
+        hass,
+        [TrackTemplate(Template("{{ crt_count(region='Midlands', type='Closure') }}", hass), None)],
+        lambda event, updates: results.append(updates[0].result),
+    )
+    tracker.async_refresh()
+    assert results == [1]
+
+    # Moving the closure to another region keeps every sensor's count
+    mock_api.notices = [live_notice(1, 0, 2, typeId=2), live_notice(2, 0, 2)]
+    await get_coordinator(hass).async_refresh()
+    await hass.async_block_till_done()
+
+    assert results == [1, 0]
+    assert hass.states.get(CLOSURES).state == "1"
+    tracker.async_remove()
+
+
+async def test_functions_are_removed_with_the_last_entry(
+    hass: HomeAssistant, mock_api: MockNoticesApi
+) -> None:
+    """Test that unloading the last entry restores TemplateEnvironment."""
+    original_init = template.TemplateEnvironment.__init__
+    entry = await async_setup_integration(hass)
+    assert template.TemplateEnvironment.__init__ is not original_init
+    assert _render(hass, "{{ crt_count() }}") == 0
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert template.TemplateEnvironment.__init__ is original_init
+    with pytest.raises(TemplateError):
+        _render(hass, "{{ crt_count() }}")
+
+    # Set up again, the functions are installed once more
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    assert _render(hass, "{{ crt_count() }}") == 0
+
+
+async def test_unsupported_home_assistant(
+    hass: HomeAssistant, mock_api: MockNoticesApi, caplog: pytest.LogCaptureFixture
+) -> None:
+    """Test that the functions are left out on unsupported versions."""
+    original_init = template.TemplateEnvironment.__init__
+
+    with patch.object(crt_template, "MIN_HA_VERSION", (2099, 1)):
+        await async_setup_integration(hass)
+
+    assert template.TemplateEnvironment.__init__ is original_init
+    assert "Template functions are not supported" in caplog.text
+    with pytest.raises(TemplateError):
+        _render(hass, "{{ crt_count() }}")
+
+
+async def test_missing_template_internals(
+    hass: HomeAssistant, mock_api: MockNoticesApi, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that the functions are left out when template internals have changed."""
+    original_init = template.TemplateEnvironment.__init__
+    monkeypatch.delattr(template, "_collect_state")
+
+    await async_setup_integration(hass)
+
+    assert template.TemplateEnvironment.__init__ is original_init
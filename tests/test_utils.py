@@ -0,0 +1,94 @@
+"""Tests for the notice helpers."""
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+
+from custom_components.canal_river_trust.utils import parse_horizons, to_columnar
+
+from .conftest import from_columnar
+
+ROWS = [
+    {
+        "title": "Lock 21 gate repair",
+        "region": "North West",
+        "waterways": "Leeds & Liverpool Canal",
+        "type": "Closure",
+        "reason": "Emergency",
+        "start_date": "2026-01-05T08:00:00",
+        "coordinates": [-2.1, 53.6],
+        "line": ["_p~iF~ps|U_ulLnnqC"],
+    },
+    {
+        "title": "Towpath works",
+        "region": "Midlands",
+        "waterways": ["Coventry Canal", "Oxford Canal"],
+        "type": "Advisory",
+        "reason": "Maintenance",
+        "start_date": None,
+        "coordinates": None,
+    },
+    {
+        "title": "Lock 30 refurbishment",
+        "region": "North West",
+        "waterways": "Leeds & Liverpool Canal",
+        "type": "Closure",
+        "reason": "Lock Works",
+        "start_date": "2026-02-01T08:00:00",
+        "coordinates": [-2.2, 53.7],
+        "line": None,
+    },
+]
+
+
+def test_to_columnar_round_trip() -> None:
+    """Test that decoding the columns gives back every row."""
+    encoded = to_columnar(ROWS)
+
+    assert encoded["format"] == "columnar"
+    assert encoded["count"] == 3
+    assert encoded["lookups"]["region"] == ["North West", "Midlands"]
+    assert encoded["columns"]["region"] == [0, 1, 0]
+    assert encoded["columns"]["line"] == [["_p~iF~ps|U_ulLnnqC"], None, None]
+    assert from_columnar(encoded) == [{"line": None, **row} for row in ROWS]
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        [1, 1.0, True, "1", None],
+        [["North West"], "['North West']", ["North West"]],
+        [{"name": "North West"}, {"name": "Midlands"}, {"name": "North West"}],
+    ],
+)
+def test_to_columnar_keeps_dictionary_values(values: list[Any]) -> None:
+    """Test that dictionary fields decode to values equal to the originals."""
+    rows = [{"region": value} for value in values]
+    decoded = from_columnar(to_columnar(rows))
+
+    assert decoded == rows
+    assert [type(row["region"]) for row in decoded] == [type(value) for value in values]
+
+
+def test_to_columnar_empty() -> None:
+    """Test an empty notice list."""
+    assert from_columnar(to_columnar([])) == []
+    assert to_columnar([])["fields"] == []
+
+
+@pytest.mark.parametrize(
+    ("text", "horizons"),
+    [
+        ("7", [7]),
+        ("30, 7; 7,,90", [7, 30, 90]),
+        ("", []),
+        (None, []),
+        ("7, soon", None),
+        ("0", None),
+        ("366", None),
+    ],
+)
+def test_parse_horizons(text: str | None, horizons: list[int] | None) -> None:
+    """Test that horizons are sorted and distinct, and any invalid one is rejected."""
+    assert parse_horizons(text, 365) == horizons
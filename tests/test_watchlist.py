@@ -0,0 +1,105 @@
+"""Tests for watchlist matching and sensors."""
+from __future__ import annotations
+
+from datetime import timedelta
+from unittest.mock import patch
+
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.canal_river_trust.const import CONF_WATCHLIST
+from custom_components.canal_river_trust.index import build_path_trie
+from custom_components.canal_river_trust.watchlist import (
+    Watchlist,
+    parse_watchlist,
+    watchlist_item_id,
+)
+
+from .conftest import MockNoticesApi, async_setup_integration, live_notice, make_notice
+
+WATCH = "binary_sensor.canal_river_trust_watch_lock_21"
+
+
+def test_parse_watchlist() -> None:
+    """Test separators, repeats and invalid patterns."""
+    assert parse_watchlist(
+        "Lock 21; lock 21\n/stoppage|closure/\n\n/[unclosed/;Coventry Canal; /stoppage|closure/"
+    ) == ["Lock 21", "/stoppage|closure/", "Coventry Canal"]
+    assert parse_watchlist(None) == []
+    # Slashes alone are a name, not an empty pattern
+    assert parse_watchlist("//") == ["//"]
+
+
+def test_watchlist_item_id() -> None:
+    """Test that IDs ignore the case of names but keep items apart."""
+    assert watchlist_item_id("Lock 21") == watchlist_item_id("LOCK 21")
+    assert watchlist_item_id("/lock 21/") != watchlist_item_id("/LOCK 21/")
+    assert watchlist_item_id("/Lock 21/") != watchlist_item_id("Lock 21")
+    assert watchlist_item_id("Lock 21") != watchlist_item_id("Lock-21")
+    assert watchlist_item_id("Lock 21").startswith("text_")
+    assert watchlist_item_id("/Lock/").startswith("re_")
+    assert watchlist_item_id("!!!") != watchlist_item_id("???")
+
+
+def test_watchlist_matches_names_and_patterns(notices) -> None:
+    """Test name lookups and title patterns, ignoring case."""
+    notices = [*notices, make_notice(5, title="Emergency stoppage at LOCK 21", region="Wales")]
+    watchlist = Watchlist(["Lock 21", "Coventry Canal", "/lock 2\\d/", "/towpath/", "Wales"])
+    assert watchlist.notices("Lock 21") == []
+
+    watchlist.update(build_path_trie(notices), notices)
+
+    assert [notice["id"] for notice in watchlist.notices("Lock 21")] == [1]
+    assert [notice["id"] for notice in watchlist.notices("Coventry Canal")] == [3, 4]
+    assert [notice["id"] for notice in watchlist.notices("/lock 2\\d/")] == [5]
+    assert watchlist.notices("/towpath/") == []
+    assert [notice["id"] for notice in watchlist.notices("Wales")] == [5]
+    assert watchlist.notices("Unknown") == []
+
+
+def test_watchlist_without_patterns_skips_titles(notices) -> None:
+    """Test that titles are not searched when no item is a pattern."""
+    watchlist = Watchlist(["Lock 30"])
+
+    with patch("custom_components.canal_river_trust.watchlist.notice_key") as key:
+        watchlist.update(build_path_trie(notices), notices)
+
+    key.assert_not_called()
+    assert [notice["id"] for notice in watchlist.notices("Lock 30")] == [2]
+
+
+async def test_watchlist_sensor(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory, mock_api: MockNoticesApi
+) -> None:
+    """Test that the sensor turns on as notices come within a week."""
+    mock_api.notices = [
+        live_notice(1, -1, 2, path="North West > Leeds & Liverpool Canal > Lock 21"),
+        live_notice(2, 8, 2, path="North West > Leeds & Liverpool Canal > Lock 21"),
+        live_notice(3, -1, 5, path="North West > Leeds & Liverpool Canal > Lock 30"),
+    ]
+    await async_setup_integration(hass, {CONF_WATCHLIST: "Lock 21"})
+
+    state = hass.states.get(WATCH)
+    assert state.state == "on"
+    assert state.attributes["item"] == "Lock 21"
+    assert state.attributes["active"] == 1
+    assert state.attributes["upcoming"] == 0
+    assert [notice["key"] for notice in state.attributes["notices"]] == ["1"]
+
+    # Notice 1 ends, and notice 2 comes within a week, without a refresh
+    freezer.tick(timedelta(days=1, hours=1))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+    state = hass.states.get(WATCH)
+    assert state.state == "on"
+    assert state.attributes["active"] == 0
+    assert state.attributes["upcoming"] == 1
+    assert [notice["key"] for notice in state.attributes["notices"]] == ["2"]
+
+    # Both end
+    freezer.tick(timedelta(days=10))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+    assert hass.states.get(WATCH).state == "off"
+    assert hass.states.get(WATCH).attributes["notices"] == []
@@ -0,0 +1,70 @@
+"""Tests for the websocket API."""
+from __future__ import annotations
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.canal_river_trust.websocket_api import (
+    WS_LIST_NOTICES,
+    WS_SUBSCRIBE_NOTICES,
+)
+
+from .conftest import (
+    ENTRY_ID,
+    MockNoticesApi,
+    async_setup_integration,
+    get_coordinator,
+    live_notice,
+)
+
+
+async def test_list_notices(hass: HomeAssistant, hass_ws_client, mock_api: MockNoticesApi) -> None:
+    """Test paging through the current notices."""
+    mock_api.notices = [live_notice(number, 0, 2) for number in range(1, 6)]
+    await async_setup_integration(hass)
+    client = await hass_ws_client(hass)
+
+    await client.send_json({"id": 1, "type": WS_LIST_NOTICES, "offset": 1, "limit": 2})
+    response = await client.receive_json()
+
+    assert response["success"]
+    assert response["result"]["total"] == 5
+    assert response["result"]["offset"] == 1
+    assert [notice["key"] for notice in response["result"]["notices"]] == ["2", "3"]
+    assert response["result"]["last_updated"] is not None
+
+    await client.send_json({"id": 2, "type": WS_LIST_NOTICES, "limit": 0})
+    response = await client.receive_json()
+    assert not response["success"]
+
+    await client.send_json({"id": 3, "type": WS_LIST_NOTICES, "entry_id": "unknown"})
+    response = await client.receive_json()
+    assert response["error"]["code"] == "not_found"
+
+
+async def test_subscribe_notices(
+    hass: HomeAssistant, hass_ws_client, mock_api: MockNoticesApi
+) -> None:
+    """Test that subscribers receive the changes of each refresh."""
+    mock_api.notices = [live_notice(1, 0, 2), live_notice(2, 0, 2)]
+    await async_setup_integration(hass)
+    client = await hass_ws_client(hass)
+
+    await client.send_json({"id": 1, "type": WS_SUBSCRIBE_NOTICES, "entry_id": ENTRY_ID})
+    response = await client.receive_json()
+    assert response["success"]
+
+    mock_api.notices = [live_notice(1, 0, 2, title="Renamed"), live_notice(3, 0, 2)]
+    await get_coordinator(hass).async_refresh()
+
+    message = await client.receive_json()
+    assert message["id"] == 1
+    assert message["type"] == "event"
+    assert [notice["key"] for notice in message["event"]["added"]] == ["3"]
+    assert [notice["title"] for notice in message["event"]["updated"]] == ["Renamed"]
+    assert message["event"]["removed"] == ["2"]
+
+    # Unsubscribing removes the change listener
+    await client.send_json({"id": 2, "type": "unsubscribe_events", "subscription": 1})
+    response = await client.receive_json()
+    assert response["success"]
+    assert not get_coordinator(hass)._change_listeners